@@ -10,6 +10,7 @@ import logging
 import os
 import sqlite3
 from datetime import datetime
+from settings_service import bump_settings_version
 
 # Import API key manager
 try:
@@ -551,13 +552,15 @@ def set_data_source_mode():
         
         # Also update environment variable (applies only to current process)
         os.environ['USE_DB_DIRECT_ACCESS'] = value
+        # Other workers reload their cached settings on the next read
+        bump_settings_version()
         
         logger.info(f"Data source mode changed: {mode} (by {current_user.username})")
         
         return jsonify({
             'success': True,
             'mode': mode,
-            'message': f'Data source mode changed to "{mode}" mode. Server restart is recommended to apply changes.'
+            'message': f'Data source mode changed to "{mode}" mode.'
         })
         
     except Exception as e:
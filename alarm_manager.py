@@ -8,11 +8,11 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
-from threading import Timer
 import time
 
 from fcm_service import get_fcm_service
 from alarm_service import get_alarm_services
+from escalation_scheduler import EscalationScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -24,24 +24,18 @@ class AlarmManager:
         self.fcm_service = get_fcm_service()
         self.template_service, self.recipient_service, self.escalation_service = get_alarm_services()
         self.active_alarms: Dict[str, Dict[str, Any]] = {}
-        self.escalation_timers: Dict[str, List[Timer]] = {}
         
-        # Start escalation check timer
-        self._start_escalation_checker()
+        # One scheduler thread drives every escalation (persisted, re-armed on restart)
+        self.escalation_scheduler = EscalationScheduler(self._execute_escalation)
+        self._start_escalation_scheduler()
     
-    def _start_escalation_checker(self):
-        """Start escalation check timer."""
-        def check_escalations():
-            try:
-                self._process_pending_escalations()
-            except Exception as e:
-                logger.error(f"Error occurred during escalation check: {e}")
-            finally:
-                # Check every minute
-                Timer(60.0, check_escalations).start()
-        
-        Timer(60.0, check_escalations).start()
-        logger.info("Escalation check timer started")
+    def _start_escalation_scheduler(self):
+        """Re-arm pending escalations (alarm_escalations) and start the scheduler thread."""
+        try:
+            self.escalation_scheduler.start()
+            logger.info("Escalation scheduler started")
+        except Exception as e:
+            logger.error(f"Failed to start escalation scheduler: {e}")
     
     def send_alarm(
         self,
@@ -243,79 +237,72 @@ class AlarmManager:
             logger.error(f"Failed to save alarm log: {e}")
     
     def _setup_escalation_timers(self, alarm_id: str, escalations: List[Any]):
-        """Set up escalation timers."""
-        if alarm_id not in self.escalation_timers:
-            self.escalation_timers[alarm_id] = []
-        
+        """Schedule pending escalation levels on the escalation scheduler."""
+        entries = []
         for escalation in escalations:
             if escalation.status == "pending":
-                # Execute escalation after delay
-                timer = Timer(
-                    escalation.delay_minutes * 60.0,
-                    self._execute_escalation,
-                    args=[alarm_id, escalation.level]
-                )
-                timer.start()
-                self.escalation_timers[alarm_id].append(timer)
-                
-                logger.info(f"Escalation timer set: {alarm_id} level {escalation.level} - after {escalation.delay_minutes} minutes")
+                due_at = escalation.created_at + timedelta(minutes=escalation.delay_minutes)
+                entries.append((alarm_id, escalation.level, due_at.timestamp()))
+                logger.info(f"Escalation scheduled: {alarm_id} level {escalation.level} - after {escalation.delay_minutes} minutes")
+        self.escalation_scheduler.schedule_many(entries)
     
-    def _execute_escalation(self, alarm_id: str, level: int):
-        """Execute escalation."""
+    def _execute_escalation(self, alarm_id: str, level: int) -> bool:
+        """Execute escalation. Returns False when it was not sent and should be retried."""
+        # Every process re-arms the same pending rows: only the one that claims the row sends it
+        if not self.escalation_service.claim_escalation(alarm_id, level):
+            return True
+        
         try:
             escalations = self.escalation_service.get_escalations_for_alarm(alarm_id)
             escalation = next((e for e in escalations if e.level == level), None)
-            
-            if not escalation or escalation.status != "pending":
-                return
+            if not escalation:
+                return True
             
             # Send notification to escalation recipients
             fcm_tokens = self._get_fcm_tokens(escalation.recipients)
+            if not fcm_tokens:
+                logger.warning(f"Escalation {alarm_id} level {level}: no FCM tokens for {escalation.recipients}")
+                self.escalation_service.release_escalation(alarm_id, level)
+                return False
+            
+            title = f"🚨 Escalation Alert (Level {level})"
+            body = escalation.message
+            
+            if len(fcm_tokens) == 1:
+                fcm_result = self.fcm_service.send_notification(
+                    token=fcm_tokens[0],
+                    title=title,
+                    body=body,
+                    data={"alarm_id": alarm_id, "escalation_level": level},
+                    priority="high"
+                )
+            else:
+                fcm_result = self.fcm_service.send_multicast_notification(
+                    tokens=fcm_tokens,
+                    title=title,
+                    body=body,
+                    data={"alarm_id": alarm_id, "escalation_level": level},
+                    priority="high"
+                )
             
-            if fcm_tokens:
-                title = f"🚨 Escalation Alert (Level {level})"
-                body = escalation.message
-                
-                if len(fcm_tokens) == 1:
-                    fcm_result = self.fcm_service.send_notification(
-                        token=fcm_tokens[0],
-                        title=title,
-                        body=body,
-                        data={"alarm_id": alarm_id, "escalation_level": level},
-                        priority="high"
-                    )
-                else:
-                    fcm_result = self.fcm_service.send_multicast_notification(
-                        tokens=fcm_tokens,
-                        title=title,
-                        body=body,
-                        data={"alarm_id": alarm_id, "escalation_level": level},
-                        priority="high"
-                    )
-                
-                # Update escalation status
-                self.escalation_service.mark_escalation_sent(alarm_id, level)
-                
-                logger.info(f"Escalation executed: {alarm_id} level {level} - {len(fcm_tokens)} devices")
+            if not (fcm_result or {}).get('success'):
+                logger.warning(f"Escalation {alarm_id} level {level} failed: {(fcm_result or {}).get('error')}")
+                self.escalation_service.release_escalation(alarm_id, level)
+                return False
             
-        except Exception as e:
-            logger.error(f"Failed to execute escalation: {e}")
-    
-    def _process_pending_escalations(self):
-        """Process pending escalations."""
-        try:
-            pending_escalations = self.escalation_service.get_pending_escalations()
+            # Update escalation status
+            self.escalation_service.mark_escalation_sent(alarm_id, level)
+            
+            logger.info(f"Escalation executed: {alarm_id} level {level} - {len(fcm_tokens)} devices")
+            return True
             
-            for escalation in pending_escalations:
-                # Skip if timer hasn't expired
-                if datetime.now() < escalation.created_at + timedelta(minutes=escalation.delay_minutes):
-                    continue
-                
-                # Execute escalation
-                self._execute_escalation(escalation.alarm_id, escalation.level)
-                
         except Exception as e:
-            logger.error(f"Failed to process pending escalations: {e}")
+            logger.error(f"Failed to execute escalation: {e}")
+            try:
+                self.escalation_service.release_escalation(alarm_id, level)
+            except Exception as release_error:
+                logger.error(f"Failed to release escalation {alarm_id} level {level}: {release_error}")
+            return False
     
     def acknowledge_alarm(self, alarm_id: str, user_id: str) -> Dict[str, Any]:
         """Acknowledge alarm."""
@@ -418,11 +405,8 @@ class AlarmManager:
             for alarm_id in expired_alarms:
                 del self.active_alarms[alarm_id]
                 
-                # Clean up escalation timers
-                if alarm_id in self.escalation_timers:
-                    for timer in self.escalation_timers[alarm_id]:
-                        timer.cancel()
-                    del self.escalation_timers[alarm_id]
+                # Drop scheduled escalations
+                self.escalation_scheduler.cancel(alarm_id)
             
             if expired_alarms:
                 logger.info(f"Cleaned up {len(expired_alarms)} expired alarms")
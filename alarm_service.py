@@ -1,10 +1,17 @@
 """
 Alarm Service Module
 Handles alarm templates, recipient management, and escalation functionality
+
+Templates, recipients and escalations are stored in indexed SQLite tables in
+progress_report.db (alarm_service_templates, alarm_service_recipients,
+alarm_escalations), so every mutation is a single-row write that is safe across
+worker processes. The legacy data/alarm_*.json files are imported once when a
+table is first created.
 """
 
 import os
 import json
+import sqlite3
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
@@ -51,41 +58,106 @@ class AlarmEscalation:
     recipients: List[str]
     delay_minutes: int
     message: str
-    status: str  # pending, sent, acknowledged, escalated
+    status: str  # pending, sending (claimed), sent, acknowledged, escalated
     created_at: datetime
     sent_at: Optional[datetime]
     acknowledged_at: Optional[datetime]
 
+_DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'progress_report.db')
+ESCALATION_CLAIM_TIMEOUT_SECONDS = float(os.environ.get('ESCALATION_CLAIM_TIMEOUT_SECONDS', '300'))
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """SQLite connection with WAL mode and busy_timeout."""
+    conn = sqlite3.connect(db_path, timeout=60.0)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+    except Exception as e:
+        logger.warning(f"Failed to set PRAGMA settings: {e}")
+    return conn
+
+
+def _to_iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _from_iso(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _load_legacy_json(path: str):
+    """Read a legacy data/alarm_*.json file, or None if missing/unreadable."""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to read legacy alarm file {path}: {e}")
+    return None
+
+
 class AlarmTemplateService:
     """Alarm Template Service Class"""
     
-    def __init__(self, templates_file: str = "data/alarm_templates.json"):
+    def __init__(self, templates_file: str = "data/alarm_templates.json", db_path: str = _DEFAULT_DB_PATH):
         self.templates_file = templates_file
-        self.templates: Dict[str, AlarmTemplate] = {}
-        self._load_templates()
+        self.db_path = db_path
+        self._ensure_table()
+    
+    def _ensure_table(self):
+        """Create the templates table; seed it from the legacy JSON file or defaults."""
+        conn = _connect(self.db_path)
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS alarm_service_templates (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    escalation_enabled INTEGER NOT NULL DEFAULT 0,
+                    escalation_delay_minutes INTEGER NOT NULL DEFAULT 0,
+                    recipients TEXT NOT NULL DEFAULT '[]',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_alarm_service_templates_category ON alarm_service_templates(category)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_alarm_service_templates_priority ON alarm_service_templates(priority)')
+            conn.commit()
+            is_empty = conn.execute('SELECT 1 FROM alarm_service_templates LIMIT 1').fetchone() is None
+        finally:
+            conn.close()
+        
+        if is_empty:
+            self._load_templates()
     
     def _load_templates(self):
-        """Load templates from template file."""
+        """Import templates from the legacy template file (or create defaults)."""
         try:
-            if os.path.exists(self.templates_file):
-                with open(self.templates_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for template_data in data:
-                        template = AlarmTemplate(
-                            id=template_data['id'],
-                            name=template_data['name'],
-                            title=template_data['title'],
-                            body=template_data['body'],
-                            priority=template_data['priority'],
-                            category=template_data['category'],
-                            escalation_enabled=template_data['escalation_enabled'],
-                            escalation_delay_minutes=template_data['escalation_delay_minutes'],
-                            recipients=template_data['recipients'],
-                            created_at=datetime.fromisoformat(template_data['created_at']),
-                            updated_at=datetime.fromisoformat(template_data['updated_at'])
-                        )
-                        self.templates[template.id] = template
-                logger.info(f"Loaded {len(self.templates)} alarm templates")
+            data = _load_legacy_json(self.templates_file)
+            if data:
+                templates = [
+                    AlarmTemplate(
+                        id=template_data['id'],
+                        name=template_data['name'],
+                        title=template_data['title'],
+                        body=template_data['body'],
+                        priority=template_data['priority'],
+                        category=template_data['category'],
+                        escalation_enabled=template_data['escalation_enabled'],
+                        escalation_delay_minutes=template_data['escalation_delay_minutes'],
+                        recipients=template_data['recipients'],
+                        created_at=datetime.fromisoformat(template_data['created_at']),
+                        updated_at=datetime.fromisoformat(template_data['updated_at'])
+                    )
+                    for template_data in data
+                ]
+                self._upsert_templates(templates)
+                logger.info(f"Imported {len(templates)} alarm templates from {self.templates_file}")
             else:
                 self._create_default_templates()
         except Exception as e:
@@ -136,6 +208,7 @@ class AlarmTemplateService:
             }
         ]
         
+        templates = []
         for template_data in default_templates:
             template = AlarmTemplate(
                 id=template_data['id'],
@@ -150,37 +223,66 @@ class AlarmTemplateService:
                 created_at=datetime.fromisoformat(template_data['created_at']),
                 updated_at=datetime.fromisoformat(template_data['updated_at'])
             )
-            self.templates[template.id] = template
+            templates.append(template)
         
-        self._save_templates()
+        self._upsert_templates(templates)
         logger.info("Default alarm templates created")
     
-    def _save_templates(self):
-        """Save templates to file."""
+    @staticmethod
+    def _row_to_template(row: sqlite3.Row) -> AlarmTemplate:
+        return AlarmTemplate(
+            id=row['id'],
+            name=row['name'],
+            title=row['title'],
+            body=row['body'],
+            priority=row['priority'],
+            category=row['category'],
+            escalation_enabled=bool(row['escalation_enabled']),
+            escalation_delay_minutes=row['escalation_delay_minutes'],
+            recipients=json.loads(row['recipients'] or '[]'),
+            created_at=_from_iso(row['created_at']),
+            updated_at=_from_iso(row['updated_at'])
+        )
+    
+    def _upsert_templates(self, templates: List[AlarmTemplate]):
+        """Insert or replace template rows in one transaction."""
+        conn = _connect(self.db_path)
         try:
-            os.makedirs(os.path.dirname(self.templates_file), exist_ok=True)
-            with open(self.templates_file, 'w', encoding='utf-8') as f:
-                templates_data = []
-                for template in self.templates.values():
-                    template_dict = asdict(template)
-                    template_dict['created_at'] = template.created_at.isoformat()
-                    template_dict['updated_at'] = template.updated_at.isoformat()
-                    templates_data.append(template_dict)
-                json.dump(templates_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save alarm templates: {e}")
+            conn.executemany('''
+                INSERT OR REPLACE INTO alarm_service_templates
+                    (id, name, title, body, priority, category, escalation_enabled,
+                     escalation_delay_minutes, recipients, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (t.id, t.name, t.title, t.body, t.priority, t.category, int(bool(t.escalation_enabled)),
+                 t.escalation_delay_minutes, json.dumps(t.recipients, ensure_ascii=False),
+                 _to_iso(t.created_at), _to_iso(t.updated_at))
+                for t in templates
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _query(self, where: str = '', params: tuple = ()) -> List[AlarmTemplate]:
+        conn = _connect(self.db_path)
+        try:
+            rows = conn.execute(f'SELECT * FROM alarm_service_templates {where}', params).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_template(row) for row in rows]
     
     def get_template(self, template_id: str) -> Optional[AlarmTemplate]:
         """Get template by template ID."""
-        return self.templates.get(template_id)
+        templates = self._query('WHERE id = ?', (template_id,))
+        return templates[0] if templates else None
     
     def get_templates_by_category(self, category: str) -> List[AlarmTemplate]:
         """Get templates by category."""
-        return [t for t in self.templates.values() if t.category == category]
+        return self._query('WHERE category = ?', (category,))
     
     def get_templates_by_priority(self, priority: str) -> List[AlarmTemplate]:
         """Get templates by priority."""
-        return [t for t in self.templates.values() if t.priority == priority]
+        return self._query('WHERE priority = ?', (priority,))
     
     def create_template(self, template_data: Dict[str, Any]) -> AlarmTemplate:
         """Create new template."""
@@ -199,31 +301,34 @@ class AlarmTemplateService:
             updated_at=datetime.now()
         )
         
-        self.templates[template_id] = template
-        self._save_templates()
+        self._upsert_templates([template])
         logger.info(f"Created new alarm template: {template_id}")
         return template
     
     def update_template(self, template_id: str, template_data: Dict[str, Any]) -> Optional[AlarmTemplate]:
         """Update existing template."""
-        if template_id not in self.templates:
+        template = self.get_template(template_id)
+        if template is None:
             return None
         
-        template = self.templates[template_id]
         for key, value in template_data.items():
-            if hasattr(template, key):
+            if hasattr(template, key) and key != 'id':
                 setattr(template, key, value)
         
         template.updated_at = datetime.now()
-        self._save_templates()
+        self._upsert_templates([template])
         logger.info(f"Updated alarm template: {template_id}")
         return template
     
     def delete_template(self, template_id: str) -> bool:
         """Delete template."""
-        if template_id in self.templates:
-            del self.templates[template_id]
-            self._save_templates()
+        conn = _connect(self.db_path)
+        try:
+            deleted = conn.execute('DELETE FROM alarm_service_templates WHERE id = ?', (template_id,)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        if deleted:
             logger.info(f"Deleted alarm template: {template_id}")
             return True
         return False
@@ -231,37 +336,67 @@ class AlarmTemplateService:
 class AlarmRecipientService:
     """Alarm Recipient Service Class"""
     
-    def __init__(self, recipients_file: str = "data/alarm_recipients.json"):
+    def __init__(self, recipients_file: str = "data/alarm_recipients.json", db_path: str = _DEFAULT_DB_PATH):
         self.recipients_file = recipients_file
-        self.recipients: Dict[str, AlarmRecipient] = {}
-        self._load_recipients()
+        self.db_path = db_path
+        self._ensure_table()
+    
+    def _ensure_table(self):
+        """Create the recipients table; seed it from the legacy JSON file or defaults."""
+        conn = _connect(self.db_path)
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS alarm_service_recipients (
+                    user_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    email TEXT,
+                    phone TEXT,
+                    fcm_token TEXT,
+                    role TEXT,
+                    team TEXT,
+                    notification_preferences TEXT NOT NULL DEFAULT '{}',
+                    is_active INTEGER NOT NULL DEFAULT 1,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_alarm_service_recipients_team ON alarm_service_recipients(team, is_active)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_alarm_service_recipients_role ON alarm_service_recipients(role, is_active)')
+            conn.commit()
+            is_empty = conn.execute('SELECT 1 FROM alarm_service_recipients LIMIT 1').fetchone() is None
+        finally:
+            conn.close()
+        
+        if is_empty:
+            self._load_recipients()
     
     def _load_recipients(self):
-        """Load recipients from recipient file."""
+        """Import recipients from the legacy recipient file (or create defaults)."""
         try:
-            if os.path.exists(self.recipients_file):
-                with open(self.recipients_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for recipient_data in data:
-                        recipient = AlarmRecipient(
-                            user_id=recipient_data['user_id'],
-                            name=recipient_data['name'],
-                            email=recipient_data['email'],
-                            phone=recipient_data['phone'],
-                            fcm_token=recipient_data.get('fcm_token'),
-                            role=recipient_data['role'],
-                            team=recipient_data['team'],
-                            notification_preferences=recipient_data.get('notification_preferences', {
-                                'email': True,
-                                'sms': False,
-                                'push': True
-                            }),
-                            is_active=recipient_data.get('is_active', True),
-                            created_at=datetime.fromisoformat(recipient_data['created_at']),
-                            updated_at=datetime.fromisoformat(recipient_data['updated_at'])
-                        )
-                        self.recipients[recipient.user_id] = recipient
-                logger.info(f"Loaded {len(self.recipients)} alarm recipients")
+            data = _load_legacy_json(self.recipients_file)
+            if data:
+                recipients = [
+                    AlarmRecipient(
+                        user_id=recipient_data['user_id'],
+                        name=recipient_data['name'],
+                        email=recipient_data['email'],
+                        phone=recipient_data['phone'],
+                        fcm_token=recipient_data.get('fcm_token'),
+                        role=recipient_data['role'],
+                        team=recipient_data['team'],
+                        notification_preferences=recipient_data.get('notification_preferences', {
+                            'email': True,
+                            'sms': False,
+                            'push': True
+                        }),
+                        is_active=recipient_data.get('is_active', True),
+                        created_at=datetime.fromisoformat(recipient_data['created_at']),
+                        updated_at=datetime.fromisoformat(recipient_data['updated_at'])
+                    )
+                    for recipient_data in data
+                ]
+                self._upsert_recipients(recipients)
+                logger.info(f"Imported {len(recipients)} alarm recipients from {self.recipients_file}")
             else:
                 self._create_default_recipients()
         except Exception as e:
@@ -312,6 +447,7 @@ class AlarmRecipientService:
             }
         ]
         
+        recipients = []
         for recipient_data in default_recipients:
             recipient = AlarmRecipient(
                 user_id=recipient_data['user_id'],
@@ -326,41 +462,85 @@ class AlarmRecipientService:
                 created_at=datetime.fromisoformat(recipient_data['created_at']),
                 updated_at=datetime.fromisoformat(recipient_data['updated_at'])
             )
-            self.recipients[recipient.user_id] = recipient
+            recipients.append(recipient)
         
-        self._save_recipients()
+        self._upsert_recipients(recipients)
         logger.info("Default alarm recipients created")
     
-    def _save_recipients(self):
-        """Save recipients to file."""
+    @staticmethod
+    def _row_to_recipient(row: sqlite3.Row) -> AlarmRecipient:
+        return AlarmRecipient(
+            user_id=row['user_id'],
+            name=row['name'],
+            email=row['email'],
+            phone=row['phone'],
+            fcm_token=row['fcm_token'],
+            role=row['role'],
+            team=row['team'],
+            notification_preferences=json.loads(row['notification_preferences'] or '{}'),
+            is_active=bool(row['is_active']),
+            created_at=_from_iso(row['created_at']),
+            updated_at=_from_iso(row['updated_at'])
+        )
+    
+    def _upsert_recipients(self, recipients: List[AlarmRecipient]):
+        """Insert or replace recipient rows in one transaction."""
+        conn = _connect(self.db_path)
         try:
-            os.makedirs(os.path.dirname(self.recipients_file), exist_ok=True)
-            with open(self.recipients_file, 'w', encoding='utf-8') as f:
-                recipients_data = []
-                for recipient in self.recipients.values():
-                    recipient_dict = asdict(recipient)
-                    recipient_dict['created_at'] = recipient.created_at.isoformat()
-                    recipient_dict['updated_at'] = recipient.updated_at.isoformat()
-                    recipients_data.append(recipient_dict)
-                json.dump(recipients_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save alarm recipients: {e}")
+            conn.executemany('''
+                INSERT OR REPLACE INTO alarm_service_recipients
+                    (user_id, name, email, phone, fcm_token, role, team,
+                     notification_preferences, is_active, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (r.user_id, r.name, r.email, r.phone, r.fcm_token, r.role, r.team,
+                 json.dumps(r.notification_preferences, ensure_ascii=False), int(bool(r.is_active)),
+                 _to_iso(r.created_at), _to_iso(r.updated_at))
+                for r in recipients
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _query(self, where: str = '', params: tuple = ()) -> List[AlarmRecipient]:
+        conn = _connect(self.db_path)
+        try:
+            rows = conn.execute(f'SELECT * FROM alarm_service_recipients {where}', params).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_recipient(row) for row in rows]
+    
+    def _update_fields(self, user_id: str, **fields) -> bool:
+        """Single-row UPDATE of the given columns (updated_at is set automatically)."""
+        fields['updated_at'] = _to_iso(datetime.now())
+        assignments = ', '.join(f'{column} = ?' for column in fields)
+        conn = _connect(self.db_path)
+        try:
+            updated = conn.execute(
+                f'UPDATE alarm_service_recipients SET {assignments} WHERE user_id = ?',
+                (*fields.values(), user_id)
+            ).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return updated > 0
     
     def get_recipient(self, user_id: str) -> Optional[AlarmRecipient]:
         """Get recipient by user ID."""
-        return self.recipients.get(user_id)
+        recipients = self._query('WHERE user_id = ?', (user_id,))
+        return recipients[0] if recipients else None
     
     def get_recipients_by_team(self, team: str) -> List[AlarmRecipient]:
         """Get recipients by team."""
-        return [r for r in self.recipients.values() if r.team == team and r.is_active]
+        return self._query('WHERE team = ? AND is_active = 1', (team,))
     
     def get_recipients_by_role(self, role: str) -> List[AlarmRecipient]:
         """Get recipients by role."""
-        return [r for r in self.recipients.values() if r.role == role and r.is_active]
+        return self._query('WHERE role = ? AND is_active = 1', (role,))
     
     def get_active_recipients(self) -> List[AlarmRecipient]:
         """Get active recipients."""
-        return [r for r in self.recipients.values() if r.is_active]
+        return self._query('WHERE is_active = 1')
     
     def add_recipient(self, recipient_data: Dict[str, Any]) -> AlarmRecipient:
         """Add new recipient."""
@@ -382,42 +562,35 @@ class AlarmRecipientService:
             updated_at=datetime.now()
         )
         
-        self.recipients[recipient.user_id] = recipient
-        self._save_recipients()
+        self._upsert_recipients([recipient])
         logger.info(f"Added new alarm recipient: {recipient.user_id}")
         return recipient
     
     def update_recipient(self, user_id: str, recipient_data: Dict[str, Any]) -> Optional[AlarmRecipient]:
         """Update existing recipient."""
-        if user_id not in self.recipients:
+        recipient = self.get_recipient(user_id)
+        if recipient is None:
             return None
         
-        recipient = self.recipients[user_id]
         for key, value in recipient_data.items():
-            if hasattr(recipient, key):
+            if hasattr(recipient, key) and key != 'user_id':
                 setattr(recipient, key, value)
         
         recipient.updated_at = datetime.now()
-        self._save_recipients()
+        self._upsert_recipients([recipient])
         logger.info(f"Updated alarm recipient: {user_id}")
         return recipient
     
     def update_fcm_token(self, user_id: str, fcm_token: str) -> bool:
         """Update user's FCM token."""
-        if user_id in self.recipients:
-            self.recipients[user_id].fcm_token = fcm_token
-            self.recipients[user_id].updated_at = datetime.now()
-            self._save_recipients()
+        if self._update_fields(user_id, fcm_token=fcm_token):
             logger.info(f"Updated FCM token: {user_id}")
             return True
         return False
     
     def deactivate_recipient(self, user_id: str) -> bool:
         """Deactivate recipient."""
-        if user_id in self.recipients:
-            self.recipients[user_id].is_active = False
-            self.recipients[user_id].updated_at = datetime.now()
-            self._save_recipients()
+        if self._update_fields(user_id, is_active=0):
             logger.info(f"Deactivated alarm recipient: {user_id}")
             return True
         return False
@@ -425,54 +598,124 @@ class AlarmRecipientService:
 class AlarmEscalationService:
     """Alarm Escalation Service Class"""
     
-    def __init__(self, escalations_file: str = "data/alarm_escalations.json"):
+    def __init__(self, escalations_file: str = "data/alarm_escalations.json", db_path: str = _DEFAULT_DB_PATH):
         self.escalations_file = escalations_file
-        self.escalations: Dict[str, List[AlarmEscalation]] = {}  # alarm_id -> escalations
-        self._load_escalations()
+        self.db_path = db_path
+        self._ensure_table()
+    
+    def _ensure_table(self):
+        """Create the escalations table; import the legacy JSON file into an empty table."""
+        conn = _connect(self.db_path)
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS alarm_escalations (
+                    alarm_id TEXT NOT NULL,
+                    level INTEGER NOT NULL,
+                    recipients TEXT NOT NULL DEFAULT '[]',
+                    delay_minutes INTEGER NOT NULL,
+                    message TEXT,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    due_at REAL NOT NULL,
+                    sent_at TEXT,
+                    acknowledged_at TEXT,
+                    claimed_at REAL,
+                    PRIMARY KEY (alarm_id, level)
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(alarm_escalations)').fetchall()}
+            if 'claimed_at' not in columns:
+                conn.execute('ALTER TABLE alarm_escalations ADD COLUMN claimed_at REAL')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_alarm_escalations_status_due ON alarm_escalations(status, due_at)')
+            # Schedule table of the first heap scheduler; due_at above is the only schedule now
+            conn.execute('DROP TABLE IF EXISTS alarm_escalation_schedule')
+            conn.commit()
+            is_empty = conn.execute('SELECT 1 FROM alarm_escalations LIMIT 1').fetchone() is None
+        finally:
+            conn.close()
+        
+        if is_empty:
+            self._load_escalations()
     
     def _load_escalations(self):
-        """Load escalations from escalation file."""
+        """Import escalations from the legacy escalation file."""
         try:
-            if os.path.exists(self.escalations_file):
-                with open(self.escalations_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for alarm_id, escalations_data in data.items():
-                        escalations = []
-                        for escalation_data in escalations_data:
-                            escalation = AlarmEscalation(
-                                alarm_id=escalation_data['alarm_id'],
-                                level=escalation_data['level'],
-                                recipients=escalation_data['recipients'],
-                                delay_minutes=escalation_data['delay_minutes'],
-                                message=escalation_data['message'],
-                                status=escalation_data['status'],
-                                created_at=datetime.fromisoformat(escalation_data['created_at']),
-                                sent_at=datetime.fromisoformat(escalation_data['sent_at']) if escalation_data.get('sent_at') else None,
-                                acknowledged_at=datetime.fromisoformat(escalation_data['acknowledged_at']) if escalation_data.get('acknowledged_at') else None
-                            )
-                            escalations.append(escalation)
-                        self.escalations[alarm_id] = escalations
-                logger.info(f"Alarm escalations loaded")
+            data = _load_legacy_json(self.escalations_file)
+            if not data:
+                return
+            escalations = []
+            for alarm_id, escalations_data in data.items():
+                for escalation_data in escalations_data:
+                    escalations.append(AlarmEscalation(
+                        alarm_id=escalation_data['alarm_id'],
+                        level=escalation_data['level'],
+                        recipients=escalation_data['recipients'],
+                        delay_minutes=escalation_data['delay_minutes'],
+                        message=escalation_data['message'],
+                        status=escalation_data['status'],
+                        created_at=datetime.fromisoformat(escalation_data['created_at']),
+                        sent_at=datetime.fromisoformat(escalation_data['sent_at']) if escalation_data.get('sent_at') else None,
+                        acknowledged_at=datetime.fromisoformat(escalation_data['acknowledged_at']) if escalation_data.get('acknowledged_at') else None
+                    ))
+            self._upsert_escalations(escalations)
+            logger.info(f"Imported {len(escalations)} alarm escalations from {self.escalations_file}")
         except Exception as e:
             logger.error(f"Failed to load alarm escalations: {e}")
     
-    def _save_escalations(self):
-        """Save escalations to file."""
+    @staticmethod
+    def _row_to_escalation(row: sqlite3.Row) -> AlarmEscalation:
+        return AlarmEscalation(
+            alarm_id=row['alarm_id'],
+            level=row['level'],
+            recipients=json.loads(row['recipients'] or '[]'),
+            delay_minutes=row['delay_minutes'],
+            message=row['message'],
+            status=row['status'],
+            created_at=_from_iso(row['created_at']),
+            sent_at=_from_iso(row['sent_at']),
+            acknowledged_at=_from_iso(row['acknowledged_at'])
+        )
+    
+    def _upsert_escalations(self, escalations: List[AlarmEscalation]):
+        """Insert or replace escalation rows in one transaction."""
+        conn = _connect(self.db_path)
         try:
-            os.makedirs(os.path.dirname(self.escalations_file), exist_ok=True)
-            with open(self.escalations_file, 'w', encoding='utf-8') as f:
-                escalations_data = {}
-                for alarm_id, escalations in self.escalations.items():
-                    escalations_data[alarm_id] = []
-                    for escalation in escalations:
-                        escalation_dict = asdict(escalation)
-                        escalation_dict['created_at'] = escalation.created_at.isoformat()
-                        escalation_dict['sent_at'] = escalation.sent_at.isoformat() if escalation.sent_at else None
-                        escalation_dict['acknowledged_at'] = escalation.acknowledged_at.isoformat() if escalation.acknowledged_at else None
-                        escalations_data[alarm_id].append(escalation_dict)
-                json.dump(escalations_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save alarm escalations: {e}")
+            conn.executemany('''
+                INSERT OR REPLACE INTO alarm_escalations
+                    (alarm_id, level, recipients, delay_minutes, message, status,
+                     created_at, due_at, sent_at, acknowledged_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (e.alarm_id, e.level, json.dumps(e.recipients, ensure_ascii=False), e.delay_minutes,
+                 e.message, e.status, _to_iso(e.created_at),
+                 (e.created_at + timedelta(minutes=e.delay_minutes)).timestamp(),
+                 _to_iso(e.sent_at), _to_iso(e.acknowledged_at))
+                for e in escalations
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _query(self, where: str = '', params: tuple = ()) -> List[AlarmEscalation]:
+        conn = _connect(self.db_path)
+        try:
+            rows = conn.execute(f'SELECT * FROM alarm_escalations {where}', params).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_escalation(row) for row in rows]
+    
+    def _set_status(self, alarm_id: str, level: int, status: str, timestamp_column: str) -> bool:
+        """Single-row status update by primary key."""
+        conn = _connect(self.db_path)
+        try:
+            updated = conn.execute(
+                f'UPDATE alarm_escalations SET status = ?, {timestamp_column} = ? WHERE alarm_id = ? AND level = ?',
+                (status, _to_iso(datetime.now()), alarm_id, level)
+            ).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return updated > 0
     
     def create_escalation_plan(
         self,
@@ -505,52 +748,67 @@ class AlarmEscalationService:
             )
             escalations.append(escalation)
         
-        if alarm_id not in self.escalations:
-            self.escalations[alarm_id] = []
-        self.escalations[alarm_id].extend(escalations)
-        self._save_escalations()
+        self._upsert_escalations(escalations)
         
         logger.info(f"Created escalation plan for alarm {alarm_id}: {len(escalations)} levels")
         return escalations
     
-    def get_pending_escalations(self) -> List[AlarmEscalation]:
-        """Get pending escalations."""
-        pending = []
-        for escalations in self.escalations.values():
-            for escalation in escalations:
-                if escalation.status == "pending":
-                    # Check if delay time has passed
-                    if datetime.now() >= escalation.created_at + timedelta(minutes=escalation.delay_minutes):
-                        pending.append(escalation)
-        return pending
+    def get_pending_escalations(self, due_only: bool = True) -> List[AlarmEscalation]:
+        """Get pending escalations (only those whose delay has passed unless due_only=False)."""
+        if due_only:
+            return self._query("WHERE status = 'pending' AND due_at <= ? ORDER BY due_at", (datetime.now().timestamp(),))
+        return self._query("WHERE status = 'pending' ORDER BY due_at")
+    
+    def claim_escalation(self, alarm_id: str, level: int) -> bool:
+        """
+        Atomically move a pending escalation to 'sending' so only one process sends it.
+        A claim older than ESCALATION_CLAIM_TIMEOUT_SECONDS (sender died) can be taken over.
+        """
+        now = datetime.now().timestamp()
+        conn = _connect(self.db_path)
+        try:
+            claimed = conn.execute(
+                "UPDATE alarm_escalations SET status = 'sending', claimed_at = ? "
+                "WHERE alarm_id = ? AND level = ? "
+                "AND (status = 'pending' OR (status = 'sending' AND claimed_at < ?))",
+                (now, alarm_id, level, now - ESCALATION_CLAIM_TIMEOUT_SECONDS)
+            ).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return claimed > 0
+    
+    def release_escalation(self, alarm_id: str, level: int) -> bool:
+        """Return a claimed escalation to 'pending' after a failed send."""
+        conn = _connect(self.db_path)
+        try:
+            released = conn.execute(
+                "UPDATE alarm_escalations SET status = 'pending', claimed_at = NULL "
+                "WHERE alarm_id = ? AND level = ? AND status = 'sending'",
+                (alarm_id, level)
+            ).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return released > 0
     
     def mark_escalation_sent(self, alarm_id: str, level: int) -> bool:
         """Mark escalation as sent."""
-        if alarm_id in self.escalations:
-            for escalation in self.escalations[alarm_id]:
-                if escalation.level == level:
-                    escalation.status = "sent"
-                    escalation.sent_at = datetime.now()
-                    self._save_escalations()
-                    logger.info(f"Escalation sent: {alarm_id} level {level}")
-                    return True
+        if self._set_status(alarm_id, level, "sent", "sent_at"):
+            logger.info(f"Escalation sent: {alarm_id} level {level}")
+            return True
         return False
     
     def mark_escalation_acknowledged(self, alarm_id: str, level: int) -> bool:
         """Mark escalation as acknowledged."""
-        if alarm_id in self.escalations:
-            for escalation in self.escalations[alarm_id]:
-                if escalation.level == level:
-                    escalation.status = "acknowledged"
-                    escalation.acknowledged_at = datetime.now()
-                    self._save_escalations()
-                    logger.info(f"Escalation acknowledged: {alarm_id} level {level}")
-                    return True
+        if self._set_status(alarm_id, level, "acknowledged", "acknowledged_at"):
+            logger.info(f"Escalation acknowledged: {alarm_id} level {level}")
+            return True
         return False
     
     def get_escalations_for_alarm(self, alarm_id: str) -> List[AlarmEscalation]:
         """Get escalations for specific alarm."""
-        return self.escalations.get(alarm_id, [])
+        return self._query('WHERE alarm_id = ? ORDER BY level', (alarm_id,))
 
 # Global service instances
 template_service = AlarmTemplateService()
@@ -560,5 +818,3 @@ escalation_service = AlarmEscalationService()
 def get_alarm_services():
     """Return alarm-related services."""
     return template_service, recipient_service, escalation_service
-
-
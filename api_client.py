@@ -4,6 +4,8 @@ import requests
 from typing import Dict, Any
 import logging
 
+from settings_service import use_db_direct_access
+
 logger = logging.getLogger(__name__)
 
 class APIClient:
@@ -58,24 +60,8 @@ def fetch_client_information(site):
     Returns:
         (Success status, client list)
     """
-    import os
-    import sqlite3
-    
     # Check DB direct access mode
-    use_db_direct = False
-    try:
-        conn = sqlite3.connect('progress_report.db', timeout=10)
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result and result[0]:
-            use_db_direct = result[0].lower() == 'true'
-        else:
-            use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-    except:
-        use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+    use_db_direct = use_db_direct_access()
     
     # DB direct access mode (recommended - query latest data each time)
     if use_db_direct:
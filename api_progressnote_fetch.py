@@ -20,6 +20,7 @@ def _range_last_n_days(days: int) -> tuple[datetime, datetime]:
     end = datetime.combine(today, datetime.max.time())
     return start, end
 from config import SITE_SERVERS, API_HEADERS, get_api_headers
+from settings_service import use_db_direct_access
 
 # Logging configuration
 logger = logging.getLogger(__name__)
@@ -446,7 +447,7 @@ def _resolve_event_types_to_ids(connector, event_types: List[str]) -> Optional[L
     return ids if ids else None
 
 
-def fetch_progress_notes_for_site(site: str, days: int = 14, event_types: List[str] = None, year: int = None, month: int = None, client_service_id: int = None, limit: Optional[int] = None, offset: int = 0, return_total: bool = False) -> tuple[bool, Optional[List[Dict[str, Any]]], Optional[int]]:
+def fetch_progress_notes_for_site(site: str, days: int = 14, event_types: List[str] = None, year: int = None, month: int = None, client_service_id: int = None, limit: Optional[int] = None, offset: int = 0, return_total: bool = False, cursor: Optional[str] = None, include_notes: bool = True) -> tuple[bool, Optional[List[Dict[str, Any]]], Optional[int]]:
     """
     Convenience function to fetch progress notes for a specific site (DB direct access or API)
     
@@ -460,33 +461,21 @@ def fetch_progress_notes_for_site(site: str, days: int = 14, event_types: List[s
         limit: Max rows to return (default 500 when not set)
         offset: Rows to skip for server pagination
         return_total: If True, return (success, notes, total_count); total_count only in DB mode when set
+        cursor: Keyset cursor from manad_db_connector.encode_progress_note_cursor(last note of the
+            previous page); DB mode only, replaces offset
+        include_notes: If False, return note headers only (DB mode); bodies are loaded on demand
+            with fetch_progress_note_bodies_for_site
         
     Returns:
         (success status, data list or None, total_count or None)
     """
-    import sqlite3
-    import os
-    
     # Check DB direct access mode
-    use_db_direct = False
-    try:
-        conn = sqlite3.connect('progress_report.db', timeout=10)
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result and result[0]:
-            use_db_direct = result[0].lower() == 'true'
-        else:
-            use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-    except:
-        use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+    use_db_direct = use_db_direct_access()
     
     # DB direct access mode
     if use_db_direct:
         try:
-            from manad_db_connector import MANADDBConnector
+            from manad_db_connector import MANADDBConnector, decode_progress_note_cursor
             from datetime import datetime, timedelta
             
             logger.info(f"🔌 DB direct access mode: Progress Notes query - {site}")
@@ -507,12 +496,14 @@ def fetch_progress_notes_for_site(site: str, days: int = 14, event_types: List[s
             
             effective_limit = limit if limit is not None else 500
 
-            logger.info(f"🔍 [FILTER] Calling connector.fetch_progress_notes - client_service_id={client_service_id}, offset={offset}, return_total={return_total}, event_type_ids={event_type_ids}")
+            after = decode_progress_note_cursor(cursor) if cursor else None
+
+            logger.info(f"🔍 [FILTER] Calling connector.fetch_progress_notes - client_service_id={client_service_id}, offset={offset}, cursor={cursor}, return_total={return_total}, event_type_ids={event_type_ids}")
             logger.info(f"🔍 [FILTER] Parameters: start_date={start_date}, end_date={end_date}, limit={effective_limit}, client_service_id={client_service_id}")
             progress_success, progress_notes, total_count = connector.fetch_progress_notes(
                 start_date, end_date, limit=effective_limit, offset=offset,
                 progress_note_event_type_ids=event_type_ids, client_service_id=client_service_id,
-                return_total=return_total
+                return_total=return_total, after=after, include_notes=include_notes
             )
             logger.info(f"🔍 [FILTER] connector.fetch_progress_notes result - success={progress_success}, notes_count={len(progress_notes) if progress_notes else 0}, total_count={total_count}")
             
@@ -571,6 +562,38 @@ def fetch_progress_notes_for_site(site: str, days: int = 14, event_types: List[s
         logger.error(f"Error creating client for site {site}: {str(e)}")
         return (False, None, None)
 
+def fetch_progress_note_bodies_for_site(site: str, progress_note_ids: List[int]) -> tuple[bool, Optional[Dict[int, Any]]]:
+    """
+    Note bodies for notes fetched headers-only (DB direct access mode)
+    
+    Returns:
+        (success status, {progress note id: NotesPlainText} or None)
+    """
+    from manad_db_connector import MANADDBConnector
+    
+    if not progress_note_ids:
+        return (True, {})
+    return MANADDBConnector(site).fetch_progress_note_bodies(progress_note_ids)
+
+def fetch_progress_note_counts_for_site(site: str, days: int = 30, group_by: tuple = ('day',)) -> tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Grouped progress note counts for the last N days (DB direct access mode only)
+    
+    Returns:
+        (success status, counts from MANADDBConnector.fetch_progress_note_counts or None);
+        (False, None) in API mode, where callers fall back to counting fetched notes
+    """
+    if not use_db_direct_access():
+        return (False, None)
+    from manad_db_connector import MANADDBConnector
+    
+    start_date, end_date = _range_last_n_days(days)
+    try:
+        return MANADDBConnector(site).fetch_progress_note_counts(start_date, end_date, group_by=group_by)
+    except ImportError as e:
+        logger.error(f"Progress note counts unavailable for {site}: {e}")
+        return (False, None)
+
 def fetch_progress_notes_for_all_sites(days: int = 14) -> Dict[str, tuple[bool, Optional[List[Dict[str, Any]]]]]:
     """
     Function to fetch progress notes for all sites
@@ -722,6 +745,86 @@ def find_resident_of_day_event_types_from_api(event_types: List[Dict[str, Any]])
     return rn_en_id, pca_id
 """
 
+def build_residence_of_day_status(client_list, all_resident_notes, event_type_mapping):
+    """
+    Match Resident of the day notes to residences (note ClientId == residence ClientRecordId).
+    
+    Notes are indexed by ClientId once, so matching is O(residents + notes).
+    
+    Args:
+        client_list (list): Client records (FirstName, Surname/LastName, ClientRecordId, ...)
+        all_resident_notes (list): RN/EN and PCA notes
+        event_type_mapping (dict): Note Id -> "RN/EN" or "PCA"
+    
+    Returns:
+        tuple: (residence_status, residence_client_mapping, matched_note_ids, unmatched_notes)
+    """
+    # Per-client RN/EN and PCA counts, built in one pass over the notes
+    counts_by_client = {}
+    for note in all_resident_notes:
+        counts = counts_by_client.setdefault(note.get('ClientId'), {"RN/EN": 0, "PCA": 0})
+        event_type_name = event_type_mapping.get(note.get('Id'))
+        if event_type_name in counts:
+            counts[event_type_name] += 1
+    
+    residence_status = {}
+    residence_client_mapping = {}
+    for residence in client_list:
+        if not isinstance(residence, dict):
+            continue
+        first_name = residence.get('FirstName', '')
+        surname = residence.get('Surname', '')
+        last_name = residence.get('LastName', '')
+        
+        # Create Residence name - combine FirstName and Surname/LastName
+        if first_name and surname:
+            residence_name = f"{first_name} {surname}"
+        elif first_name and last_name:
+            residence_name = f"{first_name} {last_name}"
+        elif first_name:
+            residence_name = first_name
+        else:
+            continue
+        
+        # Find Residence's ClientRecordId (different field names used in real-time API data)
+        residence_client_record_id = residence.get('ClientRecordId') or residence.get('Id') or residence.get('ClientId')
+        residence_client_mapping[residence_name] = residence_client_record_id
+        
+        # Display all residents on screen (even if no notes)
+        counts = counts_by_client.get(residence_client_record_id) if residence_client_record_id else None
+        rn_en_count = counts["RN/EN"] if counts else 0
+        pca_count = counts["PCA"] if counts else 0
+        residence_status[residence_name] = {
+            'residence_name': residence_name,
+            'preferred_name': residence.get('PreferredName', ''),
+            'wing_name': residence.get('WingName', ''),
+            'rn_en_has_note': rn_en_count > 0,
+            'pca_has_note': pca_count > 0,
+            'rn_en_count': rn_en_count,
+            'pca_count': pca_count,
+            'total_count': rn_en_count + pca_count
+        }
+    
+    # Notes whose ClientId is not a (listed) residence's ClientRecordId
+    residence_client_ids = {client_id for client_id in residence_client_mapping.values() if client_id}
+    matched_note_ids = set()
+    unmatched_notes = []
+    for note in all_resident_notes:
+        note_client_id = note.get('ClientId')
+        if note_client_id in residence_client_ids:
+            matched_note_ids.add(note.get('Id'))
+        else:
+            unmatched_notes.append({
+                'note_id': note.get('Id'),
+                'client_id': note_client_id,
+                'event_type': note.get('ProgressNoteEventType', {}).get('Description', 'Unknown'),
+                'event_date': note.get('EventDate', 'Unknown'),
+                'residence_name': 'Unknown',
+                'residence_client_record_id': 'Unknown'
+            })
+    
+    return residence_status, residence_client_mapping, matched_note_ids, unmatched_notes
+
 def fetch_residence_of_day_notes_with_client_data(site, year, month):
     """
     Fetch "Resident of the day" notes for a specific year/month with client data.
@@ -808,148 +911,45 @@ def fetch_residence_of_day_notes_with_client_data(site, year, month):
             logger.warning(f"No Resident of the day event types found for {site}")
             return {}
         
-        # 4. Fetch all Resident of the day notes at once (optimization)
-        all_resident_notes = []
-        event_type_mapping = {}  # Mapping to classify notes as RN/EN and PCA
-        rn_en_notes = []  # Store RN/EN notes separately
-        pca_notes = []    # Store PCA notes separately
-        
-        # First, try to find data from saved files
-        logs_dir = os.path.join(os.getcwd(), 'data')
-        timestamp_pattern = f"{year}_{month:02d}"
-        
-        # Find May data files (exact pattern matching)
-        rn_en_files = [f for f in os.listdir(logs_dir) if f.startswith(f'progress_notes_rn_en_{site}_{timestamp_pattern}_')]
-        pca_files = [f for f in os.listdir(logs_dir) if f.startswith(f'progress_notes_pca_{site}_{timestamp_pattern}_')]
-        
-        logger.info(f"Looking for files with pattern: {timestamp_pattern}")
-        logger.info(f"Site: {site}")
-        logger.info(f"All files in data directory: {[f for f in os.listdir(logs_dir) if 'Parafield' in f and '2025_05' in f]}")
-        logger.info(f"Found RN/EN files: {rn_en_files}")
-        logger.info(f"Found PCA files: {pca_files}")
-        
-        if rn_en_files and pca_files:
-            # Select most recent file
-            rn_en_files.sort(reverse=True)
-            pca_files.sort(reverse=True)
-            
-            try:
-                # Load RN/EN notes
-                rn_en_filepath = os.path.join(logs_dir, rn_en_files[0])
-                with open(rn_en_filepath, 'r', encoding='utf-8') as f:
-                    rn_en_notes = json.load(f)
-                logger.info(f"Loaded {len(rn_en_notes)} RN/EN notes from file: {rn_en_files[0]}")
-                
-                # Load PCA notes
-                pca_filepath = os.path.join(logs_dir, pca_files[0])
-                with open(pca_filepath, 'r', encoding='utf-8') as f:
-                    pca_notes = json.load(f)
-                logger.info(f"Loaded {len(pca_notes)} PCA notes from file: {pca_files[0]}")
-                
-                # Combine all notes
-                all_resident_notes = rn_en_notes + pca_notes
-                
-                # Classify notes by type
-                for note in rn_en_notes:
-                    event_type_mapping[note.get('Id')] = "RN/EN"
-                for note in pca_notes:
-                    event_type_mapping[note.get('Id')] = "PCA"
-                
-                logger.info(f"Successfully loaded {len(all_resident_notes)} notes from saved files")
-                
-            except Exception as e:
-                logger.error(f"Failed to load notes from files: {str(e)}")
-                # Fetch from API if file load fails
-                all_resident_notes = []
-                rn_en_notes = []
-                pca_notes = []
-        else:
-            logger.info(f"No saved files found for {site} {year}/{month}, fetching from API")
+        # 4. Resident of the day notes for the month (month snapshot cache; closed months are never re-fetched)
+        event_type_ids = [event_type_id for event_type_id in (rn_en_id, pca_id) if event_type_id]
+        debug_info['steps'].append({
+            'step': 'fetch_notes_snapshot',
+            'event_type_ids': event_type_ids,
+            'notes_fetched': 0
+        })
         
-        # Fetch from API if no saved files or load failed
-        if not all_resident_notes:
-            # Fetch all at once including RN/EN, PCA event type IDs
-            event_type_ids = []
-            if rn_en_id:
-                event_type_ids.append(rn_en_id)
-            if pca_id:
-                event_type_ids.append(pca_id)
-            
-            if event_type_ids:
-                # Fetch all event types at once
-                client = ProgressNoteFetchClient(site)
-            
-            # Set date range slightly wider (include 1 day before and after)
-            extended_start_date = start_date - timedelta(days=1)
-            extended_end_date = end_date + timedelta(days=1)
-            
-            debug_info['steps'].append({
-                'step': 'fetch_notes_optimized',
-                'event_type_ids': event_type_ids,
-                'date_range': f"{extended_start_date.isoformat()} to {extended_end_date.isoformat()}",
-                'notes_fetched': 0
-            })
-            
-            # Individual calls per event type (if API doesn't support OR conditions)
+        def fetch_month_span(span_start, span_end):
+            """Fetch RN/EN and PCA notes for a span (called by the snapshot cache for missing/stale spans)"""
+            client = ProgressNoteFetchClient(site)
+            fetched = {}
             for event_type_id in event_type_ids:
+                # Individual calls per event type (API doesn't support OR conditions)
                 success, notes = client.fetch_progress_notes(
-                    start_date=extended_start_date,
-                    end_date=extended_end_date,
+                    start_date=span_start,
+                    end_date=span_end,
                     limit=None,  # No limit
                     progress_note_event_type_id=event_type_id
                 )
-                
-                if success and notes is not None:
-                    all_resident_notes.extend(notes)
-                    
-                    # Classify notes by type
-                    if event_type_id == rn_en_id:
-                        event_type_name = "RN/EN"
-                    elif event_type_id == pca_id:
-                        event_type_name = "PCA"
-                    else:
-                        event_type_name = "Unknown"
-                    
-                    for note in notes:
-                        event_type_mapping[note.get('Id')] = event_type_name
-                    
-                    # Store notes separately by Event Type
-                    if event_type_name == "RN/EN":
-                        rn_en_notes = notes
-                    elif event_type_name == "PCA":
-                        pca_notes = notes
-                    
-                    debug_info['steps'][-1]['notes_fetched'] += len(notes)
-                    logger.info(f"Fetched {len(notes)} notes for event type ID {event_type_id} ({event_type_name})")
-                else:
+                if not success or notes is None:
                     logger.warning(f"No notes found for EventType ID {event_type_id}")
-        else:
-            logger.warning("No Resident of the day event types found")
-        
-        # Save Progress Notes to JSON file (separated by Event Type)
-        try:
-            logs_dir = os.path.join(os.getcwd(), 'data')
-            os.makedirs(logs_dir, exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            # Save RN/EN notes
-            if rn_en_notes:
-                rn_en_filename = f'progress_notes_rn_en_{site}_{year}_{month:02d}_{timestamp}.json'
-                rn_en_filepath = os.path.join(logs_dir, rn_en_filename)
-                with open(rn_en_filepath, 'w', encoding='utf-8') as f:
-                    json.dump(rn_en_notes, f, indent=2, ensure_ascii=False)
-                logger.info(f"RN/EN notes saved to: {rn_en_filename}")
-            
-            # Save PCA notes
-            if pca_notes:
-                pca_filename = f'progress_notes_pca_{site}_{year}_{month:02d}_{timestamp}.json'
-                pca_filepath = os.path.join(logs_dir, pca_filename)
-                with open(pca_filepath, 'w', encoding='utf-8') as f:
-                    json.dump(pca_notes, f, indent=2, ensure_ascii=False)
-                logger.info(f"PCA notes saved to: {pca_filename}")
-                
-        except Exception as e:
-            logger.error(f"Failed to save progress notes to JSON files: {str(e)}")
+                    return False, [], []
+                fetched[event_type_id] = notes
+                debug_info['steps'][-1]['notes_fetched'] += len(notes)
+                logger.info(f"Fetched {len(notes)} notes for event type ID {event_type_id} ({span_start} - {span_end})")
+            return True, fetched.get(rn_en_id, []) if rn_en_id else [], fetched.get(pca_id, []) if pca_id else []
+        
+        from rod_snapshot_cache import rod_snapshot_cache
+        month_notes = rod_snapshot_cache.get_month(site, year, month, fetch_month_span)
+        rn_en_notes, pca_notes = month_notes if month_notes else ([], [])
+        all_resident_notes = rn_en_notes + pca_notes
+        
+        # Classify notes by type
+        event_type_mapping = {}
+        for note in rn_en_notes:
+            event_type_mapping[note.get('Id')] = "RN/EN"
+        for note in pca_notes:
+            event_type_mapping[note.get('Id')] = "PCA"
         
         debug_info['steps'].append({
             'step': 'total_notes_summary',
@@ -969,9 +969,6 @@ def fetch_residence_of_day_notes_with_client_data(site, year, month):
                 })
         
         # 5. Match notes by Residence and create status
-        residence_status = {}
-        unmatched_notes = []  # Track notes that failed to match
-        
         # Check and process client data structure
         if isinstance(client_data, dict):
             client_list = list(client_data.values()) if client_data else []
@@ -982,107 +979,13 @@ def fetch_residence_of_day_notes_with_client_data(site, year, month):
             client_list = []
         
         logger.info(f"Processing {len(client_list)} clients")
-        
-        # First, collect ClientRecordId for all residences
-        residence_client_mapping = {}
-        for residence in client_list:
-            if isinstance(residence, dict):
-                first_name = residence.get('FirstName', '')
-                surname = residence.get('Surname', '')
-                last_name = residence.get('LastName', '')
-                preferred_name = residence.get('PreferredName', '')
-                wing_name = residence.get('WingName', '')
-                
-                # Create Residence name - combine FirstName and Surname/LastName
-                if first_name and surname:
-                    residence_name = f"{first_name} {surname}"
-                elif first_name and last_name:
-                    residence_name = f"{first_name} {last_name}"
-                elif first_name:
-                    residence_name = first_name
-                else:
-                    continue
-                
-                # Find Residence's ClientRecordId (different field names used in real-time API data)
-                residence_client_record_id = residence.get('ClientRecordId') or residence.get('Id') or residence.get('ClientId')
-                
-                # Store mapping of Residence name and ClientRecordId
-                residence_client_mapping[residence_name] = residence_client_record_id
-                
-                # Display all residents on screen (even if no notes)
-                residence_notes = []
-                
-                if residence_client_record_id:
-                    # Find notes for that Residence (only matched notes)
-                    for note in all_resident_notes:
-                        note_client_id = note.get('ClientId')
-                        
-                        # Matching logic: match by ClientRecordId only
-                        if note_client_id == residence_client_record_id:
-                            residence_notes.append(note)
-                
-                # Add to residence_status even if no notes (display all residences)
-                
-
-                
-                # Create status by Residence (create even if no notes)
-                rn_en_has_note = False
-                pca_has_note = False
-                rn_en_count = 0
-                pca_count = 0
-                
-                for note in residence_notes:
-                    note_id = note.get('Id')
-                    event_type_name = event_type_mapping.get(note_id)
-                    
-                    if event_type_name == "RN/EN":
-                        rn_en_has_note = True
-                        rn_en_count += 1
-                    elif event_type_name == "PCA":
-                        pca_has_note = True
-                        pca_count += 1
-                
-                residence_status[residence_name] = {
-                    'residence_name': residence_name,
-                    'preferred_name': preferred_name,
-                    'wing_name': wing_name,
-                    'rn_en_has_note': rn_en_has_note,
-                    'pca_has_note': pca_has_note,
-                    'rn_en_count': rn_en_count,
-                    'pca_count': pca_count,
-                    'total_count': rn_en_count + pca_count
-                }
-        
-        # Calculate unmatched notes (efficient method)
-        matched_note_ids = set()
-        
         logger.info(f"Total notes to process: {len(all_resident_notes)}")
-        logger.info(f"Total residences available: {len(residence_client_mapping)}")
         
-        # Check which residence each note matches
-        for note in all_resident_notes:
-            note_client_id = note.get('ClientId')
-            note_matched = False
-            
-            # Compare with all residences' ClientRecordId
-            for residence_name, residence_client_record_id in residence_client_mapping.items():
-                if residence_client_record_id and note_client_id == residence_client_record_id:
-                    matched_note_ids.add(note.get('Id'))
-                    note_matched = True
-                    break
-            
-            # Add unmatched notes
-            if not note_matched:
-                unmatched_note_info = {
-                    'note_id': note.get('Id'),
-                    'client_id': note_client_id,
-                    'event_type': note.get('ProgressNoteEventType', {}).get('Description', 'Unknown'),
-                    'event_date': note.get('EventDate', 'Unknown'),
-                    'residence_name': 'Unknown',
-                    'residence_client_record_id': 'Unknown'
-                }
-                unmatched_notes.append(unmatched_note_info)
+        residence_status, residence_client_mapping, matched_note_ids, unmatched_notes = build_residence_of_day_status(
+            client_list, all_resident_notes, event_type_mapping
+        )
         
+        logger.info(f"Total residences available: {len(residence_client_mapping)}")
         logger.info(f"Matched notes: {len(matched_note_ids)}")
         logger.info(f"Unmatched notes: {len(unmatched_notes)}")
         
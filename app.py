@@ -8,7 +8,9 @@ from flask import (
     session, 
     jsonify, 
     send_from_directory,
-    make_response
+    make_response,
+    Response,
+    stream_with_context
 )
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 import os
@@ -45,6 +47,8 @@ from config_users import authenticate_user, get_user
 from config_env import get_flask_config, print_current_config, get_cache_policy
 from models import load_user, User
 from usage_logger import usage_logger
+from log_tail import tail_lines, read_lines_from, follow_lines
+from settings_service import use_db_direct_access
 from admin_api import admin_api
 from alarm_manager import get_alarm_manager
 from alarm_service import get_alarm_services
@@ -724,7 +728,7 @@ def get_logs():
         if os.path.exists(usage_log_dir):
             for root, dirs, files in os.walk(usage_log_dir):
                 for filename in files:
-                    if filename.endswith('.json'):
+                    if filename.endswith(('.jsonl', '.json')):
                         filepath = os.path.join(root, filename)
                         stat = os.stat(filepath)
                         # Display as relative path (unify Windows path separators to slashes)
@@ -744,6 +748,12 @@ def get_logs():
     except Exception as e:
         return jsonify({'error': f"Failed to query logs: {str(e)}"}), 500
 
+LOG_FOLLOW_POLL_SECONDS = 1.0
+# A follow stream holds a worker thread, so each response is short: EventSource
+# reconnects after LOG_FOLLOW_RETRY_MS and resumes from Last-Event-ID
+LOG_FOLLOW_MAX_SECONDS = 10
+LOG_FOLLOW_RETRY_MS = 1000
+
 @app.route('/api/logs/<path:filename>')
 def get_log_content(filename):
     """Query specific log file content"""
@@ -762,9 +772,12 @@ def get_log_content(filename):
         if not os.path.exists(filepath):
             return jsonify({'error': 'File not found'}), 404
         
+        lines = request.args.get('lines', 100, type=int)
+        lines = min(lines, 1000)  # Limit to max 1000 lines
+        
         # Check if JSON file
         if filename.endswith('.json'):
-            # Parse and display JSON file nicely
+            # Legacy JSON array usage log (no longer appended; convert_usage_logs.py turns it into JSONL)
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
@@ -772,10 +785,6 @@ def get_log_content(filename):
             formatted_json = json.dumps(data, indent=2, ensure_ascii=False)
             content_lines = formatted_json.split('\n')
             
-            # Read last N lines
-            lines = request.args.get('lines', 100, type=int)
-            lines = min(lines, 1000)  # Limit to max 1000 lines
-            
             if len(content_lines) > lines:
                 content_lines = content_lines[-lines:]
             
@@ -787,23 +796,72 @@ def get_log_content(filename):
                 'content': content_lines,
                 'timestamp': get_australian_time().isoformat()
             })
-        else:
-            # General log file case
-            lines = request.args.get('lines', 100, type=int)
-            lines = min(lines, 1000)  # Limit to max 1000 lines
-            
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                all_lines = f.readlines()
-                content_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        
+        # Text logs and JSONL usage logs are read by byte offset, never as a whole:
+        #   (default)     last N lines
+        #   before=<pos>  N lines ending at byte offset pos (page backwards via prev_offset)
+        #   offset=<pos>  N lines starting at byte offset pos (page forwards via next_offset)
+        #   follow=1      Server-Sent Events stream of lines appended after offset (or EOF)
+        is_jsonl = filename.endswith('.jsonl')
+        
+        def render(raw_lines):
+            if not is_jsonl:
+                return raw_lines
+            # One pretty-printed entry per JSONL line, as the viewer shows JSON logs
+            rendered = []
+            for line in raw_lines:
+                if not line.strip():
+                    continue
+                try:
+                    rendered.extend(json.dumps(json.loads(line), indent=2, ensure_ascii=False).split('\n'))
+                except json.JSONDecodeError:
+                    rendered.append(line)
+            return rendered
+        
+        if request.args.get('follow') in ('1', 'true'):
+            # EventSource resends the last event id (a byte offset) when it reconnects
+            start = request.headers.get('Last-Event-ID', type=int)
+            if start is None:
+                start = request.args.get('offset', type=int)
+            if start is None:
+                start = os.path.getsize(filepath)
+            
+            def stream():
+                yield f"retry: {LOG_FOLLOW_RETRY_MS}\n\n"
+                for new_lines, next_offset, reset in follow_lines(filepath, start, poll_seconds=LOG_FOLLOW_POLL_SECONDS,
+                                                                  max_seconds=LOG_FOLLOW_MAX_SECONDS):
+                    if new_lines or reset:
+                        payload = json.dumps({'content': render(new_lines), 'reset': reset,
+                                              'next_offset': next_offset}, ensure_ascii=False)
+                        yield f"id: {next_offset}\ndata: {payload}\n\n"
+                    else:
+                        yield ": keep-alive\n\n"
             
-            return jsonify({
-                'filename': filename,
-                'type': 'text',
-                'lines': len(content_lines),
-                'total_lines': len(all_lines),
-                'content': [line.rstrip() for line in content_lines],
-                'timestamp': get_australian_time().isoformat()
-            })
+            return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        
+        offset = request.args.get('offset', type=int)
+        if offset is not None:
+            raw_lines, next_offset = read_lines_from(filepath, max(0, offset), lines)
+            start_offset = max(0, offset)
+        else:
+            raw_lines, start_offset, next_offset = tail_lines(filepath, lines, request.args.get('before', type=int))
+        
+        content_lines = render(raw_lines)
+        return jsonify({
+            'filename': filename,
+            'type': 'jsonl' if is_jsonl else 'text',
+            'lines': len(content_lines),
+            'entries': len(raw_lines),
+            # Only known without a full scan when the page reaches the start of the file
+            'total_lines': len(raw_lines) if start_offset == 0 and next_offset >= os.path.getsize(filepath) else None,
+            'content': content_lines,
+            'offset': start_offset,
+            'prev_offset': start_offset if start_offset > 0 else None,
+            'next_offset': next_offset,
+            'size': os.path.getsize(filepath),
+            'timestamp': get_australian_time().isoformat()
+        })
     except Exception as e:
         return jsonify({'error': f"Failed to query log content: {str(e)}"}), 500
 
@@ -1026,23 +1084,7 @@ def login():
                     
                     # 3-2. Collect Progress Notes data (cache not needed in DB direct access mode)
                     # Check DB direct access mode
-                    import sqlite3
-                    import os
-                    
-                    use_db_direct = False
-                    try:
-                        conn = sqlite3.connect('progress_report.db', timeout=10)
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-                        result = cursor.fetchone()
-                        conn.close()
-                        
-                        if result and result[0]:
-                            use_db_direct = result[0].lower() == 'true'
-                        else:
-                            use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-                    except:
-                        use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+                    use_db_direct = use_db_direct_access()
                     
                     if use_db_direct:
                         # DB direct access mode: cache not needed - query directly when needed
@@ -1544,180 +1586,188 @@ def get_edenfield_stats():
         sites = ['Parafield Gardens', 'Nerrilda', 'Ramsay', 'West Park', 'Yankalilla']
         all_stats = []
         
-        for site_name in sites:
-            try:
-                from manad_db_connector import MANADDBConnector
-                connector = MANADDBConnector(site_name)
+        from manad_db_connector import MANADDBConnector, run_for_sites
+        
+        def collect_site_stats(site_name):
+            """Run all stats queries for one site (executed concurrently per site)"""
+            connector = MANADDBConnector(site_name)
+            
+            with connector.get_connection() as conn:
+                cursor = conn.cursor()
                 
-                with connector.get_connection() as conn:
-                    cursor = conn.cursor()
-                    
-                    site_stats = {'site': site_name}
-                    
-                    # 1. Client count (current residents only - active Clients where ClientService.EndDate is NULL)
+                site_stats = {'site': site_name}
+                
+                # 1. Client count (current residents only - active Clients where ClientService.EndDate is NULL)
+                cursor.execute("""
+                    SELECT COUNT(DISTINCT c.Id) 
+                    FROM Client c
+                    INNER JOIN ClientService cs ON c.MainClientServiceId = cs.Id
+                    WHERE c.IsDeleted = 0 
+                    AND cs.IsDeleted = 0
+                    AND cs.EndDate IS NULL
+                """)
+                site_stats['total_persons'] = cursor.fetchone()[0]
+                
+                # 2. AdverseEvent (Incident) statistics - within selected period
+                # StatusEnumId: 0=Open, 1=InProgress, 2=Closed
+                if period == 'today':
                     cursor.execute("""
-                        SELECT COUNT(DISTINCT c.Id) 
-                        FROM Client c
-                        INNER JOIN ClientService cs ON c.MainClientServiceId = cs.Id
-                        WHERE c.IsDeleted = 0 
-                        AND cs.IsDeleted = 0
-                        AND cs.EndDate IS NULL
+                        SELECT 
+                            COUNT(*) as total,
+                            SUM(CASE WHEN StatusEnumId = 0 THEN 1 ELSE 0 END) as open_count,
+                            SUM(CASE WHEN StatusEnumId = 2 THEN 1 ELSE 0 END) as closed_count,
+                            SUM(CASE WHEN IsAmbulanceCalled = 1 THEN 1 ELSE 0 END) as ambulance,
+                            SUM(CASE WHEN IsAdmittedToHospital = 1 THEN 1 ELSE 0 END) as hospital
+                        FROM AdverseEvent
+                        WHERE IsDeleted = 0
+                        AND CAST(Date AS DATE) = CAST(GETDATE() AS DATE)
                     """)
-                    site_stats['total_persons'] = cursor.fetchone()[0]
-                    
-                    # 2. AdverseEvent (Incident) statistics - within selected period
-                    # StatusEnumId: 0=Open, 1=InProgress, 2=Closed
-                    if period == 'today':
-                        cursor.execute("""
-                            SELECT 
-                                COUNT(*) as total,
-                                SUM(CASE WHEN StatusEnumId = 0 THEN 1 ELSE 0 END) as open_count,
-                                SUM(CASE WHEN StatusEnumId = 2 THEN 1 ELSE 0 END) as closed_count,
-                                SUM(CASE WHEN IsAmbulanceCalled = 1 THEN 1 ELSE 0 END) as ambulance,
-                                SUM(CASE WHEN IsAdmittedToHospital = 1 THEN 1 ELSE 0 END) as hospital
-                            FROM AdverseEvent
-                            WHERE IsDeleted = 0
-                            AND CAST(Date AS DATE) = CAST(GETDATE() AS DATE)
-                        """)
-                    else:
-                        cursor.execute(f"""
-                            SELECT 
-                                COUNT(*) as total,
-                                SUM(CASE WHEN StatusEnumId = 0 THEN 1 ELSE 0 END) as open_count,
-                                SUM(CASE WHEN StatusEnumId = 2 THEN 1 ELSE 0 END) as closed_count,
-                                SUM(CASE WHEN IsAmbulanceCalled = 1 THEN 1 ELSE 0 END) as ambulance,
-                                SUM(CASE WHEN IsAdmittedToHospital = 1 THEN 1 ELSE 0 END) as hospital
-                            FROM AdverseEvent
-                            WHERE IsDeleted = 0
-                            AND Date >= {date_filter}
-                        """)
-                    row = cursor.fetchone()
-                    site_stats['incidents'] = {
-                        'total': row[0] or 0,
-                        'open': row[1] or 0,
-                        'closed': row[2] or 0,
-                        'ambulance': row[3] or 0,
-                        'hospital': row[4] or 0
-                    }
-                    site_stats['incidents_30days'] = row[0] or 0  # Incidents within selected period
-                    
-                    # 3. Fall incident count - within selected period
-                    if period == 'today':
-                        cursor.execute("""
-                            SELECT COUNT(*) FROM AdverseEvent ae
-                            JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
-                            JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
-                            WHERE ae.IsDeleted = 0 AND at.Description LIKE '%Fall%'
-                            AND CAST(ae.Date AS DATE) = CAST(GETDATE() AS DATE)
-                        """)
-                    else:
-                        cursor.execute(f"""
-                            SELECT COUNT(*) FROM AdverseEvent ae
-                            JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
-                            JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
-                            WHERE ae.IsDeleted = 0 AND at.Description LIKE '%Fall%'
-                            AND ae.Date >= {date_filter}
-                        """)
-                    site_stats['fall_count'] = cursor.fetchone()[0]
-                    
-                    # 3-1. Skin & Wound incident count - within selected period
-                    if period == 'today':
-                        cursor.execute("""
-                            SELECT COUNT(*) FROM AdverseEvent ae
-                            JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
-                            JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
-                            WHERE ae.IsDeleted = 0 AND (at.Description LIKE '%Skin%' OR at.Description LIKE '%Wound%')
-                            AND CAST(ae.Date AS DATE) = CAST(GETDATE() AS DATE)
-                        """)
-                    else:
-                        cursor.execute(f"""
-                            SELECT COUNT(*) FROM AdverseEvent ae
-                            JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
-                            JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
-                            WHERE ae.IsDeleted = 0 AND (at.Description LIKE '%Skin%' OR at.Description LIKE '%Wound%')
-                            AND ae.Date >= {date_filter}
-                        """)
-                    site_stats['skin_wound_count'] = cursor.fetchone()[0]
-                    
-                    # 4. Progress Note count - within selected period
-                    if period == 'today':
-                        cursor.execute("""
-                            SELECT COUNT(*) FROM ProgressNote 
-                            WHERE IsDeleted = 0 
-                            AND CAST(Date AS DATE) = CAST(GETDATE() AS DATE)
-                        """)
-                    else:
-                        cursor.execute(f"""
-                            SELECT COUNT(*) FROM ProgressNote 
-                            WHERE IsDeleted = 0 
-                            AND Date >= {date_filter}
-                        """)
-                    site_stats['progress_notes_30days'] = cursor.fetchone()[0]
-                    
-                    # 5. Activity count - within selected period
-                    if period == 'today':
-                        cursor.execute("""
-                            SELECT COUNT(*) FROM ActivityEvent 
-                            WHERE IsDeleted = 0 
-                            AND CAST(StartDate AS DATE) = CAST(GETDATE() AS DATE)
-                        """)
-                    else:
-                        cursor.execute(f"""
-                            SELECT COUNT(*) FROM ActivityEvent 
-                            WHERE IsDeleted = 0 
-                            AND StartDate >= {date_filter}
-                        """)
-                    site_stats['activities_30days'] = cursor.fetchone()[0]
-                    
-                    # 6. Activity distribution by type (top 5) - within selected period
-                    if period == 'today':
-                        cursor.execute("""
-                            SELECT TOP 5 a.Description, COUNT(ae.Id) as cnt
-                            FROM ActivityEvent ae
-                            INNER JOIN Activity a ON ae.ActivityId = a.Id
-                            WHERE ae.IsDeleted = 0
-                            AND CAST(ae.StartDate AS DATE) = CAST(GETDATE() AS DATE)
-                            GROUP BY a.Description
-                            ORDER BY cnt DESC
-                        """)
-                    elif period == 'week':
-                        cursor.execute("""
-                            SELECT TOP 5 a.Description, COUNT(ae.Id) as cnt
-                            FROM ActivityEvent ae
-                            INNER JOIN Activity a ON ae.ActivityId = a.Id
-                            WHERE ae.IsDeleted = 0
-                            AND ae.StartDate >= DATEADD(day, -7, GETDATE())
-                            GROUP BY a.Description
-                            ORDER BY cnt DESC
-                        """)
-                    else:  # month
-                        cursor.execute("""
-                            SELECT TOP 5 a.Description, COUNT(ae.Id) as cnt
-                            FROM ActivityEvent ae
-                            INNER JOIN Activity a ON ae.ActivityId = a.Id
-                            WHERE ae.IsDeleted = 0
-                            AND ae.StartDate >= DATEADD(day, -30, GETDATE())
-                            GROUP BY a.Description
-                            ORDER BY cnt DESC
-                        """)
-                    site_stats['activity_types'] = [{'name': row[0], 'count': row[1]} for row in cursor.fetchall()]
-                    
-                    all_stats.append(site_stats)
-                    
-            except Exception as site_error:
-                logger.warning(f"Failed to fetch stats for site {site_name}: {site_error}")
-                all_stats.append({
-                    'site': site_name,
-                    'error': str(site_error),
-                    'total_persons': 0,
-                    'incidents': {'total': 0, 'open': 0, 'closed': 0, 'ambulance': 0, 'hospital': 0},
-                    'incidents_30days': 0,
-                    'fall_count': 0,
-                    'skin_wound_count': 0,
-                    'progress_notes_30days': 0,
-                    'activities_30days': 0,
-                    'activity_types': []
-                })
+                else:
+                    cursor.execute(f"""
+                        SELECT 
+                            COUNT(*) as total,
+                            SUM(CASE WHEN StatusEnumId = 0 THEN 1 ELSE 0 END) as open_count,
+                            SUM(CASE WHEN StatusEnumId = 2 THEN 1 ELSE 0 END) as closed_count,
+                            SUM(CASE WHEN IsAmbulanceCalled = 1 THEN 1 ELSE 0 END) as ambulance,
+                            SUM(CASE WHEN IsAdmittedToHospital = 1 THEN 1 ELSE 0 END) as hospital
+                        FROM AdverseEvent
+                        WHERE IsDeleted = 0
+                        AND Date >= {date_filter}
+                    """)
+                row = cursor.fetchone()
+                site_stats['incidents'] = {
+                    'total': row[0] or 0,
+                    'open': row[1] or 0,
+                    'closed': row[2] or 0,
+                    'ambulance': row[3] or 0,
+                    'hospital': row[4] or 0
+                }
+                site_stats['incidents_30days'] = row[0] or 0  # Incidents within selected period
+                
+                # 3. Fall incident count - within selected period
+                if period == 'today':
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM AdverseEvent ae
+                        JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
+                        JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
+                        WHERE ae.IsDeleted = 0 AND at.Description LIKE '%Fall%'
+                        AND CAST(ae.Date AS DATE) = CAST(GETDATE() AS DATE)
+                    """)
+                else:
+                    cursor.execute(f"""
+                        SELECT COUNT(*) FROM AdverseEvent ae
+                        JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
+                        JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
+                        WHERE ae.IsDeleted = 0 AND at.Description LIKE '%Fall%'
+                        AND ae.Date >= {date_filter}
+                    """)
+                site_stats['fall_count'] = cursor.fetchone()[0]
+                
+                # 3-1. Skin & Wound incident count - within selected period
+                if period == 'today':
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM AdverseEvent ae
+                        JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
+                        JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
+                        WHERE ae.IsDeleted = 0 AND (at.Description LIKE '%Skin%' OR at.Description LIKE '%Wound%')
+                        AND CAST(ae.Date AS DATE) = CAST(GETDATE() AS DATE)
+                    """)
+                else:
+                    cursor.execute(f"""
+                        SELECT COUNT(*) FROM AdverseEvent ae
+                        JOIN AdverseEvent_AdverseEventType aet ON ae.Id = aet.AdverseEventId
+                        JOIN AdverseEventType at ON aet.AdverseEventTypeId = at.Id
+                        WHERE ae.IsDeleted = 0 AND (at.Description LIKE '%Skin%' OR at.Description LIKE '%Wound%')
+                        AND ae.Date >= {date_filter}
+                    """)
+                site_stats['skin_wound_count'] = cursor.fetchone()[0]
+                
+                # 4. Progress Note count - within selected period
+                if period == 'today':
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM ProgressNote 
+                        WHERE IsDeleted = 0 
+                        AND CAST(Date AS DATE) = CAST(GETDATE() AS DATE)
+                    """)
+                else:
+                    cursor.execute(f"""
+                        SELECT COUNT(*) FROM ProgressNote 
+                        WHERE IsDeleted = 0 
+                        AND Date >= {date_filter}
+                    """)
+                site_stats['progress_notes_30days'] = cursor.fetchone()[0]
+                
+                # 5. Activity count - within selected period
+                if period == 'today':
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM ActivityEvent 
+                        WHERE IsDeleted = 0 
+                        AND CAST(StartDate AS DATE) = CAST(GETDATE() AS DATE)
+                    """)
+                else:
+                    cursor.execute(f"""
+                        SELECT COUNT(*) FROM ActivityEvent 
+                        WHERE IsDeleted = 0 
+                        AND StartDate >= {date_filter}
+                    """)
+                site_stats['activities_30days'] = cursor.fetchone()[0]
+                
+                # 6. Activity distribution by type (top 5) - within selected period
+                if period == 'today':
+                    cursor.execute("""
+                        SELECT TOP 5 a.Description, COUNT(ae.Id) as cnt
+                        FROM ActivityEvent ae
+                        INNER JOIN Activity a ON ae.ActivityId = a.Id
+                        WHERE ae.IsDeleted = 0
+                        AND CAST(ae.StartDate AS DATE) = CAST(GETDATE() AS DATE)
+                        GROUP BY a.Description
+                        ORDER BY cnt DESC
+                    """)
+                elif period == 'week':
+                    cursor.execute("""
+                        SELECT TOP 5 a.Description, COUNT(ae.Id) as cnt
+                        FROM ActivityEvent ae
+                        INNER JOIN Activity a ON ae.ActivityId = a.Id
+                        WHERE ae.IsDeleted = 0
+                        AND ae.StartDate >= DATEADD(day, -7, GETDATE())
+                        GROUP BY a.Description
+                        ORDER BY cnt DESC
+                    """)
+                else:  # month
+                    cursor.execute("""
+                        SELECT TOP 5 a.Description, COUNT(ae.Id) as cnt
+                        FROM ActivityEvent ae
+                        INNER JOIN Activity a ON ae.ActivityId = a.Id
+                        WHERE ae.IsDeleted = 0
+                        AND ae.StartDate >= DATEADD(day, -30, GETDATE())
+                        GROUP BY a.Description
+                        ORDER BY cnt DESC
+                    """)
+                site_stats['activity_types'] = [{'name': row[0], 'count': row[1]} for row in cursor.fetchall()]
+                
+                return site_stats
+        
+        fanout = run_for_sites(sites, collect_site_stats)
+        
+        for site_name in sites:
+            if site_name in fanout.results:
+                all_stats.append(fanout.results[site_name])
+                continue
+            
+            site_error = fanout.errors.get(site_name) or 'Timed out'
+            logger.warning(f"Failed to fetch stats for site {site_name}: {site_error}")
+            all_stats.append({
+                'site': site_name,
+                'error': site_error,
+                'total_persons': 0,
+                'incidents': {'total': 0, 'open': 0, 'closed': 0, 'ambulance': 0, 'hospital': 0},
+                'incidents_30days': 0,
+                'fall_count': 0,
+                'skin_wound_count': 0,
+                'progress_notes_30days': 0,
+                'activities_30days': 0,
+                'activity_types': []
+            })
         
         # Calculate total sums
         totals = {
@@ -1753,7 +1803,9 @@ def get_edenfield_stats():
             'success': True,
             'period': period,
             'sites': all_stats,
-            'totals': totals
+            'totals': totals,
+            'partial': fanout.is_partial,
+            'failed_sites': fanout.failed_sites
         })
         
     except Exception as e:
@@ -2058,19 +2110,7 @@ def api_event_types():
         site = data.get('site') or request.args.get('site')
         if not site:
             return jsonify({'success': False, 'message': 'site required'}), 400
-        use_db_direct = False
-        try:
-            conn = sqlite3.connect('progress_report.db', timeout=10)
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-            result = cursor.fetchone()
-            conn.close()
-            if result and result[0]:
-                use_db_direct = result[0].lower() == 'true'
-            else:
-                use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-        except Exception:
-            use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+        use_db_direct = use_db_direct_access()
         if use_db_direct:
             from manad_db_connector import MANADDBConnector
             connector = MANADDBConnector(site)
@@ -2269,19 +2309,29 @@ def get_rod_stats():
         }
         
         try:
-            # Get progress note count
-            from api_progressnote_fetch import fetch_progress_notes_for_site
-            success, progress_notes, _ = fetch_progress_notes_for_site(site, 30)  # 30 days
-            
-            if success and progress_notes:
-                stats['totalNotes'] = len(progress_notes)
+            # Progress note counts for 30 days: one grouped COUNT query (DB direct access mode, cached per site)
+            from api_progressnote_fetch import fetch_progress_note_counts_for_site
+            success, counts = fetch_progress_note_counts_for_site(site, 30, group_by=('day',))
+            
+            if success and counts:
+                stats['totalNotes'] = counts['total']
+                today = get_australian_time().date().isoformat()
+                stats['todayNotes'] = next((row['count'] for row in counts['by_day'] if row['date'] == today), 0)
+                stats['notesPerDay'] = counts['by_day']
+            else:
+                # API mode: count the fetched notes
+                from api_progressnote_fetch import fetch_progress_notes_for_site
+                success, progress_notes, _ = fetch_progress_notes_for_site(site, 30)  # 30 days
                 
-                # Calculate note count for today's date
-                today = get_australian_time().date()
-                today_notes = [note for note in progress_notes 
-                             if note.get('EventDate') and 
-                             datetime.fromisoformat(note['EventDate'].replace('Z', '+00:00')).date() == today]
-                stats['todayNotes'] = len(today_notes)
+                if success and progress_notes:
+                    stats['totalNotes'] = len(progress_notes)
+                    
+                    # Calculate note count for today's date
+                    today = get_australian_time().date()
+                    today_notes = [note for note in progress_notes 
+                                 if note.get('EventDate') and 
+                                 datetime.fromisoformat(note['EventDate'].replace('Z', '+00:00')).date() == today]
+                    stats['todayNotes'] = len(today_notes)
             
             # Active user count (mock data)
             stats['activeUsers'] = len([user for user in ['admin', 'PaulVaska', 'walgampola', 'ROD'] 
@@ -2467,21 +2517,39 @@ def fetch_progress_notes():
                 'message': f'Unknown site: {site}. Available sites: {list(safe_site_servers.keys())}'
             }), 400
         
-        # Check DB direct access mode
-        use_db_direct = False
-        try:
-            conn = sqlite3.connect('progress_report.db', timeout=10)
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-            result = cursor.fetchone()
-            conn.close()
+        # ROD dashboard request (year, month provided and event_types None or empty array):
+        # served from the ROD month snapshots, the regular note fetch is skipped
+        if year is not None and month is not None and (not event_types or len(event_types) == 0):
+            logger.info(f"ROD Dashboard request detected for {site} - {year}/{month}")
+            from api_progressnote_fetch import fetch_residence_of_day_notes_with_client_data
+            
+            # Use ROD logic with real-time client data
+            residence_status = fetch_residence_of_day_notes_with_client_data(site, int(year), int(month))
             
-            if result and result[0]:
-                use_db_direct = result[0].lower() == 'true'
+            if residence_status and 'residence_status' in residence_status:
+                residence_data = residence_status['residence_status']
+                logger.info(f"ROD data fetched successfully for {site}: {len(residence_data)} residences")
+                return jsonify({
+                    'success': True,
+                    'message': f'Successfully fetched ROD data for {len(residence_data)} residences',
+                    'data': residence_data,
+                    'site': site,
+                    'count': len(residence_data),
+                    'fetched_at': get_australian_time().isoformat()
+                })
             else:
-                use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-        except:
-            use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+                logger.warning(f"No ROD data found for {site}")
+                return jsonify({
+                    'success': True,
+                    'message': 'No ROD data found',
+                    'data': {},
+                    'site': site,
+                    'count': 0,
+                    'fetched_at': get_australian_time().isoformat()
+                })
+        
+        # Check DB direct access mode
+        use_db_direct = use_db_direct_access()
         
         from api_progressnote_fetch import fetch_progress_notes_for_site
         
@@ -2489,17 +2557,31 @@ def fetch_progress_notes():
         req_page = max(1, int(data.get('page', 1)))
         req_per_page = min(500, max(1, int(data.get('per_page', 50))))
         offset = (req_page - 1) * req_per_page
+        # Keyset cursor (pagination.next_cursor of the previous page); page is then only reported back
+        req_cursor = data.get('cursor') or None
+        next_cursor = None
+        # List views can skip note bodies and load them per note via /api/progress-note-bodies
+        headers_only = bool(data.get('headers_only', False))
         
         # Fetch Progress Notes (DB direct access or API)
         if use_db_direct:
-            logger.info(f"🔌 Direct DB access mode: Progress Notes fetched in real time (no cache) - {site}, page={req_page}, per_page={req_per_page}")
+            logger.info(f"🔌 Direct DB access mode: Progress Notes fetched in real time (no cache) - {site}, page={req_page}, per_page={req_per_page}, cursor={req_cursor}")
+            from manad_db_connector import encode_progress_note_cursor, decode_progress_note_cursor
+            if req_cursor:
+                try:
+                    decode_progress_note_cursor(req_cursor)
+                except ValueError as e:
+                    return jsonify({'success': False, 'message': str(e)}), 400
             # Server-side pagination: one page per request
             success, notes, total_count = fetch_progress_notes_for_site(
                 site, days,
                 event_types=event_types, year=year, month=month,
                 client_service_id=client_service_id,
-                limit=req_per_page, offset=offset, return_total=True
+                limit=req_per_page, offset=offset, return_total=True, cursor=req_cursor,
+                include_notes=not headers_only
             )
+            if success and notes and len(notes) == req_per_page:
+                next_cursor = encode_progress_note_cursor(notes[-1])
             logger.info(f"🔍 [FILTER] fetch_progress_notes_for_site result - success={success}, notes_count={len(notes) if notes else 0}, total_count={total_count}")
         else:
             logger.info(f"🌐 API mode: Fetching Progress Notes - {site}")
@@ -2553,7 +2635,8 @@ def fetch_progress_notes():
                 'page': result['page'],
                 'per_page': result['per_page'],
                 'total_count': result['total_count'],
-                'total_pages': result['total_pages']
+                'total_pages': result['total_pages'],
+                'next_cursor': next_cursor
             },
             'cache_info': {
                 'status': result['cache_status'],
@@ -2565,42 +2648,12 @@ def fetch_progress_notes():
             'fetched_at': get_australian_time().isoformat()
         }
         
-        # Check if ROD dashboard request (when year, month are provided and event_types is None or empty array)
-        if year is not None and month is not None and (not event_types or len(event_types) == 0):
-            logger.info(f"ROD Dashboard request detected for {site} - {year}/{month}")
-            from api_progressnote_fetch import fetch_residence_of_day_notes_with_client_data
-            
-            # Use ROD logic with real-time client data
-            residence_status = fetch_residence_of_day_notes_with_client_data(site, year, month)
-            
-            if residence_status and 'residence_status' in residence_status:
-                residence_data = residence_status['residence_status']
-                logger.info(f"ROD data fetched successfully for {site}: {len(residence_data)} residences")
-                return jsonify({
-                    'success': True,
-                    'message': f'Successfully fetched ROD data for {len(residence_data)} residences',
-                    'data': residence_data,
-                    'site': site,
-                    'count': len(residence_data),
-                    'fetched_at': get_australian_time().isoformat()
-                })
-            else:
-                logger.warning(f"No ROD data found for {site}")
-                return jsonify({
-                    'success': True,
-                    'message': 'No ROD data found',
-                    'data': {},
-                    'site': site,
-                    'count': 0,
-                    'fetched_at': get_australian_time().isoformat()
-                })
-        else:
-            # Regular Progress Notes request
-            logger.info(f"Regular Progress Notes request for {site}")
-            logger.info(
-                f"Progress notes fetch succeeded - {site}: {result['total_count']} items (page {page}/{result['total_pages']})"
-            )
-            return jsonify(response_data)
+        # Regular Progress Notes request
+        logger.info(f"Regular Progress Notes request for {site}")
+        logger.info(
+            f"Progress notes fetch succeeded - {site}: {result['total_count']} items (page {page}/{result['total_pages']})"
+        )
+        return jsonify(response_data)
             
     except Exception as e:
         logger.error(f"Error fetching progress notes: {str(e)}")
@@ -2612,6 +2665,117 @@ def fetch_progress_notes():
             'message': f'Server error: {str(e)}'
         }), 500
 
+@app.route('/api/progress-note-bodies', methods=['POST'])
+@login_required
+def fetch_progress_note_bodies():
+    """Note bodies for notes listed with headers_only (DB direct access mode)"""
+    try:
+        data = request.get_json() or {}
+        site = data.get('site')
+        ids = data.get('ids') or []
+        
+        if not site:
+            return jsonify({'success': False, 'message': 'Site is required'}), 400
+        if site not in get_safe_site_servers():
+            return jsonify({'success': False, 'message': f'Unknown site: {site}'}), 400
+        try:
+            ids = [int(i) for i in ids][:500]
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'ids must be integers'}), 400
+        
+        from api_progressnote_fetch import fetch_progress_note_bodies_for_site
+        success, bodies = fetch_progress_note_bodies_for_site(site, ids)
+        if not success:
+            return jsonify({'success': False, 'message': 'Failed to fetch note bodies'}), 500
+        
+        return jsonify({
+            'success': True,
+            'site': site,
+            'notes': {str(note_id): text for note_id, text in bodies.items()}
+        })
+    except Exception as e:
+        logger.error(f"Error fetching progress note bodies: {str(e)}")
+        return jsonify({'success': False, 'message': f'Server error: {str(e)}'}), 500
+
+@app.route('/api/progress-notes-mirror', methods=['POST'])
+@login_required
+def query_progress_notes_mirror():
+    """
+    Progress notes from the local mirror (progress_note_mirror.db): same request and
+    response shape as /api/fetch-progress-notes, plus `q` (full text search).
+    Returns mirror_ready=False when the site/period is not mirrored yet; the caller
+    then falls back to /api/fetch-progress-notes.
+    """
+    try:
+        data = request.get_json() or {}
+        site = data.get('site')
+        if not site:
+            return jsonify({'success': False, 'message': 'Site is required'}), 400
+        safe_site_servers = get_safe_site_servers()
+        if site not in safe_site_servers:
+            return jsonify({'success': False, 'message': f'Unknown site: {site}'}), 400
+
+        from progress_note_mirror import get_progress_note_mirror
+        from api_progressnote_fetch import _range_last_n_days
+        mirror = get_progress_note_mirror()
+        # The sync thread starts with the first request (only in DB direct access mode);
+        # across workers only the holder of the sync lease reads MANAD
+        mirror.start_sync(list(safe_site_servers.keys()))
+
+        days = int(data.get('days', DEFAULT_PERIOD_DAYS))
+        start_date, end_date = _range_last_n_days(days)
+        if not mirror.covers(site, start_date):
+            return jsonify({'success': False, 'mirror_ready': False, 'site': site})
+
+        req_page = max(1, int(data.get('page', 1)))
+        req_per_page = min(500, max(1, int(data.get('per_page', 50))))
+        client_service_id = data.get('client_service_id')
+        started = time.perf_counter()
+        notes, total_count = mirror.query(
+            site, start_date, end_date,
+            event_types=data.get('event_types') or [],
+            client_service_id=int(client_service_id) if client_service_id else None,
+            text=(data.get('q') or '').strip() or None,
+            limit=req_per_page, offset=(req_page - 1) * req_per_page
+        )
+        query_ms = round((time.perf_counter() - started) * 1000, 1)
+        status = mirror.get_status(site)
+
+        return jsonify({
+            'success': True,
+            'mirror_ready': True,
+            'data': notes,
+            'pagination': {
+                'page': req_page,
+                'per_page': req_per_page,
+                'total_count': total_count,
+                'total_pages': max(1, (total_count + req_per_page - 1) // req_per_page) if total_count else 0,
+                'next_cursor': None
+            },
+            'cache_info': {
+                'status': 'mirror',
+                'last_sync': status[0]['last_sync'] if status else None,
+                'query_ms': query_ms
+            },
+            'site': site,
+            'count': total_count,
+            'fetched_at': get_australian_time().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Error querying progress note mirror: {str(e)}")
+        return jsonify({'success': False, 'message': f'Server error: {str(e)}'}), 500
+
+@app.route('/api/progress-notes-mirror/status')
+@login_required
+def progress_notes_mirror_status():
+    """Sync state of the local progress note mirror per site"""
+    try:
+        from progress_note_mirror import get_progress_note_mirror
+        return jsonify({'success': True, 'sites': get_progress_note_mirror().get_status()})
+    except Exception as e:
+        logger.error(f"Error reading progress note mirror status: {str(e)}")
+        return jsonify({'success': False, 'message': f'Server error: {str(e)}'}), 500
+
 @app.route('/api/fetch-progress-notes-incremental', methods=['POST'])
 @login_required
 def fetch_progress_notes_incremental():
@@ -3123,15 +3287,12 @@ def get_log_details():
         if not date_str:
             return jsonify({'success': False, 'message': 'Date parameter is required'}), 400
         
-        # Log file path for that date
-        log_file = usage_logger.get_daily_log_file(log_type, datetime.fromisoformat(date_str))
-        
-        if not log_file.exists():
+        # Log entries for that date (JSONL and/or legacy JSON file)
+        target_date = datetime.fromisoformat(date_str)
+        if not usage_logger.daily_log_exists(log_type, target_date):
             return jsonify({'success': False, 'message': 'No logs found for this date'}), 404
         
-        # Read log file
-        with open(log_file, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
+        logs = usage_logger.read_daily_logs(log_type, target_date)
         
         # Include details for progress_notes logs
         if log_type == 'progress_notes':
@@ -3275,14 +3436,13 @@ def get_usage_logs():
         all_logs = []
         login_sessions = {}  # Track login sessions per user
         
-        # Read all JSON log files
+        # Read all log files (JSONL and legacy JSON)
         for root, dirs, files in os.walk(usage_log_dir):
             for filename in files:
-                if filename.endswith('.json'):
+                if filename.endswith(('.jsonl', '.json')):
                     filepath = os.path.join(root, filename)
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            logs = json.load(f)
+                        logs = usage_logger.read_log_file(filepath)
                             
                         # Date filtering
                         if start_date or end_date:
@@ -3365,11 +3525,11 @@ def get_usage_log_months():
         if os.path.exists(usage_log_dir):
             for root, dirs, files in os.walk(usage_log_dir):
                 for filename in files:
-                    if filename.endswith('.json'):
-                        # Extract month information from filename (e.g., access_2025-09-26.json)
+                    if filename.endswith(('.jsonl', '.json')):
+                        # Extract month information from filename (e.g., access_2025-09-26.jsonl)
                         if 'access_' in filename:
                             try:
-                                date_part = filename.replace('access_', '').replace('.json', '')
+                                date_part = filename.replace('access_', '').split('.')[0]
                                 year_month = '-'.join(date_part.split('-')[:2])  # YYYY-MM
                                 months.add(year_month)
                             except:
@@ -3400,11 +3560,10 @@ def get_usage_logs_by_month(month):
         if os.path.exists(usage_log_dir):
             for root, dirs, files in os.walk(usage_log_dir):
                 for filename in files:
-                    if filename.endswith('.json') and month in filename:
+                    if filename.endswith(('.jsonl', '.json')) and month in filename:
                         filepath = os.path.join(root, filename)
                         try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                logs = json.load(f)
+                            logs = usage_logger.read_log_file(filepath)
                             
                             for log in logs:
                                 timestamp = log.get('timestamp', '')
@@ -3459,12 +3618,11 @@ def get_all_usage_logs():
         if os.path.exists(usage_log_dir):
             for root, dirs, files in os.walk(usage_log_dir):
                 for filename in files:
-                    if filename.endswith('.json'):
+                    if filename.endswith(('.jsonl', '.json')):
                         filepath = os.path.join(root, filename)
                         try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                logs = json.load(f)
-                                all_logs.extend(logs)
+                            logs = usage_logger.read_log_file(filepath)
+                            all_logs.extend(logs)
                         except Exception as e:
                             logger.error(f"Failed to read log file {filepath}: {str(e)}")
                             continue
@@ -3501,34 +3659,8 @@ def get_monthly_usage_stats():
         if current_user.role != 'admin':
             return jsonify({'success': False, 'message': 'Access denied'}), 403
         
-        usage_log_dir = "UsageLog"
-        monthly_stats = {}
-        
-        if os.path.exists(usage_log_dir):
-            for root, dirs, files in os.walk(usage_log_dir):
-                for filename in files:
-                    if filename.endswith('.json'):
-                        filepath = os.path.join(root, filename)
-                        try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                logs = json.load(f)
-                            
-                            for log in logs:
-                                timestamp = log.get('timestamp', '')
-                                if timestamp:
-                                    log_date = timestamp.split('T')[0]
-                                    year_month = '-'.join(log_date.split('-')[:2])
-                                    
-                                    if year_month not in monthly_stats:
-                                        monthly_stats[year_month] = 0
-                                    monthly_stats[year_month] += 1
-                        except Exception as e:
-                            logger.error(f"Failed to read log file {filepath}: {str(e)}")
-                            continue
-        
-        # Convert monthly statistics to list
-        monthly_list = [{'month': month, 'totalAccess': count} for month, count in monthly_stats.items()]
-        monthly_list.sort(key=lambda x: x['month'], reverse=True)
+        # Pre-aggregated per-day counters (usage_rollup.py), not a scan of every file
+        monthly_list = usage_logger.get_monthly_stats()
         
         return jsonify({
             'success': True,
@@ -5793,6 +5925,23 @@ def force_garbage_collection():
             'message': str(e)
         }), 500
 
+@app.route('/api/manad-db/pool-stats', methods=['GET'])
+@optional_login_required
+def get_manad_db_pool_stats():
+    """Return MANAD DB connection pool statistics per site (accessible without authentication in development)"""
+    try:
+        from manad_db_connector import get_connection_pool_stats
+        return jsonify({
+            'success': True,
+            'data': get_connection_pool_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error fetching MANAD DB pool stats: {e}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
 @app.route('/api/cache/status-current', methods=['GET'])
 @login_required
 def get_cache_status_current():
@@ -6059,14 +6208,6 @@ def get_fall_statistics():
         conn = get_db_connection(read_only=True)
         cursor = conn.cursor()
         
-        # Import fall detector (safely)
-        fall_detector = None
-        try:
-            from services.fall_policy_detector import fall_detector
-        except ImportError as e:
-            logger.warning(f"Unable to import fall_policy_detector module: {e}")
-            fall_detector = None
-        
         # Query Fall incidents (last 30 days) - including fall_type
         thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
         cursor.execute("""
@@ -6097,18 +6238,7 @@ def get_fall_statistics():
             incident_type = incident[2]
             incident_date = incident[3]
             site = incident[4] or 'Unknown'
-            fall_type = incident[5]  # Directly queried from DB
-            
-            # Calculate if fall_type is missing (legacy data handling)
-            # Note: Read-only mode, so don't save to DB, use only in memory
-            if not fall_type and fall_detector:
-                try:
-                    fall_type = fall_detector.detect_fall_type_from_incident(incident_id, cursor)
-                    # Don't save to DB in read-only mode (use only in memory)
-                    # DB updates are handled by sync process
-                except Exception as detect_error:
-                    logger.debug(f"Failed to detect fall_type for incident {incident_id}: {detect_error}")
-                    fall_type = None
+            fall_type = incident[5]  # Classified at sync time (unclassified legacy rows count as unknown)
             
             # Validate fall_type and set default
             if fall_type not in ['witnessed', 'unwitnessed', 'unknown']:
@@ -6699,23 +6829,54 @@ def sync_incidents_from_manad_to_cims(full_sync=False):
                 logger.info("🔄 No sync record: last 7 days of data")
         
         end_date = datetime.now().strftime('%Y-%m-%d')
+        
+        from services.incident_sync_service import IncidentSyncService
+        
+        # Per-site watermark (MANAD LastUpdatedDate): sites that have one fetch only
+        # rows modified since it, across the full 30-day incident window, so edits to
+        # older incidents are picked up and unchanged days are not re-read
+        site_watermarks = {}
+        if not is_first_sync:
+            for site_name in safe_site_servers.keys():
+                site_watermarks[site_name] = IncidentSyncService.load_watermark(cursor, site_name)
         conn.close()
+        watermark_start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        
+        def fetch_site_incidents(site_name):
+            modified_since = site_watermarks.get(site_name)
+            if modified_since is not None:
+                logger.info(f"📥 {site_name}: incremental sync, modified since {modified_since.isoformat()}")
+                return fetch_incidents_with_client_data_from_db(
+                    site_name, watermark_start_date, end_date,
+                    fetch_clients=False, modified_since=modified_since
+                )
+            return fetch_incidents_with_client_data_from_db(
+                site_name, start_date, end_date,
+                fetch_clients=is_first_sync, include_modified=True
+            )
         
         total_synced = 0
         total_updated = 0
+        total_unchanged = 0
+        site_timings = {}
         
-        for site_name in safe_site_servers.keys():
+        # Get MANAD data from all sites concurrently (always use DB direct access);
+        # the SQLite writes below stay sequential per site
+        from manad_db_connector import fetch_incidents_with_client_data_from_db, run_for_sites
+        site_names = list(safe_site_servers.keys())
+        logger.info(f"🔌 Direct DB access mode: fetching {len(site_names)} sites in parallel")
+        fanout = run_for_sites(site_names, fetch_site_incidents)
+        
+        for site_name in site_names:
             try:
                 logger.info(f"Syncing incidents from {site_name}...")
                 
-                # Get MANAD data (always use DB direct access)
                 try:
-                    from manad_db_connector import fetch_incidents_with_client_data_from_db
-                    logger.info(f"🔌 Direct DB access mode: {site_name}")
-                    incidents_data = fetch_incidents_with_client_data_from_db(
-                        site_name, start_date, end_date, 
-                        fetch_clients=is_first_sync
-                    )
+                    if site_name in fanout.timed_out:
+                        raise Exception("MANAD query timed out")
+                    if site_name in fanout.errors:
+                        raise Exception(fanout.errors[site_name])
+                    incidents_data = fanout.results.get(site_name)
                     # Error only if DB query result is None (empty list is normal)
                     if incidents_data is None:
                         error_msg = f"❌ DB direct access failed: {site_name} - DB connection failed."
@@ -6724,7 +6885,9 @@ def sync_incidents_from_manad_to_cims(full_sync=False):
                     
                     # 0 incidents is normal (no incidents in that period)
                     incident_count = len(incidents_data.get('incidents', []))
-                    if incident_count == 0:
+                    if incident_count == 0 and site_watermarks.get(site_name) is not None:
+                        logger.info(f"📭 {site_name}: no incidents modified since last sync (OK)")
+                    elif incident_count == 0:
                         logger.info(
                             f"📭 {site_name}: no incidents in the last "
                             f"{(datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days} "
@@ -6742,244 +6905,33 @@ def sync_incidents_from_manad_to_cims(full_sync=False):
                 incidents = incidents_data.get('incidents', [])
                 clients = incidents_data.get('clients', [])
                 
-                # Convert client data to dictionary (for fast lookup)
-                # In DB direct access mode, latest data is queried each time, so cache is unnecessary
-                clients_dict = {client.get('id', client.get('Id', '')): client for client in clients}
-                
-                logger.info(f"📋 Client mapping completed: {len(clients_dict)} clients (latest data)")
-                
+                # Staged pipeline: normalize -> bulk diff -> executemany apply -> bulk tasks
+                # (single transaction per site)
                 conn = get_db_connection()
-                cursor = conn.cursor()
-                
-                for incident in incidents:
-                    try:
-                        # Extract incident ID (MANAD API uses capital 'Id')
-                        incident_id = str(incident.get('Id', ''))
-                        if not incident_id:
-                            continue
-                        
-                        # Get resident information
-                        resident_id = incident.get('ClientId', '')
-                        resident_name = 'Unknown'
-                        
-                        # Try to get name from incident data first
-                        first_name = incident.get('FirstName', '')
-                        last_name = incident.get('LastName', '')
-                        if first_name and last_name:
-                            resident_name = f"{first_name} {last_name}".strip()
-                        elif resident_id and resident_id in clients_dict:
-                            # Fallback to client data (use capital FirstName/LastName)
-                            client = clients_dict[resident_id]
-                            first = client.get('FirstName', '')
-                            last = client.get('LastName', '')
-                            if first or last:
-                                resident_name = f"{first} {last}".strip()
-                        
-                        # Parse incident date
-                        incident_date_str = incident.get('Date', incident.get('ReportedDate', ''))
-                        try:
-                            # Convert to ISO format
-                            if incident_date_str:
-                                incident_date = datetime.fromisoformat(incident_date_str.replace('Z', '+00:00'))
-                                incident_date_iso = incident_date.isoformat()
-                            else:
-                                incident_date_iso = datetime.now().isoformat()
-                        except:
-                            incident_date_iso = datetime.now().isoformat()
-                        
-                        # Check if already exists (based on MANAD incident ID)
-                        cursor.execute("""
-                            SELECT id, status FROM cims_incidents 
-                            WHERE manad_incident_id = ?
-                        """, (incident_id,))
-                        
-                        existing = cursor.fetchone()
-                        
-                        if existing:
-                            # Update existing incident
-                            existing_db_id = existing[0]
-                            existing_status = existing[1]
-                            
-                            # Check incident status from MANAD
-                            manad_status = incident.get('Status', 'Open')
-                            is_closed = manad_status.lower() in ['closed', 'close'] or incident.get('StatusEnumId') == 2
-                            
-                            # Prepare incident type
-                            event_types = incident.get('EventTypeNames', [])
-                            incident_type_str = ', '.join(event_types) if isinstance(event_types, list) else str(event_types)
-                            
-                            # When incident status changes to Closed
-                            if is_closed and existing_status != 'Closed':
-                                # Update incident status to Closed
-                                cursor.execute("""
-                                    UPDATE cims_incidents
-                                    SET incident_type = ?,
-                                        severity = ?,
-                                        description = ?,
-                                        initial_actions_taken = ?,
-                                        reported_by_name = ?,
-                                        resident_name = ?,
-                                        incident_date = ?,
-                                        status = 'Closed',
-                                        updated_at = ?
-                                    WHERE manad_incident_id = ?
-                                """, (
-                                    incident_type_str if incident_type_str else 'Unknown',
-                                    incident.get('SeverityRating') or incident.get('RiskRatingName') or 'Unknown',
-                                    incident.get('Description', ''),
-                                    incident.get('ActionTaken', ''),
-                                    incident.get('ReportedByName', ''),
-                                    resident_name,
-                                    incident_date_iso,
-                                    datetime.now().isoformat(),
-                                    incident_id
-                                ))
-                                
-                                # Change all Tasks to Completed
-                                cursor.execute("""
-                                    UPDATE cims_tasks
-                                    SET status = 'completed',
-                                        completed_at = ?,
-                                        updated_at = ?
-                                    WHERE incident_id = ? AND status != 'completed'
-                                """, (
-                                    datetime.now().isoformat(),
-                                    datetime.now().isoformat(),
-                                    existing_db_id
-                                ))
-                                
-                                tasks_closed = cursor.rowcount
-                                if tasks_closed > 0:
-                                    logger.info(f"✅ Incident {existing_db_id} Closed: {tasks_closed} tasks automatically closed")
-                                
-                                total_updated += 1
-                            
-                            # Update and create tasks only for Open status
-                            elif existing_status == 'Open' and not is_closed:
-                                cursor.execute("""
-                                    UPDATE cims_incidents
-                                    SET incident_type = ?,
-                                        severity = ?,
-                                        description = ?,
-                                        initial_actions_taken = ?,
-                                        reported_by_name = ?,
-                                        resident_name = ?,
-                                        incident_date = ?
-                                    WHERE manad_incident_id = ?
-                                """, (
-                                    incident_type_str if incident_type_str else 'Unknown',
-                                    incident.get('SeverityRating') or incident.get('RiskRatingName') or 'Unknown',
-                                    incident.get('Description', ''),
-                                    incident.get('ActionTaken', ''),
-                                    incident.get('ReportedByName', ''),
-                                    resident_name,
-                                    incident_date_iso,
-                                    incident_id
-                                ))
-                                total_updated += 1
-                                
-                                # 🚀 Auto-generate tasks if Fall incident has no tasks
-                                if 'fall' in incident_type_str.lower():
-                                    # Check if tasks exist
-                                    cursor.execute("""
-                                        SELECT COUNT(*) FROM cims_tasks 
-                                        WHERE incident_id = ?
-                                    """, (existing_db_id,))
-                                    task_count = cursor.fetchone()[0]
-                                    
-                                    if task_count == 0:
-                                        try:
-                                            tasks_created = auto_generate_fall_tasks(existing_db_id, incident_date_iso, cursor)
-                                            if tasks_created > 0:
-                                                logger.info(f"✅ Auto-generated {tasks_created} tasks for existing Fall incident {existing_db_id}")
-                                        except Exception as task_error:
-                                            logger.error(f"Failed to auto-generate tasks for existing incident {existing_db_id}: {str(task_error)}")
-                        else:
-                            # Create new incident
-                            cims_incident_id = f"INC-{incident_id}"
-                            
-                            # Extract room information
-                            room = incident.get('RoomName', '')
-                            wing = incident.get('WingName', '')
-                            department = incident.get('DepartmentName', '')
-                            location_parts = [p for p in [room, wing, department] if p]
-                            location = ', '.join(location_parts) if location_parts else 'Unknown'
-                            
-                            # Process incident type (may be a list)
-                            event_types = incident.get('EventTypeNames', [])
-                            incident_type = ', '.join(event_types) if isinstance(event_types, list) else str(event_types)
-                            
-                            # Use 0 as reported_by for MANAD-synced incidents (system user)
-                            cursor.execute("""
-                                INSERT INTO cims_incidents (
-                                    incident_id, manad_incident_id, resident_id, resident_name, 
-                                    incident_type, severity, status, incident_date, 
-                                    location, description, initial_actions_taken, 
-                                    reported_by, reported_by_name, site, created_at,
-                                    risk_rating, is_review_closed, is_ambulance_called,
-                                    is_admitted_to_hospital, is_major_injury, reviewed_date, status_enum_id
-                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, (
-                                cims_incident_id,
-                                incident_id,
-                                str(resident_id),
-                                resident_name,
-                                incident_type if incident_type else 'Unknown',
-                                incident.get('SeverityRating') or 'Unknown',
-                                incident.get('Status', 'Open'),
-                                incident_date_iso,
-                                location,
-                                incident.get('Description', ''),
-                                incident.get('ActionTaken', ''),
-                                0,  # System user ID for MANAD-synced incidents
-                                incident.get('ReportedByName', ''),
-                                site_name,
-                                datetime.now().isoformat(),
-                                incident.get('RiskRatingName', ''),
-                                1 if incident.get('IsReviewClosed') else 0,
-                                1 if incident.get('IsAmbulanceCalled') else 0,
-                                1 if incident.get('IsAdmittedToHospital') else 0,
-                                1 if incident.get('IsMajorInjury') else 0,
-                                incident.get('ReviewedDate'),
-                                incident.get('StatusEnumId')
-                            ))
-                            total_synced += 1
-                            
-                            # 🚀 NEW: Auto-generate tasks if Fall incident
-                            new_incident_db_id = cursor.lastrowid
-                            if 'fall' in incident_type.lower():
-                                try:
-                                    tasks_created = auto_generate_fall_tasks(new_incident_db_id, incident_date_iso, cursor)
-                                    if tasks_created > 0:
-                                        logger.info(f"✅ Auto-generated {tasks_created} tasks for Fall incident {cims_incident_id}")
-                                except Exception as task_error:
-                                    logger.error(f"Failed to auto-generate tasks for {cims_incident_id}: {str(task_error)}")
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing incident {incident.get('Id', 'unknown')}: {str(e)}")
-                        continue
-                
-                conn.commit()
+                try:
+                    site_result = IncidentSyncService.apply_site(conn, site_name, incidents, clients)
+                finally:
+                    conn.close()
                 
-                # Update last sync time per site
-                cursor.execute("""
-                    INSERT OR REPLACE INTO system_settings (key, value, updated_at)
-                    VALUES (?, ?, ?)
-                """, (
-                    f'last_sync_{site_name.lower().replace(" ", "_")}',
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat()
-                ))
-                conn.commit()
-                conn.close()
+                total_synced += site_result['synced']
+                total_updated += site_result['updated']
+                total_unchanged += site_result['unchanged']
+                site_result['timings_ms']['fetch'] = fanout.durations_ms.get(site_name)
+                site_timings[site_name] = site_result['timings_ms']
                 
-                logger.info(f"✅ {site_name}: {total_synced} new, {total_updated} updated")
+                logger.info(
+                    f"✅ {site_name}: {site_result['new']} new, {site_result['changed']} changed, "
+                    f"{site_result['unchanged']} unchanged, "
+                    f"{site_result['tasks_created']} tasks created (timings ms: {site_result['timings_ms']})"
+                )
                 
             except Exception as e:
                 logger.error(f"Error syncing incidents from {site_name}: {str(e)}")
                 continue
         
-        logger.info(f"Incident sync completed: {total_synced} new, {total_updated} updated")
+        logger.info(
+            f"Incident sync completed: {total_synced} new, {total_updated} changed, {total_unchanged} unchanged"
+        )
         
         # Update overall last sync time (for frontend event trigger)
         sync_completion_time = datetime.now().isoformat()
@@ -7006,6 +6958,21 @@ def sync_incidents_from_manad_to_cims(full_sync=False):
         except Exception as e:
             logger.error(f"❌ Failed to update last_incident_sync_time: {e}")
         
+        # Classify Fall incidents still unclassified (legacy/manual rows) or classified by an
+        # older classifier, so read endpoints never have to compute fall_type
+        try:
+            from services.fall_policy_detector import fall_detector
+            conn = get_db_connection()
+            try:
+                reclassified = fall_detector.classify_incidents(conn.cursor())
+                conn.commit()
+                if reclassified:
+                    logger.info(f"🏷️ Fall type classified for {len(reclassified)} incidents ({fall_detector.CLASSIFIER_ID})")
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Fall type classification failed: {e}")
+        
         # 🚀 Generate tasks for Fall incidents without tasks after background sync completes
         try:
             conn = get_db_connection()
@@ -7055,7 +7022,16 @@ def sync_incidents_from_manad_to_cims(full_sync=False):
         except Exception as task_gen_error:
             logger.error(f"❌ Error during background task generation: {task_gen_error}")
         
-        return {'success': True, 'synced': total_synced, 'updated': total_updated}
+        return {
+            'success': True,
+            'synced': total_synced,
+            'updated': total_updated,
+            'new': total_synced,
+            'changed': total_updated,
+            'unchanged': total_unchanged,
+            'failed_sites': fanout.failed_sites,
+            'timings_ms': site_timings
+        }
         
     except Exception as e:
         logger.error(f"Error in sync_incidents_from_manad_to_cims: {str(e)}")
@@ -7151,6 +7127,7 @@ def force_sync_all():
             'details': {
                 'incidents_synced': sync_result.get('synced', 0),
                 'incidents_updated': sync_result.get('updated', 0),
+                'incidents_unchanged': sync_result.get('unchanged', 0),
                 'tasks_generated': tasks_generated,
                 'incidents_with_new_tasks': len(incidents_without_tasks),
                 'statuses_updated': updated_count
@@ -7161,6 +7138,39 @@ def force_sync_all():
         logger.error(f"Force sync error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def get_incident_sync_watermark(cursor):
+    """
+    Return freshness information for incidents served from the local CIMS store
+    
+    Args:
+        cursor: Open cursor on progress_report.db
+        
+    Returns:
+        {'last_sync_time', 'age_seconds', 'sites': {site_key: last sync time}}
+    """
+    cursor.execute("""
+        SELECT key, value FROM system_settings
+        WHERE key = 'last_incident_sync_time' OR key LIKE 'last_sync_%'
+    """)
+    settings = {row[0]: row[1] for row in cursor.fetchall()}
+    
+    last_sync_time = settings.get('last_incident_sync_time')
+    age_seconds = None
+    if last_sync_time:
+        try:
+            age_seconds = int((datetime.now() - datetime.fromisoformat(last_sync_time)).total_seconds())
+        except ValueError:
+            pass
+    
+    return {
+        'last_sync_time': last_sync_time,
+        'age_seconds': age_seconds,
+        'sites': {
+            key[len('last_sync_'):]: value
+            for key, value in settings.items() if key.startswith('last_sync_')
+        }
+    }
+
 def get_cims_incidents():
     """Query incident list (all statuses included, with auto synchronization)"""
     try:
@@ -7233,27 +7243,26 @@ def get_cims_incidents():
         site_filter = request.args.get('site')
         date_filter = request.args.get('date')
         
-        # 🔧 Modified: Query directly from MANAD DB to match KPI
-        # Dashboard KPI uses direct MANAD DB queries, so incident list is handled the same way
-        # This ensures data consistency between production/development servers
-        use_db_direct = True  # Use direct MANAD DB query (matches KPI)
-        
-        # Commented out: Original DB direct access mode check logic (not currently used)
-        # try:
-        #     conn_check = get_db_connection(read_only=True)
-        #     cursor_check = conn_check.cursor()
-        #     cursor_check.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-        #     result = cursor_check.fetchone()
-        #     conn_check.close()
-        #     
-        #     if result and result[0]:
-        #         use_db_direct = result[0].lower() == 'true'
-        #     else:
-        #         use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-        # except:
-        #     use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+        # Data source:
+        # - 'local' (default): serve the list from the synced cims_incidents table.
+        #   MANAD is only read by the background sync (sync_incidents_from_manad_to_cims).
+        # - 'manad': query every MANAD site live (slow; kept for diagnostics)
+        incidents_source = (
+            request.args.get('source') or os.environ.get('CIMS_INCIDENTS_SOURCE', 'local')
+        ).lower()
+        use_db_direct = incidents_source == 'manad'
+        
+        # Set date range (last 30 days, or according to filter)
+        if date_filter:
+            date_obj = datetime.fromisoformat(date_filter)
+            five_days_before = date_obj - timedelta(days=5)
+            start_date = five_days_before.strftime('%Y-%m-%d')
+        else:
+            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        end_date = datetime.now().strftime('%Y-%m-%d')
         
         incidents = []
+        failed_sites = []
         
         if use_db_direct:
             # 🔌 DB direct access mode: Query latest incidents from MANAD DB
@@ -7261,31 +7270,55 @@ def get_cims_incidents():
             logger.info("🔌 Direct DB access mode: integrated_dashboard incident query")
             
             try:
-                from manad_db_connector import fetch_incidents_with_client_data_from_db
-                
-                # Set date range (last 30 days, or according to filter)
-                if date_filter:
-                    date_obj = datetime.fromisoformat(date_filter)
-                    five_days_before = date_obj - timedelta(days=5)
-                    start_date = five_days_before.strftime('%Y-%m-%d')
-                else:
-                    start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-                end_date = datetime.now().strftime('%Y-%m-%d')
+                from manad_db_connector import fetch_incidents_with_client_data_from_db, run_for_sites
                 
                 # Query by site
                 safe_site_servers = get_safe_site_servers()
                 sites_to_query = [site_filter] if site_filter else list(safe_site_servers.keys())
                 
-                all_manad_incidents = []
-                for site_name in sites_to_query:
-                    if site_name not in safe_site_servers:
-                        continue
-                    
+                sites_to_query = [site_name for site_name in sites_to_query if site_name in safe_site_servers]
+                
+                # Query all sites concurrently; wall-clock time is set by the slowest site
+                fanout = run_for_sites(
+                    sites_to_query,
+                    lambda site_name: fetch_incidents_with_client_data_from_db(
+                        site_name, start_date, end_date, fetch_clients=False
+                    )
+                )
+                failed_sites = fanout.failed_sites
+                for site_name in failed_sites:
+                    logger.error(
+                        f"❌ Incident query failed for {site_name}: "
+                        f"{fanout.errors.get(site_name) or 'Timed out'}"
+                    )
+                
+                # Look up existing CIMS incidents (status/ID) in one pass instead of per row
+                manad_ids = [
+                    str(inc.get('Id', ''))
+                    for _, incidents_data in fanout.ordered_results() if incidents_data
+                    for inc in incidents_data.get('incidents', [])
+                ]
+                existing_by_manad_id = {}
+                if manad_ids:
+                    conn_cims = get_db_connection(read_only=True)
+                    try:
+                        cursor_cims = conn_cims.cursor()
+                        # SQLite limits bound parameters per statement; query in chunks
+                        for chunk_start in range(0, len(manad_ids), 900):
+                            chunk = manad_ids[chunk_start:chunk_start + 900]
+                            placeholders = ','.join('?' * len(chunk))
+                            cursor_cims.execute(f"""
+                                SELECT id, incident_id, status, fall_type, manad_incident_id
+                                FROM cims_incidents
+                                WHERE manad_incident_id IN ({placeholders})
+                            """, chunk)
+                            for row in cursor_cims.fetchall():
+                                existing_by_manad_id[row[4]] = row
+                    finally:
+                        conn_cims.close()
+                
+                for site_name, incidents_data in fanout.ordered_results():
                     try:
-                        incidents_data = fetch_incidents_with_client_data_from_db(
-                            site_name, start_date, end_date, fetch_clients=False
-                        )
-                        
                         if incidents_data and incidents_data.get('incidents'):
                             for inc in incidents_data['incidents']:
                                 # Convert MANAD incident to CIMS format
@@ -7299,21 +7332,13 @@ def get_cims_incidents():
                                 else:
                                     incident_date_iso = datetime.now().isoformat()
                                 
-                                # Query existing incident from CIMS DB (includes Task information)
-                                conn_cims = get_db_connection(read_only=True)
-                                cursor_cims = conn_cims.cursor()
-                                cursor_cims.execute("""
-                                    SELECT id, incident_id, status, fall_type
-                                    FROM cims_incidents
-                                    WHERE manad_incident_id = ?
-                                """, (str(inc.get('Id', '')),))
-                                existing = cursor_cims.fetchone()
-                                conn_cims.close()
+                                # Existing incident from CIMS DB (includes Task information)
+                                existing = existing_by_manad_id.get(str(inc.get('Id', '')))
                                 
                                 # Determine status: Use status from CIMS DB if exists, otherwise Open
                                 status = existing[2] if existing else 'Open'
                                 cims_id = existing[0] if existing else None
-                                fall_type = existing[3] if existing and len(existing) > 3 else None
+                                fall_type = existing[3] if existing else None
                                 
                                 # Include all statuses (to match KPI)
                                 # Display Open, Closed, In Progress, Overdue
@@ -7350,7 +7375,8 @@ def get_cims_incidents():
                                     location,  # location
                                     inc.get('Description', ''),  # description
                                     site_name,  # site
-                                    datetime.now().isoformat()  # created_at (temporary)
+                                    datetime.now().isoformat(),  # created_at (temporary)
+                                    fall_type  # fall_type (stored in CIMS DB)
                                 ))
                     except Exception as site_error:
                         logger.error(f"❌ Incident query failed for {site_name}: {site_error}")
@@ -7363,25 +7389,24 @@ def get_cims_incidents():
                 # Fallback: Query from CIMS DB
                 use_db_direct = False
         
+        data_freshness = None
         if not use_db_direct:
-            # ✅ Query from CIMS DB (use same data source as KPI)
+            # ✅ Query from the local CIMS store (kept current by the background sync)
+            # Single query served by idx_cims_incidents_site_date / idx_cims_incidents_date
             # Include all statuses (to match KPI)
-            # Remove date filter (filter on client side)
-            # Use same data source to match KPI
             query = """
                 SELECT id, incident_id, resident_id, resident_name, incident_type, severity, status, 
-                       incident_date, location, description, site, created_at
+                       incident_date, location, description, site, created_at, fall_type
                 FROM cims_incidents 
                 WHERE status IS NOT NULL
+                AND incident_date >= ?
             """
-            params = []
+            params = [start_date]
             
             if site_filter:
                 query += " AND site = ?"
                 params.append(site_filter)
             
-            # Remove date filter: filter on client side (matches KPI)
-            
             query += " ORDER BY incident_date DESC LIMIT 1000"
             
             # Re-execute query with read-only connection + simple retry
@@ -7403,71 +7428,61 @@ def get_cims_incidents():
                     return jsonify({'incidents': [], 'stale': True}), 200
             
             incidents = cursor.fetchall()
+            data_freshness = get_incident_sync_watermark(cursor)
             conn.close()
         
         # Convert to list of dictionaries (use frontend-compatible field names)
         result = []
         
-        # Create cursor for Fall type detection
-        conn_fall = get_db_connection(read_only=True)
-        try:
-            cursor_fall = conn_fall.cursor()
+        # fall_type is classified and stored at sync time; only MANAD incidents not yet
+        # synced to CIMS (DB direct mode) are classified here, in memory from Description
+        unsynced_falls = [
+            incident for incident in incidents
+            if incident[0] is None and incident[4] and 'fall' in incident[4].lower()
+        ]
+        unsynced_fall_types = {}
+        if unsynced_falls:
+            from services.fall_policy_detector import fall_detector
+            unsynced_fall_types = dict(zip(
+                [incident[1] for incident in unsynced_falls],
+                fall_detector.detect_fall_types([incident[9] for incident in unsynced_falls])
+            ))
+        
+        for incident in incidents:
+            # Convert incident_type to EventTypeNames array
+            incident_types = incident[4].split(', ') if incident[4] else []
             
-            for incident in incidents:
-                # Convert incident_type to EventTypeNames array
-                incident_types = incident[4].split(', ') if incident[4] else []
-                
-                # Detect Fall type (only for Fall incidents)
-                fall_type = None
-                if incident[4] and 'fall' in incident[4].lower():
-                    from services.fall_policy_detector import fall_detector
-                    
-                    # Query from DB if CIMS DB ID exists
-                    if incident[0] is not None:  # if cims_id exists
-                        fall_type = fall_detector.detect_fall_type_from_incident(
-                            incident[0],  # incident_id (CIMS DB ID)
-                            cursor_fall
-                        )
-                        
-                        # Save calculated fall_type to DB
-                        if fall_type and fall_type != 'unknown':
-                            try:
-                                cursor_fall.execute("""
-                                    UPDATE cims_incidents
-                                    SET fall_type = ?
-                                    WHERE id = ? AND (fall_type IS NULL OR fall_type = '')
-                                """, (fall_type, incident[0]))
-                                cursor_fall.connection.commit()
-                            except:
-                                pass
-                    else:
-                        # If CIMS DB ID doesn't exist (new incident in DB direct access mode)
-                        # Detect directly from Description
-                        description = incident[9] if len(incident) > 9 else ''
-                        fall_type = fall_detector.detect_fall_type_from_notes(description) if description else 'unknown'
-                
-                result.append({
-                    'id': incident[0],
-                    'incident_id': incident[1],
-                    'resident_id': incident[2],
-                    'resident_name': incident[3],
-                    'incident_type': incident[4],  # Backward compatibility
-                    'EventTypeNames': incident_types,  # Format expected by frontend
-                    'severity': incident[5],
-                    'status': incident[6],
-                    'incident_date': incident[7],
-                    'location': incident[8],
-                    'description': incident[9],
-                    'site': incident[10],  # Backward compatibility
-                    'SiteName': incident[10],  # Format expected by frontend
-                    'created_at': incident[11],
-                    'fall_type': fall_type  # Add Fall type information
-                })
-        finally:
-            conn_fall.close()
+            fall_type = incident[12] if len(incident) > 12 else None
+            if not fall_type and incident[0] is None:
+                fall_type = unsynced_fall_types.get(incident[1])
+            
+            result.append({
+                'id': incident[0],
+                'incident_id': incident[1],
+                'resident_id': incident[2],
+                'resident_name': incident[3],
+                'incident_type': incident[4],  # Backward compatibility
+                'EventTypeNames': incident_types,  # Format expected by frontend
+                'severity': incident[5],
+                'status': incident[6],
+                'incident_date': incident[7],
+                'location': incident[8],
+                'description': incident[9],
+                'site': incident[10],  # Backward compatibility
+                'SiteName': incident[10],  # Format expected by frontend
+                'created_at': incident[11],
+                'fall_type': fall_type  # Add Fall type information
+            })
         
         logger.info(f"📤 API response: returning {len(result)} incidents (all statuses)")
-        return jsonify({'incidents': result, 'stale': False})
+        return jsonify({
+            'incidents': result,
+            'stale': False,
+            'source': 'manad' if use_db_direct else 'local',
+            'data_freshness': data_freshness,
+            'partial': bool(failed_sites),
+            'failed_sites': failed_sites
+        })
         
     except Exception as e:
         logger.error(f"Open incident query error: {str(e)}")
@@ -7518,6 +7533,10 @@ def create_cims_incident():
         ))
         
         incident_db_id = cursor.lastrowid
+        
+        # Classify Fall type at creation (read endpoints only read the stored value)
+        from services.fall_policy_detector import fall_detector
+        fall_detector.classify_incidents(cursor, [incident_db_id], force=True)
         conn.commit()
         
         # Prepare incident data
@@ -7761,6 +7780,44 @@ def check_and_update_incident_status(incident_id):
             logger.error(f"Incident status update error: Incident {incident_id} - {str(e)}")
             return
 
+def fetch_manad_incidents_for_all_sites(start_date_str, end_date_str, site_names=None):
+    """
+    Fetch incidents from every site's MANAD DB concurrently
+    
+    Args:
+        start_date_str: Start date (YYYY-MM-DD)
+        end_date_str: End date (YYYY-MM-DD)
+        site_names: Sites to query (default: all configured sites)
+        
+    Returns:
+        (incidents tagged with 'site', SiteFanOutResult for partial-result reporting)
+    """
+    from manad_db_connector import MANADDBConnector, run_for_sites
+    
+    if site_names is None:
+        site_names = list(get_safe_site_servers().keys())
+    
+    fanout = run_for_sites(
+        site_names,
+        lambda site_name: MANADDBConnector(site_name).fetch_incidents(start_date_str, end_date_str)
+    )
+    
+    all_incidents = []
+    for site_name, (success, incidents) in fanout.ordered_results():
+        if success and incidents:
+            # Add site information
+            for incident in incidents:
+                incident['site'] = site_name
+            all_incidents.extend(incidents)
+            logger.debug(f"✅ {site_name}: {len(incidents)} incidents")
+        elif not success:
+            fanout.errors[site_name] = 'Incident fetch failed'
+    
+    if fanout.failed_sites:
+        logger.warning(f"⚠️ Failed to fetch incidents from: {', '.join(fanout.failed_sites)}")
+    
+    return all_incidents, fanout
+
 @app.route('/api/cims/dashboard-kpis')
 @login_required
 def get_dashboard_kpis():
@@ -7803,24 +7860,8 @@ def get_dashboard_kpis():
         
         logger.info(f"Date filter: period={period}, start_date={start_date_str}, end_date={end_date_str}")
         
-        # Query incidents from all sites in MANAD DB
-        from manad_db_connector import MANADDBConnector
-        safe_site_servers = get_safe_site_servers()
-        
-        all_incidents = []
-        for site_name in safe_site_servers.keys():
-            try:
-                connector = MANADDBConnector(site_name)
-                success, incidents = connector.fetch_incidents(start_date_str, end_date_str)
-                if success and incidents:
-                    # Add site information
-                    for incident in incidents:
-                        incident['site'] = site_name
-                    all_incidents.extend(incidents)
-                    logger.debug(f"✅ {site_name}: {len(incidents)} incidents")
-            except Exception as site_error:
-                logger.warning(f"⚠️ Failed to fetch incidents from {site_name}: {site_error}")
-                continue
+        # Query incidents from all sites in MANAD DB (in parallel)
+        all_incidents, fanout = fetch_manad_incidents_for_all_sites(start_date_str, end_date_str)
         
         logger.info(f"📊 Total incidents from MANAD DB: {len(all_incidents)}")
         
@@ -7915,7 +7956,9 @@ def get_dashboard_kpis():
             'fall_count': fall_count,
             'compliance_rate': compliance_rate,
             'period': period,
-            'incident_type': incident_type
+            'incident_type': incident_type,
+            'partial': fanout.is_partial,
+            'failed_sites': fanout.failed_sites
         })
         
     except Exception as e:
@@ -7966,23 +8009,8 @@ def get_dashboard_stats():
         
         logger.info(f"Fetching dashboard stats from MANAD DB: period={period}, start_date={start_date_str}")
         
-        # Query incidents from all sites in MANAD DB
-        from manad_db_connector import MANADDBConnector
-        safe_site_servers = get_safe_site_servers()
-        
-        all_incidents = []
-        for site_name in safe_site_servers.keys():
-            try:
-                connector = MANADDBConnector(site_name)
-                success, incidents = connector.fetch_incidents(start_date_str, end_date_str)
-                if success and incidents:
-                    # Add site information
-                    for incident in incidents:
-                        incident['site'] = site_name
-                    all_incidents.extend(incidents)
-            except Exception as site_error:
-                logger.warning(f"⚠️ Failed to fetch incidents from {site_name}: {site_error}")
-                continue
+        # Query incidents from all sites in MANAD DB (in parallel)
+        all_incidents, fanout = fetch_manad_incidents_for_all_sites(start_date_str, end_date_str)
         
         logger.info(f"📊 Total incidents from MANAD DB: {len(all_incidents)}")
         
@@ -8132,7 +8160,9 @@ def get_dashboard_stats():
             'site_status_stats': site_status_stats,
             'site_review_stats': site_review_stats,
             'additional_kpis': additional_kpis,
-            'fall_stats': fall_stats_list
+            'fall_stats': fall_stats_list,
+            'partial': fanout.is_partial,
+            'failed_sites': fanout.failed_sites
         })
         
     except Exception as e:
@@ -8303,7 +8333,7 @@ def get_schedule_batch(site, date):
         if not (current_user.is_admin() or current_user.role in ['clinical_manager', 'nurse', 'carer']):
             return jsonify({'error': 'Access denied'}), 403
         
-        conn = get_db_connection()
+        conn = get_db_connection(read_only=True)
         cursor = conn.cursor()
         
         # 1. Query Incidents + Tasks together using JOIN
@@ -8365,32 +8395,6 @@ def get_schedule_batch(site, date):
                 if len(incidents_map[incident_id]['tasks']) <= 3:  # Log only first 3
                     logger.debug(f"Task added to incident {incident_id}: {task_data['task_id']} (due_date={task_data['due_date']}, status={task_data['status']})")
         
-        # 2.5. Calculate and update Fall type (if NULL or empty)
-        from services.fall_policy_detector import fall_detector
-        
-        for incident_data in incidents_map.values():
-            if not incident_data['fall_type']:
-                # Calculate Fall type (correct signature: incident_id, cursor)
-                fall_type = fall_detector.detect_fall_type_from_incident(
-                    incident_data['id'],  # incident DB ID
-                    cursor  # DB cursor
-                )
-                
-                # Update DB
-                try:
-                    cursor.execute("""
-                        UPDATE cims_incidents 
-                        SET fall_type = ? 
-                        WHERE id = ?
-                    """, (fall_type, incident_data['id']))
-                    conn.commit()
-                    
-                    # Update incidents_map
-                    incident_data['fall_type'] = fall_type
-                    logger.info(f"📝 Incident {incident_data['incident_id']}: fall_type={fall_type} (calculated)")
-                except Exception as update_err:
-                    logger.warning(f"⚠️ Failed to update fall_type for incident {incident_data['incident_id']}: {update_err}")
-        
         # 3. Query Fall Policy (return all Fall policies)
         cursor.execute("""
             SELECT id, policy_id, name, rules_json
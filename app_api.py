@@ -4,6 +4,7 @@ Provides endpoints for the Edenfield staff mobile app:
   - /api/app/config       GET    Pre-login config (sites, login fields)
   - /api/app/login        POST   Authenticate staff, register session
   - /api/app/heartbeat    POST   Keep staff session alive, return calls
+  - /api/app/calls        GET    Calls for a site (long-poll with ?since_version=)
   - /api/app/finish-shift POST   End staff session
   - /api/app/admin/config GET/POST  Admin: read/write app config
   - /api/app/admin/staff-online GET  Admin: list online staff
@@ -13,11 +14,14 @@ import re
 import json
 import time
 import uuid
+import hashlib
 import sqlite3
 import logging
 import threading
-from flask import Blueprint, request, jsonify
+from collections import OrderedDict
+from flask import Blueprint, Response, request, jsonify
 from config_users import authenticate_user, get_username_by_lowercase
+from staff_session_registry import get_registry as _get_session_registry
 
 logger = logging.getLogger(__name__)
 
@@ -158,6 +162,104 @@ def _get_callbell_sites() -> list:
         return []
 
 
+# ── Delta responses (since token / ETag) ─────────────────────
+# A token identifies exactly what a client was last sent; recent snapshots are kept
+# so the next response can carry only added / changed / removed calls, or a 304.
+_SNAPSHOT_CACHE_SIZE = 1024
+_snapshots = OrderedDict()  # token -> {call_key: fingerprint}
+_snapshots_lock = threading.Lock()
+
+# Fields a client renders; elapsed_seconds is derived from 'start' and ignored
+_CALL_FINGERPRINT_FIELDS = (
+    'room', 'type', 'priority', 'start', 'color', 'messageText', 'messageSubText',
+    'event_id', 'card_level', 'buzz',
+)
+
+
+def _call_key(call: dict) -> str:
+    """Stable identity of a call (same key as push escalation tracking)."""
+    return str(call.get('event_id') or call['room'])
+
+
+def _call_fingerprint(call: dict) -> tuple:
+    return tuple(call.get(f) for f in _CALL_FINGERPRINT_FIELDS)
+
+
+def _calls_token(fingerprints: dict, order: list, extra=None) -> str:
+    """Token over the visible call state (+ extra payload such as config)."""
+    digest = hashlib.sha1(
+        json.dumps([order, [fingerprints[k] for k in order], extra], default=str).encode('utf-8')
+    ).hexdigest()
+    return digest[:16]
+
+
+def _request_since_token(data: dict = None) -> str:
+    """Explicit since token from body/query (only these get delta bodies)."""
+    return (data or {}).get('since') or request.args.get('since') or ''
+
+
+def _request_etags() -> set:
+    """Tokens listed in If-None-Match (sent by HTTP caches and clients on their own)."""
+    etags = set()
+    for tag in (request.headers.get('If-None-Match') or '').split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag.strip('"'):
+            etags.add(tag.strip('"'))
+    return etags
+
+
+def _delta_response(calls: list, since: str, extra: dict = None, extra_in_token: bool = True):
+    """
+    Build a calls response relative to the client's since token.
+
+    Returns a Flask response: 304 if nothing changed (since token or If-None-Match),
+    a delta ({'delta': True, 'added', 'changed', 'removed', 'order'}) if an explicit
+    since snapshot is known, otherwise the full {'calls': [...]} payload (clients
+    without a since token, including plain If-None-Match revalidation, keep getting
+    this). Always carries 'token' (also sent as ETag).
+    extra fields are merged into the payload and, if extra_in_token, part of the token.
+    """
+    extra = extra or {}
+    fingerprints = {_call_key(c): _call_fingerprint(c) for c in calls}
+    order = [_call_key(c) for c in calls]
+    token = _calls_token(fingerprints, order, extra if extra_in_token else None)
+
+    etags = _request_etags()
+    if (since and since == token) or token in etags or '*' in etags:
+        return Response(status=304, headers={'ETag': f'"{token}"'})
+
+    with _snapshots_lock:
+        previous = _snapshots.get(since) if since else None
+        _snapshots[token] = fingerprints
+        _snapshots.move_to_end(token)
+        while len(_snapshots) > _SNAPSHOT_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+
+    if previous is not None:
+        payload = {
+            'success': True,
+            'delta': True,
+            'since': since,
+            'token': token,
+            'added': [c for c in calls if _call_key(c) not in previous],
+            'changed': [
+                c for c in calls
+                if _call_key(c) in previous and previous[_call_key(c)] != fingerprints[_call_key(c)]
+            ],
+            'removed': [k for k in previous if k not in fingerprints],
+            'order': order,
+        }
+    else:
+        payload = {'success': True, 'delta': False, 'token': token, 'calls': calls}
+    payload.update(extra)
+
+    response = jsonify(payload)
+    response.headers['ETag'] = f'"{token}"'
+    return response
+
+
 # Map site_id to staff username (auto-set behind the scenes)
 _SITE_STAFF_MAP = {
     'parafield_gardens': 'staff.parafield',
@@ -266,6 +368,7 @@ def api_app_checkin():
     except Exception as e:
         logger.error(f"Failed to create staff session: {e}")
         return jsonify({'success': False, 'message': 'Failed to create session'}), 500
+    _get_session_registry().start_session(session_id, username, staff_name, site, areas)
 
     # Get notification tone from cached settings
     tone = 'bell1'
@@ -308,18 +411,13 @@ class _DbBusy(Exception):
 
 
 def _validate_session(data: dict):
-    """Validate session_id from request data.
-    Returns session row or None. Raises _DbBusy on SQLite errors."""
+    """Validate session_id from request data against the session registry.
+    Returns a StaffSession or None. Raises _DbBusy on SQLite errors."""
     session_id = data.get('session_id', '')
     if not session_id:
         return None
     try:
-        with _open_db(_CALLBELL_DB) as conn:
-            row = conn.execute(
-                'SELECT session_id, username, staff_name, site, areas FROM staff_sessions WHERE session_id = ? AND is_active = 1',
-                (session_id,)
-            ).fetchone()
-            return row
+        return _get_session_registry().get_session(session_id)
     except Exception as e:
         logger.error(f"_validate_session DB error: {e}")
         raise _DbBusy(str(e))
@@ -327,28 +425,42 @@ def _validate_session(data: dict):
 
 @app_api_bp.route('/api/app/calls', methods=['GET'])
 def api_app_calls():
-    """Lightweight poll endpoint — returns calls only. No writes, no session validation."""
+    """Lightweight poll endpoint — returns calls only. No writes, no session validation.
+
+    Long-poll: pass ?since_version=<version from the last response> to hold the request
+    until the site's calls change, a card color is due to change, or ?wait= seconds pass.
+
+    Delta: pass ?since=<token from the last response> to receive only added/changed/removed
+    calls, or 304 if nothing changed. If-None-Match alone gets 304 or the full payload."""
     try:
         site = request.args.get('site', '').strip()
         areas_raw = request.args.get('areas', '').strip()
         user_areas = [a.strip() for a in areas_raw.split(',') if a.strip()] if areas_raw else []
 
         calls = []
+        version = None
         if site:
             try:
                 from callbell.manager import get_manager
+                from callbell.base_monitor import parse_long_poll_args
                 manager = get_manager()
                 site_id = _site_name_to_id(site)
                 if site_id:
                     monitor = manager.get_monitor(site_id)
-                    calls = monitor.get_active_calls(consumer='app') if monitor else []
+                    if monitor:
+                        since_version, wait = parse_long_poll_args(request.args)
+                        if since_version is not None and wait > 0:
+                            monitor.wait_for_change(since_version, wait)
+                        version = monitor.get_version()
+                        calls = monitor.get_active_calls(consumer='app')
             except Exception as e:
                 logger.error(f"Failed to get calls: {e}")
 
             if user_areas and calls:
                 calls = _filter_calls_by_area(calls, user_areas, site)
 
-        return jsonify({'success': True, 'calls': calls})
+        # version is informational (long-poll); the token covers the visible calls only
+        return _delta_response(calls, _request_since_token(), {'version': version}, extra_in_token=False)
     except Exception as e:
         logger.error(f"Error in /api/app/calls: {e}")
         return jsonify({'success': True, 'calls': []})
@@ -356,27 +468,23 @@ def api_app_calls():
 
 @app_api_bp.route('/api/app/heartbeat', methods=['POST'])
 def api_app_heartbeat():
-    """Backward-compatible heartbeat — no writes, returns calls + cached config."""
+    """Backward-compatible heartbeat — no writes, returns calls + cached config.
+
+    Delta: send "since": <token from the last response> to receive only added/changed/
+    removed calls, or 304 if neither calls nor config changed."""
     try:
         data = request.get_json() or {}
         session_id = data.get('session_id', '')
 
-        # Look up session to get site + areas (one read, no write)
+        # Look up session to get site + areas (in-memory registry, no DB read or write)
         site = ''
-        user_areas = []
+        user_areas = frozenset()
         if session_id:
             try:
-                with _open_db(_CALLBELL_DB) as conn:
-                    row = conn.execute(
-                        'SELECT site, areas FROM staff_sessions WHERE session_id = ? AND is_active = 1',
-                        (session_id,)
-                    ).fetchone()
-                    if row:
-                        site = row[0] or ''
-                        try:
-                            user_areas = json.loads(row[1]) if row[1] else []
-                        except (json.JSONDecodeError, TypeError):
-                            user_areas = []
+                session = _get_session_registry().get_session(session_id)
+                if session:
+                    site = session.site
+                    user_areas = session.area_set
             except Exception as e:
                 logger.error(f"Heartbeat session lookup error: {e}")
                 # DB locked — return empty calls, NOT 401
@@ -419,15 +527,12 @@ def api_app_heartbeat():
         except Exception:
             pass
 
-        return jsonify({
-            'success': True,
-            'calls': calls,
-            'config': {
-                'poll_interval_ms': config.get('poll_interval_ms', 3000),
-                'show_timer': config.get('show_timer', False),
-                'notification_tone': tone,
-            },
-        })
+        client_config = {
+            'poll_interval_ms': config.get('poll_interval_ms', 3000),
+            'show_timer': config.get('show_timer', False),
+            'notification_tone': tone,
+        }
+        return _delta_response(calls, _request_since_token(data), {'config': client_config})
     except Exception as e:
         logger.error(f"Unhandled error in heartbeat: {e}")
         return jsonify({'success': True, 'calls': []})
@@ -448,10 +553,9 @@ def api_app_register_push_token():
     if not token:
         return jsonify({'success': False, 'message': 'Token required'}), 400
 
-    session_id, username, staff_name, site, _areas = session_row
     fp = _get_firebase_push()
     if fp:
-        fp.register_device_token(session_id, token, site, staff_name or '')
+        fp.register_device_token(session_row.session_id, token, session_row.site, session_row.staff_name or '')
     return jsonify({'success': True})
 
 
@@ -466,12 +570,13 @@ def api_app_finish_shift():
     if not session_row:
         return jsonify({'success': False, 'message': 'Invalid or expired session'}), 401
 
-    session_id = session_row[0]
+    session_id = session_row.session_id
     try:
         with _open_db(_CALLBELL_DB) as conn:
             conn.execute('UPDATE staff_sessions SET is_active = 0 WHERE session_id = ?', (session_id,))
     except Exception as e:
         logger.error(f"Failed to end session: {e}")
+    _get_session_registry().end_session(session_id)
 
     # Remove device tokens for this session
     fp = _get_firebase_push()
@@ -492,7 +597,7 @@ def api_app_cancel_call():
     if not session_row:
         return jsonify({'success': False, 'message': 'Invalid or expired session'}), 401
 
-    session_id, username, staff_name, site, _areas = session_row
+    username, staff_name, site = session_row.username, session_row.staff_name, session_row.site
     event_id = data.get('event_id', '')
     room = data.get('room', '')
 
@@ -655,10 +760,11 @@ def api_app_update_areas():
         areas = []
     areas_json = json.dumps(areas)
 
-    session_id = session_row[0]
+    session_id = session_row.session_id
     try:
         with _open_db(_CALLBELL_DB) as conn:
             conn.execute('UPDATE staff_sessions SET areas = ? WHERE session_id = ?', (areas_json, session_id))
+        _get_session_registry().set_areas(session_id, areas)
         return jsonify({'success': True, 'areas': areas})
     except Exception as e:
         logger.error(f"Failed to update areas: {e}")
@@ -722,14 +828,18 @@ def _detect_area_ramsay(message_text: str) -> str:
     return ''
 
 
-def _filter_calls_by_area(calls: list, user_areas: list, site: str) -> list:
+def _filter_calls_by_area(calls: list, user_areas, site: str) -> list:
     """Filter calls to only include those matching the user's selected areas.
-    If a call's area cannot be detected, include it for all users (fallback)."""
+    If a call's area cannot be detected, include it for all users (fallback).
+    user_areas may be a list, or a registry area_set (already lowercased frozenset)."""
     if not user_areas:
         return calls
 
     # Normalize user areas to lowercase for comparison
-    user_areas_lower = {a.lower() for a in user_areas}
+    if isinstance(user_areas, frozenset):
+        user_areas_lower = user_areas
+    else:
+        user_areas_lower = {a.lower() for a in user_areas}
 
     filtered = []
     for call in calls:
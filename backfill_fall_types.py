@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Fall Type Backfill
+Reclassify stored cims_incidents.fall_type with the current FallPolicyDetector.
+
+By default only Fall incidents that are unclassified or were classified by an
+older classifier (fall_type_classifier != CLASSIFIER_ID) are processed; run with
+--all after changing the keyword lists to reclassify everything.
+
+Usage:
+    python backfill_fall_types.py [--all] [--db progress_report.db]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from migrate_cims_schema import run_migration
+from services.fall_policy_detector import FallPolicyDetector
+
+# Configure UTF-8 output for Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def backfill_fall_types(db_path='progress_report.db', reclassify_all=False):
+    """
+    Classify Fall incidents and store fall_type + classifier ID
+
+    Returns:
+        {'witnessed': n, 'unwitnessed': n, 'unknown': n}
+    """
+    # Ensure fall_type / fall_type_classifier columns exist
+    if not run_migration(db_path):
+        raise RuntimeError("Schema migration failed")
+
+    conn = sqlite3.connect(db_path, timeout=60.0)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        started = time.perf_counter()
+        classified = FallPolicyDetector.classify_incidents(conn.cursor(), force=reclassify_all)
+        conn.commit()
+
+        counts = {'witnessed': 0, 'unwitnessed': 0, 'unknown': 0}
+        for fall_type in classified.values():
+            counts[fall_type] = counts.get(fall_type, 0) + 1
+        logger.info(
+            f"✅ Classified {len(classified)} Fall incidents with {FallPolicyDetector.CLASSIFIER_ID} "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms: {counts}"
+        )
+        return counts
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill cims_incidents.fall_type")
+    parser.add_argument('--all', action='store_true', help="Reclassify every Fall incident, not only stale ones")
+    parser.add_argument('--db', default='progress_report.db', help="SQLite database path")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        logger.error(f"❌ Database not found: {args.db}")
+        sys.exit(1)
+
+    backfill_fall_types(args.db, reclassify_all=args.all)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Progress note body fetch benchmark
+
+Compares the three ways of loading a page of progress notes against a local SQLite
+stand-in for the MANAD ProgressNote / ProgressNoteDetail tables:
+
+  correlated  - previous query: (SELECT TOP 1 Note ... WHERE ProgressNoteId = pn.Id) per row
+  batched     - headers first, then one PROGRESS_NOTE_BODY_QUERY IN (...) per chunk
+                (MANADDBConnector._fetch_note_bodies, as fetch_progress_notes now does)
+  headers     - include_notes=False (list views; bodies loaded on row click)
+
+and checks that correlated and batched return the same bodies. Run with
+--no-detail-index to see the case where ProgressNoteDetail.ProgressNoteId is not
+indexed (every correlated lookup becomes a table scan).
+
+Usage:
+    python benchmark_progress_note_bodies.py [--notes 50000] [--page 500] [--repeat 5]
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from manad_db_connector import MANADDBConnector
+
+HEADER_COLUMNS = "pn.Id, pn.ClientId, pn.Date, pn.ProgressNoteEventTypeId"
+WHERE_CLAUSE = "FROM ProgressNote pn WHERE pn.IsDeleted = 0 AND pn.Date >= ? AND pn.Date <= ?"
+ORDER_BY = " ORDER BY pn.Date DESC, pn.Id DESC LIMIT ?"
+
+FILLER = [
+    "Resident settled well overnight.", "Assisted with morning hygiene.", "Ate 75% of lunch.",
+    "Family visited in the afternoon.", "BGL within range.", "Pain score 2/10, PRN given.",
+    "Skin integrity intact.", "Mobilised with frame and one assist.", "Slept through the night.",
+    "Participated in group activity.", "GP reviewed, no changes to medication."
+]
+
+
+def build_database(note_count, details_per_note, index_details, seed=7):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""
+        CREATE TABLE ProgressNote (
+            Id INTEGER PRIMARY KEY, ClientId INTEGER, Date TEXT, ProgressNoteEventTypeId INTEGER,
+            IsDeleted INTEGER DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE TABLE ProgressNoteDetail (Id INTEGER PRIMARY KEY, ProgressNoteId INTEGER, Note TEXT)")
+    conn.execute("CREATE INDEX idx_pn_date ON ProgressNote(Date)")
+    if index_details:
+        conn.execute("CREATE INDEX idx_pnd_note ON ProgressNoteDetail(ProgressNoteId)")
+
+    start = datetime(2026, 1, 1)
+    notes, details = [], []
+    for note_id in range(1, note_count + 1):
+        date = start + timedelta(minutes=rng.randint(0, 60 * 24 * 270))
+        notes.append((note_id, rng.randint(1, 300), date.isoformat(sep=' '), rng.randint(1, 40), 0))
+        for _ in range(details_per_note):
+            details.append((None, note_id, ' '.join(rng.sample(FILLER, rng.randint(2, 6)))))
+    conn.executemany("INSERT INTO ProgressNote VALUES (?, ?, ?, ?, ?)", notes)
+    conn.executemany("INSERT INTO ProgressNoteDetail VALUES (?, ?, ?)", details)
+    conn.commit()
+    return conn
+
+
+def fetch_correlated(conn, params):
+    query = ("SELECT " + HEADER_COLUMNS + ", "
+             "(SELECT Note FROM ProgressNoteDetail WHERE ProgressNoteId = pn.Id LIMIT 1) AS NotesPlainText "
+             + WHERE_CLAUSE + ORDER_BY)
+    return {row[0]: row[4] for row in conn.execute(query, params)}
+
+
+def fetch_headers(conn, params):
+    return conn.execute("SELECT " + HEADER_COLUMNS + " " + WHERE_CLAUSE + ORDER_BY, params).fetchall()
+
+
+def fetch_batched(conn, params):
+    rows = fetch_headers(conn, params)
+    bodies = MANADDBConnector._fetch_note_bodies(conn.cursor(), [row[0] for row in rows])
+    return {row[0]: bodies.get(row[0]) for row in rows}
+
+
+def time_it(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Progress note body fetch benchmark")
+    parser.add_argument('--notes', type=int, default=50000, help="Progress notes in the stand-in table")
+    parser.add_argument('--details', type=int, default=1, help="ProgressNoteDetail rows per note")
+    parser.add_argument('--page', type=int, default=500, help="Notes per page (fetch limit)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing repetitions (best is reported)")
+    parser.add_argument('--no-detail-index', action='store_true',
+                        help="Do not index ProgressNoteDetail.ProgressNoteId")
+    args = parser.parse_args()
+
+    conn = build_database(args.notes, args.details, index_details=not args.no_detail_index)
+    params = ['2026-01-01 00:00:00', '2026-12-31 23:59:59', args.page]
+
+    # Correctness: same bodies for the same page
+    correlated = fetch_correlated(conn, params)
+    batched = fetch_batched(conn, params)
+    if correlated != batched:
+        mismatches = [k for k in correlated if correlated[k] != batched.get(k)]
+        raise SystemExit(f"❌ {len(mismatches)} notes differ between correlated and batched fetch")
+    print(f"✅ {len(batched)} notes: batched fetch returns the same bodies as the correlated subquery")
+
+    results = [
+        ("correlated subquery per row", time_it(lambda: fetch_correlated(conn, params), args.repeat)),
+        ("headers + batched IN (...)", time_it(lambda: fetch_batched(conn, params), args.repeat)),
+        ("headers only", time_it(lambda: fetch_headers(conn, params), args.repeat)),
+    ]
+    index_note = "without" if args.no_detail_index else "with"
+    print(f"\n{args.notes} notes, page {args.page}, {index_note} ProgressNoteDetail(ProgressNoteId) index")
+    print(f"{'Mode':<32}{'Page (ms)':>12}")
+    for name, seconds in results:
+        print(f"{name:<32}{seconds * 1000:>12.2f}")
+    print(f"\nbatched vs correlated: {results[0][1] / results[1][1]:.1f}x, "
+          f"headers only vs correlated: {results[0][1] / results[2][1]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
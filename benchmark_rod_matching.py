@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Resident of the day matching benchmark
+
+Compares the previous nested-loop matching in fetch_residence_of_day_notes_with_client_data
+(every residence scans every note, then every note scans every residence) with
+build_residence_of_day_status (notes indexed by ClientId once) on synthetic residents
+and notes, checks that both produce the same residence status and unmatched notes, and
+times both at increasing sizes to show the scaling.
+
+Usage:
+    python benchmark_rod_matching.py [--residents 200] [--notes 10000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+
+from api_progressnote_fetch import build_residence_of_day_status
+
+FIRST_NAMES = ["Mary", "John", "Patricia", "Robert", "Linda", "James", "Barbara", "William", "Joan", "Frank"]
+SURNAMES = ["Smith", "Jones", "Williams", "Brown", "Wilson", "Taylor", "Nguyen", "Martin", "White", "Walker"]
+
+
+def build_data(resident_count, note_count, seed=7):
+    rng = random.Random(seed)
+    clients = []
+    for i in range(resident_count):
+        clients.append({
+            'FirstName': rng.choice(FIRST_NAMES),
+            'Surname': f"{rng.choice(SURNAMES)}{i}",
+            'PreferredName': '',
+            'WingName': f"Wing {i % 6 + 1}",
+            'ClientRecordId': 1000 + i,
+            'MainClientServiceId': 5000 + i
+        })
+    notes = []
+    event_type_mapping = {}
+    for note_id in range(1, note_count + 1):
+        # ~2% of notes belong to clients that are no longer listed (unmatched)
+        client_id = 1000 + rng.randint(0, resident_count - 1) if rng.random() > 0.02 else 90000 + rng.randint(0, 50)
+        event_type = rng.choice(["RN/EN", "PCA"])
+        notes.append({
+            'Id': note_id,
+            'ClientId': client_id,
+            'EventDate': f"2026-05-{rng.randint(1, 31):02d}T09:00:00",
+            'ProgressNoteEventType': {'Description': f"Resident of the day - {event_type}"}
+        })
+        event_type_mapping[note_id] = event_type
+    return clients, notes, event_type_mapping
+
+
+def match_nested_loops(client_list, all_resident_notes, event_type_mapping):
+    """Previous implementation: O(residents x notes)."""
+    residence_status = {}
+    residence_client_mapping = {}
+    for residence in client_list:
+        first_name = residence.get('FirstName', '')
+        surname = residence.get('Surname', '')
+        last_name = residence.get('LastName', '')
+        if first_name and surname:
+            residence_name = f"{first_name} {surname}"
+        elif first_name and last_name:
+            residence_name = f"{first_name} {last_name}"
+        elif first_name:
+            residence_name = first_name
+        else:
+            continue
+        residence_client_record_id = residence.get('ClientRecordId') or residence.get('Id') or residence.get('ClientId')
+        residence_client_mapping[residence_name] = residence_client_record_id
+        residence_notes = []
+        if residence_client_record_id:
+            for note in all_resident_notes:
+                if note.get('ClientId') == residence_client_record_id:
+                    residence_notes.append(note)
+        rn_en_count = sum(1 for note in residence_notes if event_type_mapping.get(note.get('Id')) == "RN/EN")
+        pca_count = sum(1 for note in residence_notes if event_type_mapping.get(note.get('Id')) == "PCA")
+        residence_status[residence_name] = {
+            'residence_name': residence_name,
+            'preferred_name': residence.get('PreferredName', ''),
+            'wing_name': residence.get('WingName', ''),
+            'rn_en_has_note': rn_en_count > 0,
+            'pca_has_note': pca_count > 0,
+            'rn_en_count': rn_en_count,
+            'pca_count': pca_count,
+            'total_count': rn_en_count + pca_count
+        }
+
+    matched_note_ids = set()
+    unmatched_notes = []
+    for note in all_resident_notes:
+        note_client_id = note.get('ClientId')
+        note_matched = False
+        for residence_client_record_id in residence_client_mapping.values():
+            if residence_client_record_id and note_client_id == residence_client_record_id:
+                matched_note_ids.add(note.get('Id'))
+                note_matched = True
+                break
+        if not note_matched:
+            unmatched_notes.append({
+                'note_id': note.get('Id'),
+                'client_id': note_client_id,
+                'event_type': note.get('ProgressNoteEventType', {}).get('Description', 'Unknown'),
+                'event_date': note.get('EventDate', 'Unknown'),
+                'residence_name': 'Unknown',
+                'residence_client_record_id': 'Unknown'
+            })
+    return residence_status, residence_client_mapping, matched_note_ids, unmatched_notes
+
+
+def time_it(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident of the day matching benchmark")
+    parser.add_argument('--residents', type=int, default=200, help="Residents at full size")
+    parser.add_argument('--notes', type=int, default=10000, help="Resident of the day notes at full size")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    # Correctness at full size
+    clients, notes, mapping = build_data(args.residents, args.notes)
+    if match_nested_loops(clients, notes, mapping) != build_residence_of_day_status(clients, notes, mapping):
+        raise SystemExit("❌ Indexed matching differs from the nested-loop matching")
+    print(f"✅ {args.residents} residents x {args.notes} notes: indexed matching returns the same result")
+
+    print(f"\n{'Residents':>10}{'Notes':>10}{'Nested loops (ms)':>20}{'Indexed (ms)':>15}{'Speedup':>10}")
+    for scale in (0.25, 0.5, 1.0):
+        residents = max(1, int(args.residents * scale))
+        note_count = max(1, int(args.notes * scale))
+        clients, notes, mapping = build_data(residents, note_count)
+        nested = time_it(lambda: match_nested_loops(clients, notes, mapping), args.repeat)
+        indexed = time_it(lambda: build_residence_of_day_status(clients, notes, mapping), args.repeat)
+        print(f"{residents:>10}{note_count:>10}{nested * 1000:>20.2f}{indexed * 1000:>15.2f}{nested / indexed:>9.1f}x")
+    print("\nDoubling residents and notes: nested loops grow ~4x, indexed ~2x")
+
+
+if __name__ == '__main__':
+    main()
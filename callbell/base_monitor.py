@@ -1,6 +1,12 @@
 """
 Base Callbell Monitor - Abstract base class for all callbell systems
 Provides common interface and database operations for multi-site support.
+
+Active calls are written through to SQLite (shared by the gunicorn master running
+the monitors, its workers and IIS processes) and served from an in-memory copy.
+Every committed change bumps the site's version row and moves the mtime of
+<db>.state_version forward, so each process knows with one os.stat() whether its
+copy is stale and reloads it from SQLite.
 """
 import os
 import time
@@ -47,12 +53,121 @@ DEFAULT_SETTINGS = {
 # ── In-memory settings cache (event-driven invalidation) ──
 _settings_cache: Dict[str, Any] = {}
 _settings_cache_lock = threading.Lock()
+_settings_cache_version = None  # shared state version the cache was loaded at
+
+# ── Change notification (long-poll wake-up) ──
+# Changes made in this process wake its waiters at once; changes made in another
+# process (gunicorn master/workers) are picked up by polling the shared version
+# every LONG_POLL_CHECK_SECONDS
+_change_cond = threading.Condition()
+LONG_POLL_CHECK_SECONDS = float(os.environ.get('CALLBELL_LONG_POLL_CHECK_SECONDS', '0.25'))
+
+
+def _notify_change():
+    """Wake this process's long-poll waiters."""
+    with _change_cond:
+        _change_cond.notify_all()
+
+
+# ── Cross-process change signal ──
+
+def _state_file(db_path: str) -> str:
+    return f'{db_path}.state_version'
+
+
+def get_shared_version(db_path: str) -> int:
+    """Last committed change to calls or settings in any process (µs mtime of the state file, 0 if none)."""
+    try:
+        return os.stat(_state_file(db_path)).st_mtime_ns // 1000
+    except OSError:
+        return 0
 
 
-def _invalidate_settings_cache():
-    """Clear the settings cache so next read reloads from DB."""
+def _signal_change(db_path: str):
+    """Publish a committed change to every process and wake this process's long-poll waiters."""
+    path = _state_file(db_path)
+    try:
+        # Strictly increasing µs, so two changes are never seen as one
+        stamp = max(time.time_ns() // 1000, get_shared_version(db_path) + 1) * 1000
+        with open(path, 'a'):
+            pass
+        os.utime(path, ns=(stamp, stamp))
+    except OSError as e:
+        logger.warning(f"Failed to signal callbell state change: {e}")
+    _notify_change()
+
+
+def _init_state_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS callbell_state (
+            site_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+
+
+def _bump_all_versions(db_path: str):
+    """Treat a change outside a single monitor (settings, bulk deletes) as a state change for every site."""
+    try:
+        with _open_db(db_path) as conn:
+            _init_state_table(conn)
+            conn.execute('UPDATE callbell_state SET version = version + 1')
+    except Exception as e:
+        logger.error(f"Failed to bump callbell state versions: {e}")
+    _signal_change(db_path)
+
+
+def get_global_version(db_path: str) -> int:
+    """Version covering all sites; changes whenever any process changes calls or settings."""
+    return get_shared_version(db_path)
+
+
+def wait_for_version_change(get_version, since_version: int, timeout: float) -> int:
+    """
+    Block until get_version() differs from since_version or timeout elapses.
+    
+    Returns the current version (equal to since_version on timeout).
+    """
+    deadline = time.monotonic() + max(timeout, 0)
+    while True:
+        # Checked outside the condition: get_version() may reload from SQLite
+        version = get_version()
+        remaining = deadline - time.monotonic()
+        if version != since_version or remaining <= 0:
+            return version
+        with _change_cond:
+            _change_cond.wait(min(remaining, LONG_POLL_CHECK_SECONDS))
+
+
+# Upper bound for a long-poll request (?since_version=...&wait=...), seconds. Each
+# waiting request holds a worker thread (gunicorn.conf.py runs gthread workers)
+LONG_POLL_MAX_SECONDS = float(os.environ.get('CALLBELL_LONG_POLL_MAX_SECONDS', '25'))
+
+
+def parse_long_poll_args(args) -> tuple:
+    """
+    Read since_version / wait from request args.
+    
+    Returns (since_version or None, wait seconds); since_version None means answer immediately.
+    """
+    try:
+        since_version = int(args.get('since_version')) if args.get('since_version') else None
+    except (TypeError, ValueError):
+        since_version = None
+    try:
+        wait = float(args.get('wait', LONG_POLL_MAX_SECONDS))
+    except (TypeError, ValueError):
+        wait = LONG_POLL_MAX_SECONDS
+    return since_version, min(max(wait, 0.0), LONG_POLL_MAX_SECONDS)
+
+
+def _invalidate_settings_cache(db_path: Optional[str] = None):
+    """Clear the settings cache so next read reloads from DB (in every process when db_path is given)."""
     with _settings_cache_lock:
         _settings_cache.clear()
+    # Thresholds affect card colors: treat as a state change for every site
+    if db_path:
+        _bump_all_versions(db_path)
 
 
 def init_settings_table(db_path: str):
@@ -76,9 +191,11 @@ def init_settings_table(db_path: str):
 
 
 def get_color_settings(db_path: str) -> Dict[str, Any]:
-    """Read color threshold settings — returns from cache if available."""
+    """Read color threshold settings — returns from cache unless any process changed them."""
+    global _settings_cache_version
+    version = get_shared_version(db_path)
     with _settings_cache_lock:
-        if _settings_cache:
+        if _settings_cache and _settings_cache_version == version:
             return _settings_cache.copy()
     settings = DEFAULT_SETTINGS.copy()
     try:
@@ -96,7 +213,9 @@ def get_color_settings(db_path: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Failed to read color settings: {e}")
     with _settings_cache_lock:
+        _settings_cache.clear()
         _settings_cache.update(settings)
+        _settings_cache_version = version
     return settings
 
 
@@ -115,7 +234,7 @@ def save_notification_tone(db_path: str, tone: str):
         with _open_db(db_path) as conn:
             conn.execute('INSERT OR REPLACE INTO callbell_settings (key, value) VALUES (?, ?)',
                          ('notification_tone', tone))
-        _invalidate_settings_cache()
+        _invalidate_settings_cache(db_path)
         logger.info(f"Notification tone saved: {tone}")
     except Exception as e:
         logger.error(f"Failed to save notification tone: {e}")
@@ -131,7 +250,7 @@ def save_color_settings(db_path: str, green_minutes: int, yellow_minutes: int, r
                          ('yellow_minutes', str(yellow_minutes)))
             conn.execute('INSERT OR REPLACE INTO callbell_settings (key, value) VALUES (?, ?)',
                          ('red_minutes', str(red_minutes)))
-        _invalidate_settings_cache()
+        _invalidate_settings_cache(db_path)
         logger.info(f"Color settings saved: green={green_minutes}m, yellow={yellow_minutes}m, red={red_minutes}m")
     except Exception as e:
         logger.error(f"Failed to save color settings: {e}")
@@ -193,6 +312,14 @@ class CallbellMonitor(ABC):
         self._buzz_levels_app = {}      # legacy — no longer used for client buzz
         self._push_levels = {}           # FCM push: buzz_key -> last pushed card_level
         self._push_lock = threading.Lock()
+        
+        # In-memory copy of the active calls (room -> call dict), reloaded from SQLite
+        # whenever the shared state version moves
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self._state_lock = threading.Lock()
+        self._version = 0
+        self._loaded_shared_version = None
+        
         self.debug_info = {
             'site_id': site_id,
             'site_name': site_name,
@@ -265,6 +392,12 @@ class CallbellMonitor(ABC):
                         if col not in cols:
                             conn.execute(f"ALTER TABLE {tbl} ADD COLUMN {col} {col_type}")
                             logger.info(f"Migrated: added {col} to {tbl}")
+                
+                # Per-site state version, seeded from wall clock (µs, within JS
+                # safe-integer range) and persisted, so it keeps increasing across restarts
+                _init_state_table(conn)
+                conn.execute('INSERT OR IGNORE INTO callbell_state (site_id, version) VALUES (?, ?)',
+                             (self.site_id, int(time.time() * 1_000_000)))
                 conn.commit()
             
             # Also ensure settings table exists
@@ -274,6 +407,97 @@ class CallbellMonitor(ABC):
             logger.error(f"Failed to initialize database for {self.site_name}: {e}")
             self.debug_info['last_error'] = str(e)
     
+    # ── In-memory copy ──
+    
+    def _load_active_calls(self, shared_version: int):
+        """Load active calls and this site's version from SQLite (caller holds _state_lock)."""
+        try:
+            with _open_db(self.db_path) as conn:
+                rows = conn.execute(f'''
+                    SELECT room, type, priority, start_time, event_id, color, message_text, message_subtext
+                    FROM {self._active_table}
+                ''').fetchall()
+                row = conn.execute('SELECT version FROM callbell_state WHERE site_id = ?',
+                                   (self.site_id,)).fetchone()
+            self._calls = {
+                r[0]: {
+                    'room': r[0], 'type': r[1], 'priority': r[2], 'start_time': r[3],
+                    'event_id': r[4], 'color': r[5], 'message_text': r[6], 'message_subtext': r[7],
+                }
+                for r in rows
+            }
+            self._version = row[0] if row else 0
+            self._loaded_shared_version = shared_version
+        except Exception as e:
+            logger.error(f"Failed to load active calls for {self.site_name}: {e}")
+            self.debug_info['last_error'] = str(e)
+    
+    def _refresh(self):
+        """Reload the in-memory copy if any process committed a change since it was loaded."""
+        # Read before loading: a change committed meanwhile triggers another reload
+        shared_version = get_shared_version(self.db_path)
+        if shared_version == self._loaded_shared_version:
+            return
+        with self._state_lock:
+            if shared_version != self._loaded_shared_version:
+                self._load_active_calls(shared_version)
+    
+    def _bump_state(self, conn: sqlite3.Connection):
+        """Increment this site's version inside the transaction that changed its calls."""
+        conn.execute('UPDATE callbell_state SET version = version + 1 WHERE site_id = ?', (self.site_id,))
+    
+    def _bump_version(self):
+        """Record a state change (every process sees it) and wake long-poll waiters."""
+        try:
+            with _open_db(self.db_path) as conn:
+                self._bump_state(conn)
+        except Exception as e:
+            logger.error(f"Failed to bump state version for {self.site_name}: {e}")
+        _signal_change(self.db_path)
+    
+    def get_version(self) -> int:
+        """Current state version; increases on every active-call change in any process."""
+        self._refresh()
+        return self._version
+    
+    def seconds_until_color_change(self) -> Optional[float]:
+        """Seconds until the next time-driven card color change (or auto-archive), None if no calls."""
+        settings = get_color_settings(self.db_path)
+        thresholds = [
+            settings.get('green_minutes', 3) * 60,
+            settings.get('yellow_minutes', 5) * 60,
+            settings.get('red_minutes', 7) * 60,
+            settings.get('call_max_minutes', 60) * 60,
+        ]
+        now = time.time()
+        _, rows = self.get_state()
+        upcoming = [
+            t - (now - r['start_time'])
+            for r in rows if r['priority'] != 1
+            for t in thresholds if t > now - r['start_time']
+        ]
+        return min(upcoming) if upcoming else None
+    
+    def wait_for_change(self, since_version: int, timeout: float) -> int:
+        """
+        Long-poll helper: block until this site's state version differs from
+        since_version, a card color is due to change, or timeout elapses.
+        
+        Returns the current version.
+        """
+        next_change = self.seconds_until_color_change()
+        if next_change is not None:
+            timeout = min(timeout, next_change + 0.05)
+        return wait_for_version_change(self.get_version, since_version, timeout)
+    
+    def get_state(self):
+        """Return (version, snapshot of raw active calls) taken atomically."""
+        self._refresh()
+        with self._state_lock:
+            return self._version, list(self._calls.values())
+    
+    # ── Call lifecycle ──
+    
     def save_call(self, room: str, call_type: str, priority: int, start_time: float,
                   event_id: Optional[str] = None, color: Optional[str] = None,
                   message_text: Optional[str] = None, message_subtext: Optional[str] = None):
@@ -288,30 +512,30 @@ class CallbellMonitor(ABC):
                 ''', (room, call_type, priority, start_time, event_id, color, 
                       message_text or room, message_subtext or call_type, self.site_id))
                 is_new = cursor.rowcount > 0
+                if is_new:
+                    self._bump_state(conn)
         except Exception as e:
             logger.error(f"Failed to save call for {self.site_name}: {e}")
             self.debug_info['last_error'] = str(e)
         
         if is_new:
+            _signal_change(self.db_path)
             logger.info(f"[{self.site_name}] Call saved: {room} ({call_type}) priority={priority}")
-            # Send FCM push in background thread (non-blocking)
+            # Queue FCM push on the push dispatcher (non-blocking)
             try:
                 from firebase_push import send_push_for_new_call
-                threading.Thread(
-                    target=send_push_for_new_call,
-                    kwargs=dict(
-                        site_name=self.site_name, room=room, call_type=call_type,
-                        priority=priority, message_text=message_text or room,
-                        card_level='red' if priority <= 1 else 'yellow' if priority <= 2 else 'green',
-                    ),
-                    daemon=True,
-                ).start()
+                send_push_for_new_call(
+                    site_name=self.site_name, room=room, call_type=call_type,
+                    priority=priority, message_text=message_text or room,
+                    card_level='red' if priority <= 1 else 'yellow' if priority <= 2 else 'green',
+                )
             except Exception as e:
                 logger.error(f"Failed to send push for new call: {e}")
     
     def archive_call(self, room: str, event_id: Optional[str] = None):
         """Archive and remove a call from active calls."""
         try:
+            archived = False
             with _open_db(self.db_path) as conn:
                 query = f'SELECT room, type, priority, start_time, event_id FROM {self._active_table} WHERE room = ?'
                 params = [room]
@@ -339,48 +563,48 @@ class CallbellMonitor(ABC):
                         delete_params.append(event_id)
                     
                     conn.execute(delete_query, delete_params)
-                    logger.info(f"[{self.site_name}] Call archived: {room} (duration: {duration:.0f}s)")
+                    self._bump_state(conn)
+                    archived = True
+            if archived:
+                _signal_change(self.db_path)
+                logger.info(f"[{self.site_name}] Call archived: {room} (duration: {duration:.0f}s)")
         except Exception as e:
             logger.error(f"Failed to archive call for {self.site_name}: {e}")
             self.debug_info['last_error'] = str(e)
     
     def get_active_calls(self, consumer: str = 'web') -> List[Dict[str, Any]]:
-        """Get all active calls with computed card colors. Pure read — no writes."""
+        """Get all active calls with computed card colors. Served from memory unless another change was committed."""
         try:
             now = time.time()
             settings = get_color_settings(self.db_path)
             call_max_seconds = settings.get('call_max_minutes', 60) * 60
             
-            with _open_db(self.db_path) as conn:
-                rows = conn.execute(f'''
-                    SELECT room, type, priority, start_time, color, message_text, message_subtext, event_id
-                    FROM {self._active_table}
-                ''').fetchall()
+            _, rows = self.get_state()
             
             calls = []
             current_event_ids = set()
             for r in rows:
-                elapsed = now - r[3]
+                elapsed = now - r['start_time']
                 # Skip stale calls in output (archive timer handles cleanup)
                 if elapsed > call_max_seconds:
                     continue
-                priority = r[2]
-                event_id = r[7]
+                priority = r['priority']
+                event_id = r['event_id']
                 card_level = compute_card_color(elapsed, priority, settings)
                 style = CARD_STYLES[card_level]
                 
-                buzz_key = event_id if event_id is not None else r[0]
+                buzz_key = event_id if event_id is not None else r['room']
                 current_event_ids.add(buzz_key)
                 buzz = (consumer == 'app')
                 
                 calls.append({
-                    'room': r[0],
-                    'type': r[1],
+                    'room': r['room'],
+                    'type': r['type'],
                     'priority': priority,
-                    'start': r[3],
-                    'color': r[4] or '#ffffff',
-                    'messageText': r[5] or r[0],
-                    'messageSubText': r[6] or r[1],
+                    'start': r['start_time'],
+                    'color': r['color'] or '#ffffff',
+                    'messageText': r['message_text'] or r['room'],
+                    'messageSubText': r['message_subtext'] or r['type'],
                     'event_id': event_id,
                     'site_id': self.site_id,
                     'site_name': self.site_name,
@@ -429,19 +653,15 @@ class CallbellMonitor(ABC):
                 level_order = {'red': 0, 'yellow': 1, 'green': 2, 'gray': 3}
                 escalated.sort(key=lambda c: level_order.get(c['card_level'], 3))
                 top = escalated[0]
-                # Run FCM push in background thread
-                threading.Thread(
-                    target=send_push_for_new_call,
-                    kwargs=dict(
-                        site_name=self.site_name,
-                        room=top['room'],
-                        call_type=top.get('type', ''),
-                        priority=top.get('priority', 3),
-                        message_text=top.get('messageText', top['room']),
-                        card_level=top['card_level'],
-                    ),
-                    daemon=True,
-                ).start()
+                # Queued on the push dispatcher, which coalesces repeats of the same room
+                send_push_for_new_call(
+                    site_name=self.site_name,
+                    room=top['room'],
+                    call_type=top.get('type', ''),
+                    priority=top.get('priority', 3),
+                    message_text=top.get('messageText', top['room']),
+                    card_level=top['card_level'],
+                )
             except Exception as e:
                 logger.error(f"Failed to send escalation push: {e}")
     
@@ -452,13 +672,10 @@ class CallbellMonitor(ABC):
             settings = get_color_settings(self.db_path)
             call_max_seconds = settings.get('call_max_minutes', 60) * 60
             
-            with _open_db(self.db_path) as conn:
-                rows = conn.execute(f'''
-                    SELECT room FROM {self._active_table}
-                    WHERE (? - start_time) > ?
-                ''', (now, call_max_seconds)).fetchall()
+            _, rows = self.get_state()
+            stale_rooms = [r['room'] for r in rows if (now - r['start_time']) > call_max_seconds]
             
-            for (room,) in rows:
+            for room in stale_rooms:
                 try:
                     self.archive_call(room)
                     logger.info(f"[{self.site_name}] Auto-archived stale call: {room}")
@@ -472,6 +689,8 @@ class CallbellMonitor(ABC):
         try:
             with _open_db(self.db_path) as conn:
                 conn.execute(f'DELETE FROM {self._active_table}')
+                self._bump_state(conn)
+            _signal_change(self.db_path)
             logger.info(f"[{self.site_name}] All active calls cleared")
         except Exception as e:
             logger.error(f"Failed to clear calls for {self.site_name}: {e}")
@@ -479,7 +698,16 @@ class CallbellMonitor(ABC):
     
     def get_debug_info(self) -> Dict[str, Any]:
         """Get debug information for this monitor."""
-        return self.debug_info.copy()
+        info = self.debug_info.copy()
+        version, rows = self.get_state()
+        info['state_version'] = version
+        info['active_calls'] = len(rows)
+        try:
+            from firebase_push import get_push_metrics
+            info['push'] = get_push_metrics()
+        except Exception:
+            pass
+        return info
     
     @abstractmethod
     def start(self):
@@ -14,7 +14,8 @@ from flask_login import current_user
 from .base_monitor import (
     CallbellMonitor, get_color_settings, save_color_settings,
     get_notification_tone, save_notification_tone,
-    init_settings_table, CARD_STYLES, _open_db, _invalidate_settings_cache
+    init_settings_table, CARD_STYLES, _open_db, _invalidate_settings_cache, _bump_all_versions,
+    get_global_version, wait_for_version_change, parse_long_poll_args
 )
 from .ramsay_monitor import RamsayCallbellMonitor
 from .parafield_monitor import ParafieldCallbellMonitor
@@ -163,6 +164,8 @@ class CallbellManager:
                 for (table_name,) in tables:
                     conn.execute(f'DELETE FROM {table_name}')
                     logger.info(f"Auto-reset: cleared {table_name}")
+            # Other processes drop their in-memory copies
+            _bump_all_versions(self.db_path)
             logger.info("All active call tables cleared on startup")
         except Exception as e:
             logger.error(f"Failed to reset all calls: {e}")
@@ -171,6 +174,7 @@ class CallbellManager:
         """Remove only calls older than max_age_hours. Safe to call from any process."""
         import time
         cutoff = time.time() - (max_age_hours * 3600)
+        removed = 0
         try:
             with _open_db(self.db_path) as conn:
                 tables = conn.execute(
@@ -181,7 +185,10 @@ class CallbellManager:
                         f'DELETE FROM {table_name} WHERE start_time < ?', (cutoff,)
                     ).rowcount
                     if deleted:
+                        removed += deleted
                         logger.info(f"Cleaned {deleted} stale calls from {table_name} (older than {max_age_hours}h)")
+            if removed:
+                _bump_all_versions(self.db_path)
         except Exception as e:
             logger.error(f"Failed to cleanup stale calls: {e}")
 
@@ -318,6 +325,8 @@ def api_site_reset_calls(site_id: str):
                 with _open_db(manager.db_path) as conn:
                     conn.execute('UPDATE staff_sessions SET is_active = 0 WHERE site = ? AND is_active = 1', (site_name,))
                     conn.execute('DELETE FROM device_tokens WHERE site = ?', (site_name,))
+                from staff_session_registry import get_registry
+                get_registry().clear_site(site_name)
                 logger.info(f"Cleared staff sessions for {site_name}")
         except Exception as e:
             logger.error(f"Failed to clear staff sessions for {site_id}: {e}")
@@ -351,7 +360,10 @@ def api_web_cancel_call(site_id: str):
 @callbell_bp.route('/api/callbell/poll')
 def api_callbell_poll():
     """Single combined endpoint: returns all permitted sites' calls, auth, and settings.
-    Frontend calls this ONE endpoint every 1 second."""
+    
+    Long-poll: with ?since_version=<version from the last response> the request is held
+    until any site's calls change, a card color is due to change, or ?wait= seconds pass
+    (capped by CALLBELL_LONG_POLL_MAX_SECONDS). Without since_version it answers immediately."""
     manager = get_manager()
 
     # Determine which callbell sites exist
@@ -377,6 +389,18 @@ def api_callbell_poll():
             callbell_sites_meta = [s for s in callbell_sites_meta if s['name'] in allowed_names]
             callbell_site_ids = {s['id'] for s in callbell_sites_meta}
 
+    since_version, wait = parse_long_poll_args(request.args)
+    if since_version is not None and wait > 0:
+        # Wake early for time-driven color changes on any permitted site
+        for site_id in callbell_site_ids:
+            monitor = manager.get_monitor(site_id)
+            next_change = monitor.seconds_until_color_change() if monitor else None
+            if next_change is not None:
+                wait = min(wait, next_change + 0.05)
+        wait_for_version_change(lambda: get_global_version(manager.db_path), since_version, wait)
+    # Read the version before the calls so a change made meanwhile is never missed
+    version = get_global_version(manager.db_path)
+
     # Gather calls per permitted site
     sites_data = {}
     debug_by_site = {}
@@ -401,6 +425,7 @@ def api_callbell_poll():
         'role': role,
         'display_name': display_name,
         'debug': debug_by_site,
+        'version': version,
     })
 
 
@@ -459,7 +484,7 @@ def api_save_settings():
             with _open_db(manager.db_path) as conn:
                 conn.execute('INSERT OR REPLACE INTO callbell_settings (key, value) VALUES (?, ?)',
                              ('call_max_minutes', str(call_max)))
-            _invalidate_settings_cache()
+            _invalidate_settings_cache(manager.db_path)
         except Exception as e:
             logger.error(f"Failed to save call_max_minutes: {e}")
     
@@ -115,6 +115,10 @@ def create_incident():
         ))
         
         incident_db_id = cursor.lastrowid
+        
+        # Classify Fall type at creation (read endpoints only read the stored value)
+        from services.fall_policy_detector import fall_detector
+        fall_detector.classify_incidents(cursor, [incident_db_id], force=True)
         conn.commit()
         
         # Trigger policy engine
@@ -159,6 +159,7 @@ CREATE INDEX idx_cims_incidents_date ON cims_incidents(incident_date);
 CREATE INDEX idx_cims_incidents_site ON cims_incidents(site);
 CREATE INDEX idx_cims_incidents_resident ON cims_incidents(resident_id);
 CREATE INDEX idx_cims_incidents_manad_id ON cims_incidents(manad_incident_id);
+CREATE INDEX idx_cims_incidents_site_date ON cims_incidents(site, incident_date);
 
 -- Task-related indexes
 CREATE INDEX idx_cims_tasks_incident ON cims_tasks(incident_id);
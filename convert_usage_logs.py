@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Usage Log Converter
+One-time conversion of legacy UsageLog/YYYY-MM/<type>_<date>.json array files to
+the append-only JSONL format (<type>_<date>.jsonl) written by UsageLogger.
+
+Legacy entries are placed before any JSONL entries already written for the same
+day; the original file is kept as <type>_<date>.json.bak unless --no-backup.
+Readers accept both formats, so conversion can run at any time (preferably while
+the app is stopped).
+
+Usage:
+    python convert_usage_logs.py [--dir UsageLog] [--no-backup]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Configure UTF-8 output for Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert legacy usage logs to JSONL")
+    parser.add_argument('--dir', default='UsageLog', help="Usage log base directory")
+    parser.add_argument('--no-backup', action='store_true', help="Delete legacy .json files instead of keeping .json.bak")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        logger.error(f"❌ Usage log directory not found: {args.dir}")
+        sys.exit(1)
+
+    from usage_logger import UsageLogger
+    result = UsageLogger(args.dir).convert_legacy_logs(keep_backup=not args.no_backup)
+    logger.info(f"✅ Converted {result['files']} files ({result['entries']} entries)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Escalation Scheduler
+Single-thread, heap-based scheduler for alarm escalations.
+
+Pending escalation levels are the rows of alarm_escalations (alarm_service.py) with
+status 'pending'; their due_at is the only persisted schedule. The scheduler keeps
+them in an in-memory min-heap keyed by due time. One worker thread sleeps until the
+earliest due entry and runs the callback, so the thread count stays constant no
+matter how many alarms are open. On startup all pending rows are re-armed and
+overdue ones fire immediately.
+
+The callback returns False (or raises) when an escalation could not be sent; it is
+then re-armed after ESCALATION_RETRY_SECONDS, doubling per attempt up to
+ESCALATION_RETRY_MAX_SECONDS, and the new due_at is persisted. Every process that
+runs an AlarmManager arms the same rows, so the callback must claim a row before
+sending it (AlarmEscalationService.claim_escalation).
+"""
+
+import os
+import heapq
+import sqlite3
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'progress_report.db')
+
+ESCALATION_RETRY_SECONDS = float(os.environ.get('ESCALATION_RETRY_SECONDS', '60'))
+ESCALATION_RETRY_MAX_SECONDS = float(os.environ.get('ESCALATION_RETRY_MAX_SECONDS', '900'))
+
+
+class EscalationScheduler:
+    """Min-heap of pending (due_at, alarm_id, level) escalations driven by one daemon thread."""
+
+    def __init__(self, callback: Callable[[str, int], Optional[bool]], db_path: str = _DEFAULT_DB_PATH):
+        """
+        Args:
+            callback: Called as callback(alarm_id, level) when an escalation is due;
+                returns False to have it retried with backoff
+            db_path: SQLite database holding alarm_escalations
+        """
+        self.callback = callback
+        self.db_path = db_path
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, str, int]] = []
+        # (alarm_id, level) -> due_at; heap entries not matching this are stale (lazy deletion)
+        self._scheduled: Dict[Tuple[str, int], float] = {}
+        # (alarm_id, level) -> failed attempts so far (backoff)
+        self._attempts: Dict[Tuple[str, int], int] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=60.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+        except Exception as e:
+            logger.warning(f"Failed to set PRAGMA settings: {e}")
+        return conn
+
+    def start(self) -> int:
+        """Re-arm pending escalations and start the worker thread. Returns the number re-armed."""
+        conn = self._connect()
+        try:
+            # 'sending' rows are claims; the callback takes them over only once they are stale
+            rows = conn.execute(
+                "SELECT alarm_id, level, due_at FROM alarm_escalations WHERE status IN ('pending', 'sending')"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        with self._cond:
+            for alarm_id, level, due_at in rows:
+                self._push(alarm_id, level, due_at)
+            self._stopped = False
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True, name='escalation-scheduler')
+                self._worker.start()
+            self._cond.notify()
+
+        if rows:
+            overdue = sum(1 for _, _, due_at in rows if due_at <= time.time())
+            logger.info(f"Re-armed {len(rows)} pending escalations ({overdue} overdue)")
+        return len(rows)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _push(self, alarm_id: str, level: int, due_at: float):
+        self._scheduled[(alarm_id, level)] = due_at
+        heapq.heappush(self._heap, (due_at, alarm_id, level))
+
+    def schedule(self, alarm_id: str, level: int, due_at: float):
+        """Arm one escalation level (replaces an existing entry for the same level)."""
+        self.schedule_many([(alarm_id, level, due_at)])
+
+    def schedule_many(self, entries: List[Tuple[str, int, float]]):
+        """Arm several escalation levels already persisted as pending alarm_escalations rows."""
+        if not entries:
+            return
+        with self._cond:
+            earliest = self._heap[0][0] if self._heap else None
+            for alarm_id, level, due_at in entries:
+                self._push(alarm_id, level, due_at)
+            # Only wake the worker if its current sleep would overshoot
+            if earliest is None or self._heap[0][0] < earliest:
+                self._cond.notify()
+
+    def cancel(self, alarm_id: str) -> int:
+        """Drop all pending levels of an alarm (memory and alarm_escalations). Returns the number cancelled."""
+        with self._cond:
+            keys = [k for k in self._scheduled if k[0] == alarm_id]
+            for key in keys:
+                del self._scheduled[key]
+                self._attempts.pop(key, None)
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM alarm_escalations WHERE alarm_id = ? AND status = 'pending'", (alarm_id,))
+            conn.commit()
+        finally:
+            conn.close()
+        return len(keys)
+
+    def is_scheduled(self, alarm_id: str, level: int) -> bool:
+        with self._cond:
+            return (alarm_id, level) in self._scheduled
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._scheduled)
+
+    def next_due(self) -> Optional[float]:
+        """Epoch seconds of the earliest pending escalation, or None."""
+        with self._cond:
+            return min(self._scheduled.values()) if self._scheduled else None
+
+    def _pop_due(self) -> List[Tuple[float, str, int]]:
+        """Wait (lock held) until entries are due and pop all of them; [] when stopped."""
+        while not self._stopped:
+            # Discard stale heap entries (cancelled or rescheduled)
+            while self._heap and self._scheduled.get((self._heap[0][1], self._heap[0][2])) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                self._cond.wait()
+                continue
+            now = time.time()
+            delay = self._heap[0][0] - now
+            if delay > 0:
+                self._cond.wait(delay)
+                continue
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if self._scheduled.get((entry[1], entry[2])) == entry[0]:
+                    due.append(entry)
+            return due
+        return []
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due = self._pop_due()
+                if not due and self._stopped:
+                    return
+            failed = set()
+            for due_at, alarm_id, level in due:
+                try:
+                    if self.callback(alarm_id, level) is False:
+                        failed.add((alarm_id, level))
+                except Exception as e:
+                    logger.error(f"Escalation callback failed for {alarm_id} level {level}: {e}")
+                    failed.add((alarm_id, level))
+
+            # Forget sent entries and re-arm failed ones, unless they were cancelled or
+            # rescheduled while the callbacks ran (the callback records the outcome in alarm_escalations)
+            retries = []
+            now = time.time()
+            with self._cond:
+                for due_at, alarm_id, level in due:
+                    key = (alarm_id, level)
+                    if self._scheduled.get(key) != due_at:
+                        continue
+                    if key in failed:
+                        attempts = self._attempts.get(key, 0) + 1
+                        self._attempts[key] = attempts
+                        delay = min(ESCALATION_RETRY_SECONDS * 2 ** (attempts - 1), ESCALATION_RETRY_MAX_SECONDS)
+                        self._push(alarm_id, level, now + delay)
+                        retries.append((now + delay, alarm_id, level))
+                    else:
+                        del self._scheduled[key]
+                        self._attempts.pop(key, None)
+            if retries:
+                for retry_at, alarm_id, level in retries:
+                    logger.warning(f"Escalation {alarm_id} level {level} not sent, "
+                                   f"retrying in {retry_at - now:.0f}s (attempt {self._attempts.get((alarm_id, level))})")
+                try:
+                    conn = self._connect()
+                    try:
+                        conn.executemany("UPDATE alarm_escalations SET due_at = ? WHERE alarm_id = ? AND level = ? "
+                                         "AND status = 'pending'", retries)
+                        conn.commit()
+                    finally:
+                        conn.close()
+                except Exception as e:
+                    logger.error(f"Failed to persist {len(retries)} escalation retries: {e}")
@@ -9,6 +9,8 @@ from flask_login import login_required, current_user
 from datetime import datetime
 import logging
 
+from settings_service import use_db_direct_access
+
 logger = logging.getLogger(__name__)
 
 # Default period (days) for cached API. Must match frontend PERIOD_OPTIONS[0].value in progressNoteList.js.
@@ -23,24 +25,8 @@ def _get_notes_from_api_and_cache(site: str, page: int, per_page: int, days: int
     fetches a bounded set (default-limit when no limit passed) then slices to (page, per_page).
     Used only for default period (e.g. 7 days); cache/slice design is intentional."""
     try:
-        import sqlite3
-        import os
-        
         # Check direct DB access mode
-        use_db_direct = False
-        try:
-            conn = sqlite3.connect('progress_report.db', timeout=10)
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result and result[0]:
-                use_db_direct = result[0].lower() == 'true'
-            else:
-                use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-        except:
-            use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+        use_db_direct = use_db_direct_access()
         
         from api_progressnote_fetch import fetch_progress_notes_for_site
         success, notes, _ = fetch_progress_notes_for_site(site, days)
@@ -129,23 +115,7 @@ def fetch_progress_notes_cached():
             }), 400
         
         # Check direct DB access mode
-        import sqlite3
-        import os
-        
-        use_db_direct = False
-        try:
-            conn = sqlite3.connect('progress_report.db', timeout=10)
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM system_settings WHERE key = 'USE_DB_DIRECT_ACCESS'")
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result and result[0]:
-                use_db_direct = result[0].lower() == 'true'
-            else:
-                use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
-        except:
-            use_db_direct = os.environ.get('USE_DB_DIRECT_ACCESS', 'false').lower() == 'true'
+        use_db_direct = use_db_direct_access()
         
         # Direct DB access mode: Always real-time query without cache
         if use_db_direct:
@@ -1,12 +1,19 @@
 """
 Firebase Cloud Messaging (FCM) push notification service.
 Sends push notifications to staff mobile devices when new calls come in.
+
+Pushes are queued on a single PushDispatcher worker that coalesces repeats of the
+same room and batches send_each calls; set FCM_FAKE_TRANSPORT=1 to record messages
+in memory instead of contacting FCM.
 """
 import os
+import time
 import logging
 import sqlite3
 import threading
 
+from staff_session_registry import get_registry as _get_session_registry
+
 logger = logging.getLogger(__name__)
 
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -76,7 +83,6 @@ def _ensure_device_tokens_table():
 
 def register_device_token(session_id: str, token: str, site: str, staff_name: str = ''):
     """Register a device FCM token for push notifications."""
-    import time
     _ensure_device_tokens_table()
     try:
         with _open_db(_CALLBELL_DB) as conn:
@@ -84,6 +90,7 @@ def register_device_token(session_id: str, token: str, site: str, staff_name: st
                 INSERT OR REPLACE INTO device_tokens (token, session_id, site, staff_name, registered_at)
                 VALUES (?, ?, ?, ?, ?)
             ''', (token, session_id, site, staff_name, time.time()))
+        _get_session_registry().add_token(token, session_id)
         logger.info(f"Push token registered for {staff_name} at {site}")
     except Exception as e:
         logger.error(f"Failed to register device token: {e}")
@@ -97,19 +104,13 @@ def unregister_device_tokens(session_id: str):
             conn.execute('DELETE FROM device_tokens WHERE session_id = ?', (session_id,))
     except Exception as e:
         logger.error(f"Failed to unregister device tokens: {e}")
+    _get_session_registry().remove_tokens(session_id)
 
 
 def _get_tokens_for_site(site_name: str) -> list:
-    """Get all active device tokens for a site."""
-    _ensure_device_tokens_table()
+    """Get all active device tokens for a site (from the in-memory session registry)."""
     try:
-        with _open_db(_CALLBELL_DB) as conn:
-            rows = conn.execute('''
-                SELECT dt.token FROM device_tokens dt
-                INNER JOIN staff_sessions ss ON dt.session_id = ss.session_id
-                WHERE ss.site = ? AND ss.is_active = 1
-            ''', (site_name,)).fetchall()
-            return [r[0] for r in rows]
+        return _get_session_registry().tokens_for_site(site_name)
     except Exception as e:
         logger.error(f"Failed to get tokens for site {site_name}: {e}")
         return []
@@ -117,30 +118,10 @@ def _get_tokens_for_site(site_name: str) -> list:
 
 def _get_tokens_for_site_by_area(site_name: str, detected_area: str) -> list:
     """Get device tokens filtered by area. If a user has no areas set, they get all calls.
-    If detected_area is empty, return all tokens (can't filter)."""
-    _ensure_device_tokens_table()
+    If detected_area is empty, return all tokens (can't filter).
+    Areas are pre-parsed per session in the registry, so no DB or JSON work per push."""
     try:
-        import json
-        with _open_db(_CALLBELL_DB) as conn:
-            rows = conn.execute('''
-                SELECT dt.token, ss.areas FROM device_tokens dt
-                INNER JOIN staff_sessions ss ON dt.session_id = ss.session_id
-                WHERE ss.site = ? AND ss.is_active = 1
-            ''', (site_name,)).fetchall()
-
-            if not detected_area:
-                return [r[0] for r in rows]
-
-            tokens = []
-            for token, areas_json in rows:
-                try:
-                    user_areas = json.loads(areas_json) if areas_json else []
-                except (json.JSONDecodeError, TypeError):
-                    user_areas = []
-
-                if not user_areas or detected_area.lower() in [a.lower() for a in user_areas]:
-                    tokens.append(token)
-            return tokens
+        return _get_session_registry().tokens_for_site(site_name, detected_area)
     except Exception as e:
         logger.error(f"Failed to get area-filtered tokens for {site_name}: {e}")
         return []
@@ -159,77 +140,298 @@ def _detect_area_for_push(site_name: str, message_text: str) -> str:
     return ''
 
 
-def send_push_for_new_call(site_name: str, room: str, call_type: str, priority: int,
-                           message_text: str = '', card_level: str = 'green',
-                           send_to_all: bool = False):
-    """Send FCM push notification to devices at a site, filtered by area.
-    If send_to_all is True, skip area filtering (used for escalated calls)."""
-    if not _init_firebase():
-        return
+# ── Push dispatcher ──────────────────────────────────────────
+# One worker thread drains a bounded queue of push requests. Requests for the same
+# (site, room) that arrive within the coalescing window are merged (most urgent card
+# level wins), token lists are resolved once per (site, area) per batch, and messages
+# go out through send_each in chunks of FCM's 500-message limit.
 
-    # For escalated calls or when send_to_all is True, send to everyone
-    if send_to_all:
-        tokens = _get_tokens_for_site(site_name)
-    else:
-        detected_area = _detect_area_for_push(site_name, message_text or room)
-        tokens = _get_tokens_for_site_by_area(site_name, detected_area)
-    if not tokens:
-        return
+PUSH_QUEUE_MAX = int(os.environ.get('PUSH_QUEUE_MAX', '1000'))
+PUSH_COALESCE_SECONDS = float(os.environ.get('PUSH_COALESCE_SECONDS', '0.25'))
+FCM_MAX_BATCH = 500
 
-    try:
+_LEVEL_ORDER = {'red': 0, 'yellow': 1, 'green': 2, 'gray': 3}
+
+
+class FirebaseTransport:
+    """Sends messages through firebase_admin.messaging."""
+
+    def ready(self) -> bool:
+        return _init_firebase()
+
+    def build_message(self, token: str, title: str, body: str, channel_id: str,
+                      sound: str, tag: str):
         from firebase_admin import messaging
+        return messaging.Message(
+            notification=messaging.Notification(
+                title=title,
+                body=body,
+            ),
+            android=messaging.AndroidConfig(
+                priority='high',
+                notification=messaging.AndroidNotification(
+                    channel_id=channel_id,
+                    priority='max',
+                    sound=sound,
+                    vibrate_timings_millis=[0, 4000],
+                    default_vibrate_timings=False,
+                    visibility='public',
+                    tag=tag,
+                ),
+            ),
+            token=token,
+        )
+
+    def send_each(self, messages: list):
+        from firebase_admin import messaging
+        return messaging.send_each(messages)
+
+
+class _FakeSendResponse:
+    def __init__(self, exception=None):
+        self.exception = exception
+        self.success = exception is None
+
+
+class _FakeBatchResponse:
+    def __init__(self, responses):
+        self.responses = responses
+        self.success_count = sum(1 for r in responses if r.success)
+        self.failure_count = len(responses) - self.success_count
+
+
+class _FakeUnregisteredError(Exception):
+    code = 'UNREGISTERED'
+
+
+class FakeFCMTransport:
+    """In-memory transport for local testing: records every message instead of sending.
+    Tokens in invalid_tokens fail with UNREGISTERED; latency simulates the FCM round trip."""
+
+    def __init__(self, invalid_tokens=(), latency: float = 0.0):
+        self.invalid_tokens = set(invalid_tokens)
+        self.latency = latency
+        self.sent = []
+        self.batches = []
+
+    def ready(self) -> bool:
+        return True
+
+    def build_message(self, token: str, title: str, body: str, channel_id: str,
+                      sound: str, tag: str):
+        return {'token': token, 'title': title, 'body': body, 'channel_id': channel_id,
+                'sound': sound, 'tag': tag}
+
+    def send_each(self, messages: list):
+        if self.latency:
+            time.sleep(self.latency)
+        self.batches.append(len(messages))
+        self.sent.extend(messages)
+        return _FakeBatchResponse([
+            _FakeSendResponse(_FakeUnregisteredError('unregistered') if m['token'] in self.invalid_tokens else None)
+            for m in messages
+        ])
+
+
+class PushDispatcher:
+    """Bounded, coalescing push queue drained by a single worker thread."""
+
+    def __init__(self, transport=None, maxsize: int = PUSH_QUEUE_MAX,
+                 coalesce_seconds: float = PUSH_COALESCE_SECONDS):
+        self.transport = transport or FirebaseTransport()
+        self.maxsize = maxsize
+        self.coalesce_seconds = coalesce_seconds
+        self._cond = threading.Condition()
+        self._pending = {}  # (site, room) -> request; dict order = arrival order
+        self._in_flight = 0
+        self._worker = None
+        self._metrics = {
+            'enqueued': 0, 'coalesced': 0, 'dropped': 0, 'batches': 0, 'send_calls': 0,
+            'messages_sent': 0, 'messages_failed': 0, 'invalid_tokens_removed': 0,
+            'last_send_ms': 0.0, 'max_send_ms': 0.0, 'total_send_ms': 0.0,
+            'last_queue_wait_ms': 0.0, 'max_queue_wait_ms': 0.0,
+        }
+
+    def submit(self, site_name: str, room: str, call_type: str, priority: int,
+               message_text: str = '', card_level: str = 'green', send_to_all: bool = False) -> bool:
+        """Queue a push. Returns False if the queue is full and the push was dropped."""
+        key = (site_name, room)
+        with self._cond:
+            existing = self._pending.get(key)
+            if existing is not None:
+                # Same room again before it was sent: keep the most urgent level
+                if _LEVEL_ORDER.get(card_level, 3) <= _LEVEL_ORDER.get(existing['card_level'], 3):
+                    existing['card_level'] = card_level
+                    existing['message_text'] = message_text or existing['message_text']
+                existing['send_to_all'] = existing['send_to_all'] or send_to_all
+                self._metrics['coalesced'] += 1
+                return True
+            if len(self._pending) >= self.maxsize:
+                self._metrics['dropped'] += 1
+                logger.warning(f"Push queue full ({self.maxsize}), dropped push for {room} at {site_name}")
+                return False
+            self._pending[key] = {
+                'site_name': site_name, 'room': room, 'call_type': call_type, 'priority': priority,
+                'message_text': message_text, 'card_level': card_level, 'send_to_all': send_to_all,
+                'queued_at': time.monotonic(),
+            }
+            self._metrics['enqueued'] += 1
+            self._ensure_worker()
+            self._cond.notify()
+        return True
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True, name='push-dispatcher')
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let a burst accumulate so repeats of the same room coalesce
+            if self.coalesce_seconds > 0:
+                time.sleep(self.coalesce_seconds)
+            with self._cond:
+                batch = list(self._pending.values())
+                self._pending.clear()
+                self._in_flight = len(batch)
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                logger.error(f"Push dispatch failed: {e}")
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _dispatch(self, batch: list):
+        if not self.transport.ready():
+            return
         from callbell.base_monitor import get_notification_tone
 
-        # Get the selected notification tone from settings
         tone = get_notification_tone(_CALLBELL_DB)
         channel_id = f'callbell-{tone}'
         sound_file = 'default' if tone == 'default' else f'{tone}.mp3'
 
-        # Build clean, glanceable notification — just the display text, big and simple
-        # message_text is already human-readable (e.g. "KURR RM 4.2 CALL" or "RM 56 BED - CALL")
-        title = (message_text or room).upper()
-        body = 'CALLING'
-
-        # Send to each token individually (handles invalid tokens gracefully)
-        messages = []
-        for token in tokens:
-            msg = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body,
-                ),
-                android=messaging.AndroidConfig(
-                    priority='high',
-                    notification=messaging.AndroidNotification(
-                        channel_id=channel_id,
-                        priority='max',
-                        sound=sound_file,
-                        vibrate_timings_millis=[0, 4000],
-                        default_vibrate_timings=False,
-                        visibility='public',
-                        tag=f'callbell-{room}',
-                    ),
-                ),
-                token=token,
-            )
-            messages.append(msg)
-
-        if messages:
-            response = messaging.send_each(messages)
-            success = response.success_count
-            failure = response.failure_count
-            logger.info(f"📤 Push sent for {room} at {site_name}: {success} ok, {failure} failed")
-
-            # Clean up invalid tokens
-            for i, send_response in enumerate(response.responses):
+        now = time.monotonic()
+        with self._cond:
+            for req in batch:
+                wait_ms = (now - req['queued_at']) * 1000
+                self._metrics['last_queue_wait_ms'] = wait_ms
+                self._metrics['max_queue_wait_ms'] = max(self._metrics['max_queue_wait_ms'], wait_ms)
+
+        token_snapshots = {}  # (site, area or None) -> tokens, resolved once per batch
+        messages, message_tokens = [], []
+        for req in batch:
+            site_name, room = req['site_name'], req['room']
+            # For escalated calls or when send_to_all is True, send to everyone
+            area = None if req['send_to_all'] else _detect_area_for_push(site_name, req['message_text'] or room)
+            snapshot_key = (site_name, area)
+            if snapshot_key not in token_snapshots:
+                if area is None:
+                    token_snapshots[snapshot_key] = _get_tokens_for_site(site_name)
+                else:
+                    token_snapshots[snapshot_key] = _get_tokens_for_site_by_area(site_name, area)
+
+            # Clean, glanceable notification — just the display text, big and simple
+            # message_text is already human-readable (e.g. "KURR RM 4.2 CALL" or "RM 56 BED - CALL")
+            title = (req['message_text'] or room).upper()
+            for token in token_snapshots[snapshot_key]:
+                messages.append(self.transport.build_message(
+                    token, title, 'CALLING', channel_id, sound_file, f'callbell-{room}'))
+                message_tokens.append(token)
+
+        invalid = []
+        for start in range(0, len(messages), FCM_MAX_BATCH):
+            chunk = messages[start:start + FCM_MAX_BATCH]
+            chunk_tokens = message_tokens[start:start + FCM_MAX_BATCH]
+            started = time.perf_counter()
+            try:
+                response = self.transport.send_each(chunk)
+            except Exception as e:
+                with self._cond:
+                    self._metrics['messages_failed'] += len(chunk)
+                logger.error(f"Failed to send push notification batch: {e}")
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._cond:
+                m = self._metrics
+                m['send_calls'] += 1
+                m['last_send_ms'] = elapsed_ms
+                m['max_send_ms'] = max(m['max_send_ms'], elapsed_ms)
+                m['total_send_ms'] += elapsed_ms
+                m['messages_sent'] += response.success_count
+                m['messages_failed'] += response.failure_count
+
+            for token, send_response in zip(chunk_tokens, response.responses):
                 if send_response.exception is not None:
                     error_code = getattr(send_response.exception, 'code', '')
                     if 'NOT_FOUND' in str(error_code) or 'UNREGISTERED' in str(error_code):
-                        try:
-                            with _open_db(_CALLBELL_DB) as conn:
-                                conn.execute('DELETE FROM device_tokens WHERE token = ?', (tokens[i],))
-                            logger.info("Removed invalid FCM token")
-                        except Exception:
-                            pass
-    except Exception as e:
-        logger.error(f"Failed to send push notification: {e}")
+                        invalid.append(token)
+        with self._cond:
+            self._metrics['batches'] += 1
+
+        rooms = ', '.join(sorted({f"{r['room']}@{r['site_name']}" for r in batch}))
+        logger.info(f"📤 Push batch for {rooms}: {len(messages)} messages")
+
+        if invalid:
+            try:
+                with _open_db(_CALLBELL_DB) as conn:
+                    conn.executemany('DELETE FROM device_tokens WHERE token = ?', [(t,) for t in invalid])
+            except Exception as e:
+                logger.error(f"Failed to remove invalid FCM tokens: {e}")
+            _get_session_registry().remove_token_many(invalid)
+            with self._cond:
+                self._metrics['invalid_tokens_removed'] += len(invalid)
+            logger.info(f"Removed {len(invalid)} invalid FCM token(s)")
+
+    def wait_idle(self, timeout: float = 5.0) -> bool:
+        """Block until the queue is empty and no batch is in flight (tests / shutdown)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def get_metrics(self) -> dict:
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics['queue_depth'] = len(self._pending)
+            metrics['in_flight'] = self._in_flight
+        metrics['avg_send_ms'] = (metrics['total_send_ms'] / metrics['send_calls']) if metrics['send_calls'] else 0.0
+        return metrics
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_push_dispatcher() -> PushDispatcher:
+    """Process-wide push dispatcher (uses FakeFCMTransport when FCM_FAKE_TRANSPORT=1)."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                fake = os.environ.get('FCM_FAKE_TRANSPORT', '').lower() in ('1', 'true', 'yes')
+                _dispatcher = PushDispatcher(FakeFCMTransport() if fake else None)
+    return _dispatcher
+
+
+def get_push_metrics() -> dict:
+    """Queue depth, coalescing and send latency counters for the debug endpoints."""
+    return get_push_dispatcher().get_metrics()
+
+
+def send_push_for_new_call(site_name: str, room: str, call_type: str, priority: int,
+                           message_text: str = '', card_level: str = 'green',
+                           send_to_all: bool = False):
+    """Queue an FCM push notification to devices at a site, filtered by area (non-blocking).
+    If send_to_all is True, skip area filtering (used for escalated calls)."""
+    get_push_dispatcher().submit(site_name, room, call_type, priority,
+                                 message_text=message_text, card_level=card_level,
+                                 send_to_all=send_to_all)
@@ -6,7 +6,10 @@ backlog = 2048
 
 # Worker processes
 workers = 4
-worker_class = "sync"
+# Threaded workers: callbell long-polls and log follow streams each hold a thread,
+# not a whole worker process
+worker_class = "gthread"
+threads = 16
 worker_connections = 1000
 timeout = 30
 keepalive = 2
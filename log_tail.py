@@ -0,0 +1,126 @@
+"""
+Log Tail
+Seek-based reading of line-oriented log files (text logs and JSONL usage logs).
+
+Nothing here reads a whole file: tail_lines() seeks backwards from the end in
+fixed-size blocks until it has enough lines, read_lines_from() reads forward from
+a byte offset, and follow_lines() polls for lines appended after an offset. Byte
+offsets always point at the start of a line, so callers can use them as paging
+cursors. A trailing line without a newline is still being written and is left for
+the next read.
+"""
+import os
+import time
+from typing import Iterator, List, Optional, Tuple
+
+TAIL_BLOCK_SIZE = 64 * 1024
+MAX_READ_BYTES = 16 * 1024 * 1024  # cap per request, even when lines are huge
+
+
+def _decode(raw: bytes) -> List[str]:
+    return [line.rstrip('\r') for line in raw.decode('utf-8', errors='ignore').split('\n')]
+
+
+def _last_line_end(f, end: int) -> int:
+    """Offset just past the last newline before `end` (0 if there is none)."""
+    pos = end
+    while pos > 0:
+        read_from = max(0, pos - TAIL_BLOCK_SIZE)
+        f.seek(read_from)
+        newline = f.read(pos - read_from).rfind(b'\n')
+        if newline != -1:
+            return read_from + newline + 1
+        pos = read_from
+    return 0
+
+
+def tail_lines(path: str, count: int, end: Optional[int] = None) -> Tuple[List[str], int, int]:
+    """
+    Last `count` complete lines ending at byte offset `end` (default: end of file).
+
+    Returns:
+        (lines, start_offset, end_offset) - start_offset is where the first returned
+        line begins (0 when the beginning of the file was reached)
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        end = _last_line_end(f, size if end is None else max(0, min(end, size)))
+        if count <= 0 or end == 0:
+            return [], end, end
+
+        # Read blocks backwards until count + 1 newlines (the extra one marks where
+        # the first wanted line starts) or the start of the file
+        chunks = []
+        newlines = 0
+        pos = end
+        while pos > 0 and newlines <= count and end - pos < MAX_READ_BYTES:
+            read_from = max(0, pos - TAIL_BLOCK_SIZE)
+            f.seek(read_from)
+            chunk = f.read(pos - read_from)
+            chunks.append(chunk)
+            newlines += chunk.count(b'\n')
+            pos = read_from
+
+    raw_lines = b''.join(reversed(chunks))[:-1].split(b'\n')
+    if pos > 0:
+        # Text before the first newline may be the tail of an earlier line
+        raw_lines = raw_lines[1:]
+    raw_lines = raw_lines[-count:]
+    start = end - sum(len(line) + 1 for line in raw_lines)
+    return (_decode(b'\n'.join(raw_lines)) if raw_lines else []), start, end
+
+
+def read_lines_from(path: str, offset: int, count: int) -> Tuple[List[str], int]:
+    """
+    Up to `count` complete lines starting at byte offset `offset`.
+
+    Returns:
+        (lines, next_offset) - next_offset is just past the last returned line
+    """
+    lines: List[bytes] = []
+    next_offset = offset
+    read_bytes = 0
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        buffer = b''
+        while len(lines) < count and read_bytes < MAX_READ_BYTES:
+            chunk = f.read(TAIL_BLOCK_SIZE)
+            if not chunk:
+                break
+            read_bytes += len(chunk)
+            buffer += chunk
+            *complete, buffer = buffer.split(b'\n')
+            for line in complete:
+                if len(lines) >= count:
+                    break
+                lines.append(line)
+                next_offset += len(line) + 1
+    return (_decode(b'\n'.join(lines)) if lines else []), next_offset
+
+
+def follow_lines(path: str, offset: int, poll_seconds: float = 1.0, max_seconds: float = 300.0,
+                 batch: int = 500) -> Iterator[Tuple[List[str], int, bool]]:
+    """
+    Yield (lines, next_offset, reset) as lines are appended after `offset`.
+
+    Yields ([], offset, False) on every idle poll so callers can send keep-alives,
+    and reset=True (starting again from 0) when the file was truncated or rotated.
+    Stops after max_seconds; the caller resumes with the last next_offset.
+    """
+    deadline = time.monotonic() + max_seconds
+    while time.monotonic() < deadline:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        reset = False
+        if size < offset:
+            offset, reset = 0, True
+        if size > offset:
+            lines, next_offset = read_lines_from(path, offset, batch)
+            if lines or reset:
+                offset = next_offset
+                yield lines, offset, reset
+                continue
+        yield [], offset, False
+        time.sleep(poll_seconds)
@@ -21,13 +21,89 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 import os
+import re
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 
 logger = logging.getLogger(__name__)
 
 # SQL Server allows max 2100 parameters per request; batch IN(...) to stay under limit
 IN_CLAUSE_BATCH_SIZE = 2000
 
+# AdverseEvent column that records the last modification (used as incremental sync watermark)
+# (alias.column only: the value is interpolated into SQL, so anything else is rejected at import)
+INCIDENT_MODIFIED_COLUMN = os.environ.get('MANAD_INCIDENT_MODIFIED_COLUMN', 'ae.LastUpdatedDate')
+if not re.match(r'^[A-Za-z_]\w*\.[A-Za-z_]\w*$', INCIDENT_MODIFIED_COLUMN):
+    raise ValueError(f"Invalid MANAD_INCIDENT_MODIFIED_COLUMN: {INCIDENT_MODIFIED_COLUMN!r} (expected alias.column)")
+# Sites whose AdverseEvent table lacks INCIDENT_MODIFIED_COLUMN (learned from the first
+# invalid-column error); their incident reads skip the column and never get a watermark
+_sites_without_modified_column: set = set()
+_sites_without_modified_column_lock = threading.Lock()
+
+# Note bodies for a page of progress notes, fetched in one batch instead of a correlated
+# subquery per row (placeholders filled per IN_CLAUSE_BATCH_SIZE chunk)
+PROGRESS_NOTE_BODY_QUERY = """
+    SELECT ProgressNoteId, Note
+    FROM ProgressNoteDetail
+    WHERE ProgressNoteId IN ({placeholders})
+"""
+
+# Progress note list totals are cached per filter signature for this long (seconds)
+PROGRESS_NOTE_COUNT_TTL = float(os.environ.get('PROGRESS_NOTE_COUNT_TTL', '60'))
+# Grouped progress note counts (dashboard stats, notes per day) are cached for this long (seconds)
+PROGRESS_NOTE_STATS_TTL = float(os.environ.get('PROGRESS_NOTE_STATS_TTL', '300'))
+_PROGRESS_NOTE_COUNT_CACHE_MAX = 512
+
+# GROUP BY expressions for fetch_progress_note_counts(group_by=...)
+PROGRESS_NOTE_COUNT_GROUPS = {
+    'day': "CAST(pn.Date AS date)",
+    'event_type': "pn.ProgressNoteEventTypeId",
+    'author': "ISNULL(pn.CreatedByUserId, 0)",
+}
+
+
+# ============================================
+# Progress note keyset cursors
+# ============================================
+def encode_progress_note_cursor(note: Dict[str, Any]) -> Optional[str]:
+    """Opaque 'next page' cursor for the last note of a page: '<EventDate ISO>|<Id>'"""
+    if not note or not note.get('EventDate') or note.get('Id') is None:
+        return None
+    return f"{note['EventDate']}|{note['Id']}"
+
+
+def decode_progress_note_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(Date, Id) from encode_progress_note_cursor(); raises ValueError if malformed"""
+    date_part, sep, id_part = (cursor or '').rpartition('|')
+    if not sep:
+        raise ValueError(f"Invalid progress note cursor: {cursor!r}")
+    return datetime.fromisoformat(date_part), int(id_part)
+
+
+_progress_note_count_cache: Dict[tuple, Tuple[float, int]] = {}
+_progress_note_count_lock = threading.Lock()
+
+
+def _get_cached_progress_note_count(key: tuple) -> Optional[Any]:
+    with _progress_note_count_lock:
+        entry = _progress_note_count_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+    return None
+
+
+def _set_cached_progress_note_count(key: tuple, count: Any, ttl: Optional[float] = None) -> None:
+    now = time.monotonic()
+    with _progress_note_count_lock:
+        if len(_progress_note_count_cache) >= _PROGRESS_NOTE_COUNT_CACHE_MAX:
+            for stale in [k for k, (expires, _) in _progress_note_count_cache.items() if expires <= now]:
+                del _progress_note_count_cache[stale]
+            if len(_progress_note_count_cache) >= _PROGRESS_NOTE_COUNT_CACHE_MAX:
+                _progress_note_count_cache.clear()
+        _progress_note_count_cache[key] = (now + (PROGRESS_NOTE_COUNT_TTL if ttl is None else ttl), count)
+
 # ============================================
 # Site Config JSON Loader
 # ============================================
@@ -164,6 +240,386 @@ DB direct access mode is currently enabled, but driver is missing. Switching to
             """)
 
 
+# ============================================
+# Connection Pool (process-wide, per site)
+# ============================================
+# Pool sizing can be tuned per deployment via environment variables
+POOL_MAX_SIZE = int(os.environ.get('MANAD_DB_POOL_MAX_SIZE', '4'))
+POOL_MAX_IDLE_SECONDS = float(os.environ.get('MANAD_DB_POOL_MAX_IDLE_SECONDS', '300'))
+POOL_CHECKOUT_TIMEOUT = float(os.environ.get('MANAD_DB_POOL_CHECKOUT_TIMEOUT', '30'))
+# Idle connections older than this are pinged (SELECT 1) before being handed out
+POOL_HEALTH_CHECK_AFTER_SECONDS = float(os.environ.get('MANAD_DB_POOL_HEALTH_CHECK_AFTER_SECONDS', '30'))
+
+_connection_string_cache: Dict[str, Any] = {}
+_connection_string_lock = threading.Lock()
+_odbc_drivers_cache: Optional[List[str]] = None
+
+
+def _is_invalid_column_error(error: Exception) -> bool:
+    """True if a pyodbc/pymssql error is SQL Server's 'Invalid column name' (error 207 / SQLSTATE 42S22)"""
+    message = str(error)
+    return 'Invalid column name' in message or '42S22' in message or '(207,' in message
+
+
+def _get_odbc_drivers() -> List[str]:
+    """Return installed ODBC drivers (probed once per process)"""
+    global _odbc_drivers_cache
+    if _odbc_drivers_cache is None:
+        import pyodbc  # type: ignore
+        _odbc_drivers_cache = list(pyodbc.drivers())
+    return _odbc_drivers_cache
+
+
+class MANADConnectionPool:
+    """Bounded pool of READ-ONLY MSSQL connections for a single site
+
+    - At most ``max_size`` connections are open at once (idle + checked out)
+    - Idle connections are pinged before reuse if they sat longer than
+      ``health_check_after`` seconds; broken ones are discarded
+    - Connections idle longer than ``max_idle`` seconds are closed
+    """
+
+    def __init__(self, site: str, connection_string: Any,
+                 max_size: int = POOL_MAX_SIZE,
+                 max_idle: float = POOL_MAX_IDLE_SECONDS,
+                 checkout_timeout: float = POOL_CHECKOUT_TIMEOUT,
+                 health_check_after: float = POOL_HEALTH_CHECK_AFTER_SECONDS):
+        self.site = site
+        self.connection_string = connection_string
+        self.max_size = max(1, max_size)
+        self.max_idle = max_idle
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+
+        self._idle: List[Tuple[Any, float]] = []  # (connection, returned_at), most recent last
+        self._in_use = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'closed': 0,
+            'evicted_idle': 0,
+            'failed_health_checks': 0,
+            'checkout_waits': 0,
+            'checkout_timeouts': 0,
+        }
+
+    def _open_connection(self):
+        """Open a new READ-ONLY connection"""
+        if DRIVER_AVAILABLE == 'pyodbc':
+            # Ensure module name is available even if driver was auto-installed
+            import pyodbc  # type: ignore
+            conn = pyodbc.connect(self.connection_string)  # type: ignore
+
+            # Read-only security settings
+            conn.autocommit = False  # Cannot change without explicit commit
+
+            # Improve read performance with READ UNCOMMITTED (minimize locks)
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED")
+                logger.debug(f"🔒 READ-ONLY mode: {self.site}")
+            except:
+                pass  # May not be supported in some environments
+            cursor.close()
+            return conn
+
+        elif DRIVER_AVAILABLE == 'pymssql':
+            # Ensure module name is available even if driver was auto-installed
+            import pymssql  # type: ignore
+            conn = pymssql.connect(**self.connection_string)  # type: ignore
+            conn.autocommit = False
+            return conn
+
+        error_msg = (
+            "MSSQL driver is not installed.\n"
+            "Please install using:\n"
+            "  pip install pyodbc\n"
+            "or\n"
+            "  pip install pymssql\n\n"
+            "Windows users also need ODBC Driver 17 for SQL Server."
+        )
+        raise ImportError(error_msg)
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        """Cheap liveness probe for an idle connection"""
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle_locked(self, now: float) -> List[Any]:
+        """Remove expired idle connections (caller holds the lock); returns them for closing"""
+        expired = [conn for conn, returned_at in self._idle if now - returned_at > self.max_idle]
+        if expired:
+            self._idle = [(conn, returned_at) for conn, returned_at in self._idle
+                          if now - returned_at <= self.max_idle]
+            self._stats['evicted_idle'] += len(expired)
+            self._stats['closed'] += len(expired)
+        return expired
+
+    def acquire(self):
+        """Check out a connection, reusing an idle one when possible"""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            candidate = None
+            idle_for = 0.0
+            with self._cond:
+                now = time.monotonic()
+                expired = self._evict_idle_locked(now)
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['checkout_timeouts'] += 1
+                        raise TimeoutError(
+                            f"MANAD DB pool exhausted for {self.site} "
+                            f"({self.max_size} connections in use)"
+                        )
+                    self._stats['checkout_waits'] += 1
+                    self._cond.wait(remaining)
+                if self._idle:
+                    candidate, returned_at = self._idle.pop()
+                    idle_for = time.monotonic() - returned_at
+                self._in_use += 1
+
+            for conn in expired:
+                self._close_quietly(conn)
+
+            if candidate is None:
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    self._release_slot()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+                return conn
+
+            if idle_for < self.health_check_after or self._is_healthy(candidate):
+                with self._cond:
+                    self._stats['reused'] += 1
+                return candidate
+
+            # Stale connection: drop it and try again
+            logger.warning(f"⚠️ Discarding unhealthy pooled connection: {self.site}")
+            self._close_quietly(candidate)
+            with self._cond:
+                self._stats['failed_health_checks'] += 1
+                self._stats['closed'] += 1
+            self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Return a connection to the pool (rolled back), or close it if discarded"""
+        if not discard:
+            try:
+                # Read-only guarantee: rollback all changes
+                if not conn.autocommit:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._close_quietly(conn)
+            with self._cond:
+                self._stats['closed'] += 1
+            self._release_slot()
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._in_use -= 1
+            self._cond.notify()
+
+    def close_all(self) -> None:
+        """Close every idle connection (checked-out connections close on release)"""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle = []
+            self._stats['closed'] += len(idle)
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool statistics snapshot"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'site': self.site,
+                'max_size': self.max_size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+            })
+        return stats
+
+
+_connection_pools: Dict[str, MANADConnectionPool] = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(site: str, connection_string: Any) -> MANADConnectionPool:
+    """Return the process-wide pool for a site (created on first use)"""
+    with _connection_pools_lock:
+        pool = _connection_pools.get(site)
+        if pool is None or pool.connection_string != connection_string:
+            if pool is not None:
+                pool.close_all()
+            pool = MANADConnectionPool(site, connection_string)
+            _connection_pools[site] = pool
+        return pool
+
+
+def get_connection_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return statistics for every site pool"""
+    with _connection_pools_lock:
+        pools = list(_connection_pools.values())
+    return {pool.site: pool.get_stats() for pool in pools}
+
+
+def close_all_connection_pools() -> None:
+    """Close all idle pooled connections and forget cached connection strings"""
+    with _connection_pools_lock:
+        pools = list(_connection_pools.values())
+        _connection_pools.clear()
+    for pool in pools:
+        pool.close_all()
+    with _connection_string_lock:
+        _connection_string_cache.clear()
+
+
+# ============================================
+# Multi-site Fan-out (parallel per-site queries)
+# ============================================
+FANOUT_MAX_WORKERS = int(os.environ.get('MANAD_FANOUT_MAX_WORKERS', '10'))
+FANOUT_SITE_TIMEOUT = float(os.environ.get('MANAD_FANOUT_SITE_TIMEOUT', '60'))
+
+_fanout_executor: Optional[ThreadPoolExecutor] = None
+_fanout_executor_lock = threading.Lock()
+
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    """Return the shared executor used for per-site fan-out (created lazily)"""
+    global _fanout_executor
+    with _fanout_executor_lock:
+        if _fanout_executor is None:
+            _fanout_executor = ThreadPoolExecutor(
+                max_workers=FANOUT_MAX_WORKERS,
+                thread_name_prefix='manad-fanout'
+            )
+        return _fanout_executor
+
+
+class SiteFanOutResult:
+    """Outcome of running one callable against several sites concurrently
+
+    Attributes:
+        results: {site: return value} for sites that completed
+        errors: {site: error message} for sites that raised
+        timed_out: sites that did not finish within the timeout
+        durations_ms: {site: elapsed milliseconds} for finished sites
+        elapsed_ms: wall-clock time of the whole fan-out
+    """
+
+    def __init__(self, sites: List[str]):
+        self.sites = list(sites)
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.timed_out: List[str] = []
+        self.durations_ms: Dict[str, float] = {}
+        self.elapsed_ms = 0.0
+
+    @property
+    def failed_sites(self) -> List[str]:
+        return [site for site in self.sites if site in self.errors or site in self.timed_out]
+
+    @property
+    def is_partial(self) -> bool:
+        return bool(self.failed_sites)
+
+    def ordered_results(self) -> List[Tuple[str, Any]]:
+        """Return (site, result) pairs for completed sites in the original site order"""
+        return [(site, self.results[site]) for site in self.sites if site in self.results]
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly partial-result report"""
+        return {
+            'partial': self.is_partial,
+            'failed_sites': self.failed_sites,
+            'errors': dict(self.errors),
+            'timed_out': list(self.timed_out),
+            'site_durations_ms': dict(self.durations_ms),
+            'elapsed_ms': round(self.elapsed_ms, 1),
+        }
+
+
+def run_for_sites(sites: List[str], func, timeout: Optional[float] = None) -> SiteFanOutResult:
+    """Run ``func(site)`` for every site concurrently on the shared executor
+
+    Wall-clock time is bounded by the slowest site (or ``timeout`` seconds).
+    Sites that raise or exceed the timeout are reported in the result instead
+    of failing the whole call; a timed-out query keeps running in the
+    background but its result is discarded.
+
+    Usage example:
+        fanout = run_for_sites(site_names, lambda site: MANADDBConnector(site).fetch_clients())
+        for site, (success, clients) in fanout.ordered_results():
+            ...
+    """
+    timeout = FANOUT_SITE_TIMEOUT if timeout is None else timeout
+    fanout = SiteFanOutResult(sites)
+    started = time.monotonic()
+
+    def _timed_call(site):
+        call_started = time.monotonic()
+        try:
+            return func(site)
+        finally:
+            fanout.durations_ms[site] = round((time.monotonic() - call_started) * 1000, 1)
+
+    executor = _get_fanout_executor()
+    futures = {executor.submit(_timed_call, site): site for site in fanout.sites}
+    done, not_done = wait_futures(futures, timeout=timeout)
+
+    for future in done:
+        site = futures[future]
+        try:
+            fanout.results[site] = future.result()
+        except Exception as e:
+            fanout.errors[site] = str(e)
+            logger.warning(f"⚠️ Site query failed ({site}): {e}")
+
+    for future in not_done:
+        site = futures[future]
+        future.cancel()
+        fanout.timed_out.append(site)
+        logger.warning(f"⏱️ Site query timed out after {timeout}s: {site}")
+
+    fanout.elapsed_ms = (time.monotonic() - started) * 1000
+    logger.info(
+        f"🔀 Fan-out completed: {len(fanout.results)}/{len(fanout.sites)} sites "
+        f"in {fanout.elapsed_ms:.0f}ms"
+    )
+    return fanout
+
+
 class MANADDBConnector:
     """MANAD MSSQL Database Direct Connection Class"""
     
@@ -173,8 +629,22 @@ class MANADDBConnector:
             site: Site name (e.g., 'Parafield Gardens')
         """
         self.site = site
-        self.connection_string = self._get_connection_string(site)
-        self._connection_pool = {}
+        self.connection_string = self._get_cached_connection_string(site)
+        self._connection_pool = (
+            get_connection_pool(site, self.connection_string) if self.connection_string else None
+        )
+    
+    def _get_cached_connection_string(self, site: str) -> Optional[Any]:
+        """Return connection string for the site, built once per process"""
+        with _connection_string_lock:
+            if site in _connection_string_cache:
+                return _connection_string_cache[site]
+        
+        connection_string = self._get_connection_string(site)
+        if connection_string:
+            with _connection_string_lock:
+                _connection_string_cache[site] = connection_string
+        return connection_string
     
     def _get_connection_string(self, site: str) -> Optional[str]:
         """Generate MSSQL connection string for each site
@@ -231,8 +701,7 @@ class MANADDBConnector:
         if DRIVER_AVAILABLE == 'pyodbc':
             # Check available drivers
             try:
-                import pyodbc
-                available_drivers = pyodbc.drivers()
+                available_drivers = _get_odbc_drivers()
                 # Priority: ODBC Driver 17/18 > SQL Server Native Client > SQL Server
                 preferred_drivers = [
                     '{ODBC Driver 17 for SQL Server}',
@@ -312,10 +781,14 @@ class MANADDBConnector:
         
         ⚠️  Important: This is a read-only connection
         
+        Connections are checked out from the process-wide per-site pool
+        (MANADConnectionPool) and returned on exit, so repeated queries skip
+        the TCP/TLS/login handshake.
+        
         Security policy:
         1. ApplicationIntent=ReadOnly: Set in connection string
         2. autocommit=False: Auto-commit disabled
-        3. rollback(): Automatic rollback in finally block
+        3. rollback(): Automatic rollback before returning to the pool
         4. commit() not called: Never commit data changes
         
         Usage example:
@@ -324,70 +797,48 @@ class MANADDBConnector:
                 cursor.execute("SELECT * FROM Event")  # ✅ OK
                 # cursor.execute("INSERT INTO ...")    # ⚠️ Will be rolled back even if executed
         """
-        conn = None
+        if not self.connection_string or self._connection_pool is None:
+            error = ValueError(f"DB connection information for {self.site} is not configured.")
+            logger.error(f"❌ DB connection error ({self.site}): {error}")
+            raise error
+        
+        try:
+            conn = self._connection_pool.acquire()
+        except Exception as e:
+            logger.error(f"❌ DB connection error ({self.site}): {e}")
+            raise
+        
+        discard = False
         try:
-            if not self.connection_string:
-                raise ValueError(f"DB connection information for {self.site} is not configured.")
-            
-            if DRIVER_AVAILABLE == 'pyodbc':
-                # Ensure module name is available even if driver was auto-installed
-                import pyodbc  # type: ignore
-                conn = pyodbc.connect(self.connection_string)  # type: ignore
-                
-                # Read-only security settings
-                conn.autocommit = False  # Cannot change without explicit commit
-                
-                # Improve read performance with READ UNCOMMITTED (minimize locks)
-                cursor = conn.cursor()
-                try:
-                    cursor.execute("SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED")
-                    logger.debug(f"🔒 READ-ONLY mode: {self.site}")
-                except:
-                    pass  # May not be supported in some environments
-                cursor.close()
-                
-            elif DRIVER_AVAILABLE == 'pymssql':
-                # Ensure module name is available even if driver was auto-installed
-                import pymssql  # type: ignore
-                conn = pymssql.connect(**self.connection_string)  # type: ignore
-                conn.autocommit = False
-            else:
-                error_msg = (
-                    "MSSQL driver is not installed.\n"
-                    "Please install using:\n"
-                    "  pip install pyodbc\n"
-                    "or\n"
-                    "  pip install pymssql\n\n"
-                    "Windows users also need ODBC Driver 17 for SQL Server."
-                )
-                raise ImportError(error_msg)
-            
             yield conn
             
             # ⚠️ Important: commit() is not called (READ-ONLY guarantee)
-            # All changes are automatically rolled back in finally block
+            # All changes are rolled back when the connection returns to the pool
             
         except Exception as e:
+            # Connection state is unknown after an error; do not reuse it
+            discard = True
             logger.error(f"❌ DB connection error ({self.site}): {e}")
             raise
         finally:
-            if conn:
-                try:
-                    # Read-only guarantee: rollback all changes
-                    if not conn.autocommit:
-                        conn.rollback()
-                    conn.close()
-                    logger.debug(f"🔒 Connection closed (rollback complete): {self.site}")
-                except:
-                    pass
+            self._connection_pool.release(conn, discard=discard)
+            logger.debug(f"🔒 Connection released (rollback complete): {self.site}")
     
-    def fetch_incidents(self, start_date: str, end_date: str) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
+    def fetch_incidents(self, start_date: str, end_date: str,
+                        modified_since: Optional[datetime] = None,
+                        include_modified: bool = False) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
         """
         Query Incident data directly from DB
         
         Args:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
+            modified_since: If set, only incidents modified at/after this MANAD
+                server time (INCIDENT_MODIFIED_COLUMN) are returned (incremental sync)
+            include_modified: Select INCIDENT_MODIFIED_COLUMN as LastUpdatedDate without
+                filtering on it (full sync, to seed the watermark). If the site's table has
+                no such column, the query is retried once without it and the site is
+                remembered, so its syncs fall back to full window reads without a watermark
             
         Returns:
             (Success status, Incident list)
@@ -412,7 +863,14 @@ class MANADDBConnector:
                 # Query matching actual MANAD DB structure
                 # AdverseEvent table: Actual table where Incident data is stored
                 # StatusEnumId: 0=Open, 1=In Progress(?), 2=Closed
-                query = """
+                # The modified column is only read by the incident sync (see include_modified)
+                with _sites_without_modified_column_lock:
+                    use_modified = (modified_since is not None or include_modified) \
+                        and self.site not in _sites_without_modified_column
+                modified_select = ""
+                if use_modified:
+                    modified_select = f"\n                        {INCIDENT_MODIFIED_COLUMN} AS LastUpdatedDate,"
+                query = f"""
                     SELECT 
                         ae.Id,
                         ae.ClientId,
@@ -439,7 +897,7 @@ class MANADDBConnector:
                         ae.IsAmbulanceCalled,
                         ae.IsAdmittedToHospital,
                         ae.IsMajorInjury,
-                        ae.ReviewedDate,
+                        ae.ReviewedDate,{modified_select}
                         -- Event Types (using AdverseEvent_AdverseEventType junction table)
                         ISNULL(
                             (SELECT TOP 1 aet.Description 
@@ -455,16 +913,37 @@ class MANADDBConnector:
                     LEFT JOIN Person pr_reported ON ae.ReportedById = pr_reported.Id
                     WHERE ae.Date >= ? AND ae.Date <= ?
                     AND ae.IsDeleted = 0
-                    ORDER BY ae.Date DESC
                 """
                 
                 # Convert date parameters
                 start_dt = datetime.fromisoformat(start_date)
                 end_dt = datetime.fromisoformat(end_date) + timedelta(days=1)  # Add one day to include end date
+                params = [start_dt, end_dt]
                 
-                logger.info(f"🔍 Executing DB query: {self.site} ({start_date} ~ {end_date})")
+                modified_filter = ""
+                modified_params = []
+                if modified_since is not None and use_modified:
+                    # Incremental: only rows changed since the watermark (second precision)
+                    modified_filter = f" AND {INCIDENT_MODIFIED_COLUMN} >= ?"
+                    modified_params = [modified_since.replace(microsecond=0)]
                 
-                cursor.execute(query, (start_dt, end_dt))
+                logger.info(
+                    f"🔍 Executing DB query: {self.site} ({start_date} ~ {end_date}"
+                    f"{f', modified since {modified_since.isoformat()}' if modified_since and use_modified else ''})"
+                )
+                
+                try:
+                    cursor.execute(query + modified_filter + " ORDER BY ae.Date DESC", params + modified_params)
+                except Exception as e:
+                    if not use_modified or not _is_invalid_column_error(e):
+                        raise
+                    logger.warning(
+                        f"⚠️ {self.site}: AdverseEvent has no {INCIDENT_MODIFIED_COLUMN} column, "
+                        f"incident sync falls back to full reads without a watermark"
+                    )
+                    with _sites_without_modified_column_lock:
+                        _sites_without_modified_column.add(self.site)
+                    cursor.execute(query.replace(modified_select, "") + " ORDER BY ae.Date DESC", params)
                 
                 # Convert results to dictionary
                 columns = [column[0] for column in cursor.description]
@@ -630,7 +1109,8 @@ class MANADDBConnector:
             'IsAmbulanceCalled': bool(db_row.get('IsAmbulanceCalled', False)),
             'IsAdmittedToHospital': bool(db_row.get('IsAdmittedToHospital', False)),
             'IsMajorInjury': bool(db_row.get('IsMajorInjury', False)),
-            'ReviewedDate': db_row.get('ReviewedDate').isoformat() if db_row.get('ReviewedDate') else None
+            'ReviewedDate': db_row.get('ReviewedDate').isoformat() if db_row.get('ReviewedDate') else None,
+            'LastUpdatedDate': db_row.get('LastUpdatedDate').isoformat() if db_row.get('LastUpdatedDate') else None
         }
     
     def _format_client_for_api(self, db_row: Dict) -> Dict[str, Any]:
@@ -664,7 +1144,9 @@ class MANADDBConnector:
                              progress_note_event_type_id: Optional[int] = None,
                              progress_note_event_type_ids: Optional[List[int]] = None,
                              client_service_id: Optional[int] = None,
-                             return_total: bool = False) -> Tuple[bool, Optional[List[Dict[str, Any]]], Optional[int]]:
+                             return_total: bool = False,
+                             after: Optional[Tuple[datetime, int]] = None,
+                             include_notes: bool = True) -> Tuple[bool, Optional[List[Dict[str, Any]]], Optional[int]]:
         """
         Query Progress Notes data directly from DB
         
@@ -672,11 +1154,16 @@ class MANADDBConnector:
             start_date: Start date (datetime, default: 14 days ago)
             end_date: End date (datetime, default: now)
             limit: Maximum number of records to fetch
-            offset: Number of rows to skip (for server pagination)
+            offset: Number of rows to skip (for server pagination; ignored when `after` is set)
             progress_note_event_type_id: Filter by specific event type ID (single)
             progress_note_event_type_ids: Filter by event type IDs (list; preferred over single id if non-empty)
             client_service_id: Filter by specific client service ID
-            return_total: If True, run COUNT and return (success, notes, total_count)
+            return_total: If True, return (success, notes, total_count); the COUNT is cached
+                per filter for PROGRESS_NOTE_COUNT_TTL seconds
+            after: Keyset cursor (Date, Id) of the last note of the previous page
+                (see decode_progress_note_cursor); pages stay O(limit) at any depth
+            include_notes: If False, return headers only (NotesPlainText None, NotesLoaded False);
+                bodies can be fetched later with fetch_progress_note_bodies()
             
         Returns:
             (Success status, Progress Notes list, total_count or None)
@@ -700,7 +1187,7 @@ class MANADDBConnector:
             if end_date is None:
                 end_date = datetime.now()
             
-            logger.info(f"🔍 [FILTER] Starting fetch_progress_notes - site={self.site}, client_service_id={client_service_id}, limit={limit}, offset={offset}, return_total={return_total}")
+            logger.info(f"🔍 [FILTER] Starting fetch_progress_notes - site={self.site}, client_service_id={client_service_id}, limit={limit}, offset={offset}, after={after}, return_total={return_total}")
             logger.info(f"🔍 [FILTER] Date range: {start_date.date()} ~ {end_date.date()}")
             
             with self.get_connection() as conn:
@@ -734,11 +1221,18 @@ class MANADDBConnector:
                     logger.info("🔍 [FILTER] No Client Service ID filter - fetching all clients")
                 
                 total_count = None
-                if return_total or offset > 0:
-                    count_query = "SELECT COUNT(DISTINCT pn.Id) " + where_clause
-                    cursor.execute(count_query, params_where)
-                    total_count = cursor.fetchone()[0]
-                    logger.info(f"🔍 [FILTER] Total count: {total_count}")
+                if return_total:
+                    count_key = (self.site, start_date, end_date, tuple(progress_note_event_type_ids or ()),
+                                 progress_note_event_type_id, client_service_id)
+                    total_count = _get_cached_progress_note_count(count_key)
+                    if total_count is None:
+                        count_query = "SELECT COUNT(DISTINCT pn.Id) " + where_clause
+                        cursor.execute(count_query, params_where)
+                        total_count = cursor.fetchone()[0]
+                        _set_cached_progress_note_count(count_key, total_count)
+                        logger.info(f"🔍 [FILTER] Total count: {total_count}")
+                    else:
+                        logger.info(f"🔍 [FILTER] Total count (cached): {total_count}")
                 
                 # Main query: SELECT ... ORDER BY ... [OFFSET/FETCH or TOP]
                 cols = (
@@ -750,11 +1244,19 @@ class MANADDBConnector:
                     "ISNULL(cs.LocationId, 0) AS LocationId, ISNULL(loc.Name, '') AS LocationName, "
                     "ISNULL(pne.Id, 0) AS EventTypeId, ISNULL(pne.Description, '') AS EventTypeDescription, "
                     "ISNULL(pne.ColorArgb, 0) AS EventTypeColorArgb, "
-                    "(SELECT TOP 1 Note FROM ProgressNoteDetail WHERE ProgressNoteId = pn.Id) AS NotesPlainText, "
                     "ISNULL(pn.CreatedByUserId, 0) AS CreatedByUserId"
                 )
-                order_by = " ORDER BY pn.Date DESC"
-                if offset > 0:
+                # Id breaks ties so keyset pages never skip or repeat notes with the same Date
+                order_by = " ORDER BY pn.Date DESC, pn.Id DESC"
+                if after is not None:
+                    # Keyset: seek past the previous page's last (Date, Id). CAST keeps the
+                    # comparison in datetime precision (pyodbc binds datetime2)
+                    after_date, after_id = after
+                    query = ("SELECT TOP (?) " + cols + " " + where_clause
+                             + " AND (pn.Date < CAST(? AS datetime) OR (pn.Date = CAST(? AS datetime) AND pn.Id < ?))"
+                             + order_by)
+                    params = [limit] + params_where + [after_date, after_date, after_id]
+                elif offset > 0:
                     query = "SELECT " + cols + " " + where_clause + order_by + " OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
                     params = params_where + [offset, limit]
                 else:
@@ -779,6 +1281,8 @@ class MANADDBConnector:
                     note_dict = dict(zip(columns, row))
                     progress_note_ids.append(note_dict['Id'])
                 
+                note_bodies = self._fetch_note_bodies(cursor, progress_note_ids) if include_notes else {}
+                
                 care_area_mappings = {}
                 care_area_details = {}  # default so it's defined when progress_note_ids is empty
                 if progress_note_ids:
@@ -848,7 +1352,8 @@ class MANADDBConnector:
                         'ProgressNoteRiskRatingId': note_dict.get('ProgressNoteRiskRatingId'),
                         'IsArchived': bool(note_dict.get('IsArchived', False)),
                         'IsDeleted': bool(note_dict.get('IsDeleted', False)),
-                        'NotesPlainText': note_dict.get('NotesPlainText', ''),
+                        'NotesPlainText': note_bodies.get(progress_note_id),
+                        'NotesLoaded': include_notes,
                         'ProgressNoteEventType': {
                             'Id': note_dict.get('EventTypeId', 0),
                             'Description': note_dict.get('EventTypeDescription', ''),
@@ -894,6 +1399,141 @@ class MANADDBConnector:
             logger.error(traceback.format_exc())
             return (False, None, None)
     
+    @staticmethod
+    def _fetch_note_bodies(cursor, progress_note_ids: List[int]) -> Dict[int, Any]:
+        """{ProgressNoteId: Note} in IN(...) batches (first detail row per note, as TOP 1 did)"""
+        bodies = {}
+        for chunk_start in range(0, len(progress_note_ids), IN_CLAUSE_BATCH_SIZE):
+            chunk = progress_note_ids[chunk_start:chunk_start + IN_CLAUSE_BATCH_SIZE]
+            cursor.execute(PROGRESS_NOTE_BODY_QUERY.format(placeholders=','.join('?' * len(chunk))), chunk)
+            for progress_note_id, note in cursor.fetchall():
+                bodies.setdefault(progress_note_id, note)
+        return bodies
+    
+    def fetch_progress_note_bodies(self, progress_note_ids: List[int]) -> Tuple[bool, Optional[Dict[int, Any]]]:
+        """
+        Note bodies for progress notes fetched with include_notes=False
+        
+        Returns:
+            (Success status, {ProgressNoteId: NotesPlainText})
+        """
+        if not DRIVER_AVAILABLE:
+            raise ImportError("MSSQL driver is not installed.")
+        try:
+            with self.get_connection() as conn:
+                return (True, self._fetch_note_bodies(conn.cursor(), list(progress_note_ids)))
+        except Exception as e:
+            logger.error(f"❌ Progress note body fetch error ({self.site}): {e}")
+            return (False, None)
+    
+    def fetch_progress_note_counts(self,
+                                   start_date: datetime,
+                                   end_date: datetime,
+                                   group_by: Tuple[str, ...] = ('day', 'event_type', 'author'),
+                                   progress_note_event_type_ids: Optional[List[int]] = None,
+                                   client_service_id: Optional[int] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Progress note counts grouped by day / event type / author, in one SQL statement
+        (GROUPING SETS), without fetching the notes themselves. Cached per filter
+        signature for PROGRESS_NOTE_STATS_TTL seconds.
+        
+        Args:
+            start_date, end_date: Date range (inclusive, same filter as fetch_progress_notes)
+            group_by: Any of PROGRESS_NOTE_COUNT_GROUPS ('day', 'event_type', 'author')
+            progress_note_event_type_ids: Only count these event types
+            client_service_id: Only count notes of this client service
+        
+        Returns:
+            (Success status, {'total': int,
+                              'by_day': [{'date': 'YYYY-MM-DD', 'count': int}, ...] (ascending),
+                              'by_event_type': [{'event_type_id', 'description', 'count'}, ...],
+                              'by_author': [{'created_by_user_id', 'count'}, ...]})
+            Only the requested groupings are included.
+        """
+        unknown = [group for group in group_by if group not in PROGRESS_NOTE_COUNT_GROUPS]
+        if unknown:
+            raise ValueError(f"Unknown progress note count grouping: {unknown}")
+        if not DRIVER_AVAILABLE:
+            raise ImportError("MSSQL driver is not installed.")
+        
+        cache_key = ('counts', self.site, start_date, end_date, tuple(group_by),
+                     tuple(progress_note_event_type_ids or ()), client_service_id)
+        cached = _get_cached_progress_note_count(cache_key)
+        if cached is not None:
+            return (True, cached)
+        
+        try:
+            # Groupings that were not requested are selected as constants (not in GROUP BY)
+            def group_column(group):
+                expr = PROGRESS_NOTE_COUNT_GROUPS[group]
+                return (expr, f"GROUPING({expr})") if group in group_by else ("NULL", "1")
+            day_expr, grouped_day_expr = group_column('day')
+            type_expr, grouped_type_expr = group_column('event_type')
+            author_expr, grouped_author_expr = group_column('author')
+            grouping_sets = ''.join(f"({PROGRESS_NOTE_COUNT_GROUPS[group]}), " for group in group_by)
+            query = f"""
+                SELECT
+                    {day_expr} AS NoteDay,
+                    {type_expr} AS EventTypeId,
+                    MAX(ISNULL(pne.Description, '')) AS EventTypeDescription,
+                    {author_expr} AS CreatedByUserId,
+                    {grouped_day_expr} AS GroupedDay,
+                    {grouped_type_expr} AS GroupedEventType,
+                    {grouped_author_expr} AS GroupedAuthor,
+                    COUNT(*) AS NoteCount
+                FROM ProgressNote pn
+                LEFT JOIN ProgressNoteEventType pne ON pn.ProgressNoteEventTypeId = pne.Id
+                WHERE pn.IsDeleted = 0
+                AND pn.Date >= ? AND pn.Date <= ?
+            """
+            params = [start_date, end_date]
+            if progress_note_event_type_ids:
+                query += f" AND pn.ProgressNoteEventTypeId IN ({','.join('?' * len(progress_note_event_type_ids))})"
+                params.extend(progress_note_event_type_ids)
+            if client_service_id is not None:
+                query += " AND pn.ClientServiceId = ?"
+                params.append(client_service_id)
+            # () = grand total row
+            query += f" GROUP BY GROUPING SETS ({grouping_sets}())"
+            
+            counts: Dict[str, Any] = {'total': 0}
+            for group in group_by:
+                counts[f'by_{group}'] = []
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                for (note_day, event_type_id, description, author_id,
+                     grouped_day, grouped_type, grouped_author, note_count) in cursor.fetchall():
+                    if grouped_day and grouped_type and grouped_author:
+                        counts['total'] = note_count
+                    elif not grouped_day:
+                        counts['by_day'].append({
+                            'date': note_day.isoformat() if hasattr(note_day, 'isoformat') else str(note_day),
+                            'count': note_count
+                        })
+                    elif not grouped_type:
+                        counts['by_event_type'].append({
+                            'event_type_id': event_type_id,
+                            'description': description,
+                            'count': note_count
+                        })
+                    elif not grouped_author:
+                        counts['by_author'].append({'created_by_user_id': author_id, 'count': note_count})
+            
+            if 'by_day' in counts:
+                counts['by_day'].sort(key=lambda row: row['date'])
+            for key in ('by_event_type', 'by_author'):
+                if key in counts:
+                    counts[key].sort(key=lambda row: row['count'], reverse=True)
+            
+            _set_cached_progress_note_count(cache_key, counts, ttl=PROGRESS_NOTE_STATS_TTL)
+            logger.info(f"📊 Progress note counts ({self.site}): total={counts['total']}, groups={list(group_by)}")
+            return (True, counts)
+        except Exception as e:
+            logger.error(f"❌ Progress note count error ({self.site}): {e}")
+            return (False, None)
+    
     def fetch_care_areas(self) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
         """
         Query Care Area data directly from DB
@@ -1037,7 +1677,9 @@ def fetch_incidents_with_client_data_from_db(
     site: str, 
     start_date: str, 
     end_date: str, 
-    fetch_clients: bool = True
+    fetch_clients: bool = True,
+    modified_since: Optional[datetime] = None,
+    include_modified: bool = False
 ) -> Optional[Dict[str, Any]]:
     """
     Function to fetch Incident and Client data directly from DB
@@ -1048,6 +1690,8 @@ def fetch_incidents_with_client_data_from_db(
         start_date: Start date
         end_date: End date
         fetch_clients: Whether to also fetch Client data
+        modified_since: Only incidents modified since this MANAD time (incremental sync)
+        include_modified: Also return LastUpdatedDate (full sync, seeds the watermark)
         
     Returns:
         Dictionary in format {'incidents': [...], 'clients': [...]}
@@ -1056,7 +1700,9 @@ def fetch_incidents_with_client_data_from_db(
         connector = MANADDBConnector(site)
         
         # Query Incidents
-        incidents_success, incidents = connector.fetch_incidents(start_date, end_date)
+        incidents_success, incidents = connector.fetch_incidents(
+            start_date, end_date, modified_since=modified_since, include_modified=include_modified
+        )
         if not incidents_success:
             logger.error(f"Failed to fetch incidents from DB for {site}")
             return None
@@ -45,6 +45,9 @@ def migrate_cims_incidents_table(db_path='progress_report.db'):
             ('is_major_injury', 'INTEGER', '0'),
             ('reviewed_date', 'TIMESTAMP', 'NULL'),
             ('status_enum_id', 'INTEGER', 'NULL'),
+            ('fall_type', 'VARCHAR(50)', 'NULL'),
+            ('fall_type_classifier', 'VARCHAR(50)', 'NULL'),
+            ('manad_content_hash', 'VARCHAR(40)', 'NULL'),
         ]
         
         added_columns = []
@@ -64,6 +67,18 @@ def migrate_cims_incidents_table(db_path='progress_report.db'):
             else:
                 logger.debug(f"⏭️  Column already exists: {column_name}")
         
+        # Indexes used by the incident list / sync queries
+        indexes_to_create = [
+            ('idx_cims_incidents_site_date', 'cims_incidents(site, incident_date)'),
+            ('idx_cims_incidents_date', 'cims_incidents(incident_date)'),
+            ('idx_cims_incidents_manad_id', 'cims_incidents(manad_incident_id)'),
+        ]
+        for index_name, index_target in indexes_to_create:
+            try:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {index_target}")
+            except sqlite3.OperationalError as e:
+                logger.error(f"❌ Failed to create index {index_name}: {str(e)}")
+        
         conn.commit()
         
         if added_columns:
@@ -0,0 +1,370 @@
+"""
+Progress Note Mirror
+Local SQLite copy of recent MANAD progress notes (per site, rolling window) with an
+FTS5 index on the note text, so list filters and text search run locally.
+
+A background thread refreshes each site every PROGRESS_NOTE_MIRROR_SYNC_SECONDS:
+the last PROGRESS_NOTE_MIRROR_RECENT_DAYS are re-read every cycle (new and edited
+notes), the whole PROGRESS_NOTE_MIRROR_DAYS window every PROGRESS_NOTE_MIRROR_FULL_EVERY
+cycles (late entries, deletions). Notes are read from MANAD with keyset paging, so a
+sync costs one short query per page. Notes that disappear from a re-read span and
+notes older than the window are removed.
+
+Every process (gunicorn workers) may start the sync thread, but only the holder of
+the progress_note_mirror_lease row syncs; the others only retry the lease every
+cycle, so MANAD sees one sync regardless of the worker count. The lease is renewed
+before each site and expires PROGRESS_NOTE_MIRROR_LEASE_SECONDS after the last
+renewal, so another process takes over when the holder exits.
+
+The mirror only syncs in DB direct access mode (USE_DB_DIRECT_ACCESS); query()
+answers for sites that have completed at least one full sync (see covers()).
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings_service import use_db_direct_access
+
+logger = logging.getLogger(__name__)
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_MIRROR_DB = os.path.join(_BASE_DIR, 'progress_note_mirror.db')
+
+MIRROR_DAYS = int(os.environ.get('PROGRESS_NOTE_MIRROR_DAYS', '30'))
+RECENT_DAYS = int(os.environ.get('PROGRESS_NOTE_MIRROR_RECENT_DAYS', '2'))
+SYNC_SECONDS = float(os.environ.get('PROGRESS_NOTE_MIRROR_SYNC_SECONDS', '600'))
+FULL_SYNC_EVERY = int(os.environ.get('PROGRESS_NOTE_MIRROR_FULL_EVERY', '6'))
+LEASE_SECONDS = float(os.environ.get('PROGRESS_NOTE_MIRROR_LEASE_SECONDS', str(SYNC_SECONDS + 900)))
+_SYNC_PAGE_SIZE = 500
+
+_COLUMNS = ('site, note_id, event_date, created_date, event_type_id, event_type, client_id, '
+            'client_service_id, client_name, notes_text, data, synced_at')
+
+
+def _open_db(db_path: str) -> sqlite3.Connection:
+    """Open a SQLite connection with WAL mode and busy_timeout."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA busy_timeout=10000')
+        conn.execute('PRAGMA synchronous=NORMAL')
+    except Exception:
+        pass
+    return conn
+
+
+def _fts_query(text: str) -> str:
+    """User text -> FTS5 query: every word must match, as a prefix; quotes neutralize operators."""
+    terms = [t.replace('"', '') for t in text.split()]
+    return ' '.join(f'"{t}"*' for t in terms if t)
+
+
+def _note_row(site: str, note: Dict[str, Any], synced_at: float) -> tuple:
+    client = note.get('Client') or {}
+    client_name = ' '.join(filter(None, [client.get('FirstName'), client.get('PreferredName'), client.get('LastName')]))
+    event_type = note.get('ProgressNoteEventType') or {}
+    return (
+        site, note['Id'], note.get('EventDate') or '', note.get('CreatedDate'),
+        event_type.get('Id'), (event_type.get('Description') or '').strip(), note.get('ClientId'),
+        note.get('ClientServiceId'), client_name, note.get('NotesPlainText') or '',
+        json.dumps(note, ensure_ascii=False, default=str), synced_at
+    )
+
+
+class ProgressNoteMirror:
+    """Rolling-window progress note mirror for all sites in one SQLite file."""
+
+    def __init__(self, db_path: str = _MIRROR_DB):
+        self.db_path = db_path
+        self.fts_enabled = False
+        self._sync_lock = threading.Lock()
+        self._sync_thread = None
+        self._sync_cycles = 0
+        self._owner = f"{os.getpid()}:{id(self)}"
+        self._ensure_tables()
+
+    def _ensure_tables(self):
+        with _open_db(self.db_path) as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS progress_note_mirror (
+                    site TEXT NOT NULL,
+                    note_id INTEGER NOT NULL,
+                    event_date TEXT NOT NULL,
+                    created_date TEXT,
+                    event_type_id INTEGER,
+                    event_type TEXT,
+                    client_id INTEGER,
+                    client_service_id INTEGER,
+                    client_name TEXT,
+                    notes_text TEXT,
+                    data TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    UNIQUE (site, note_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_pnm_site_date ON progress_note_mirror(site, event_date);
+                CREATE INDEX IF NOT EXISTS idx_pnm_site_event_type ON progress_note_mirror(site, event_type, event_date);
+                CREATE INDEX IF NOT EXISTS idx_pnm_site_client ON progress_note_mirror(site, client_service_id, event_date);
+                CREATE TABLE IF NOT EXISTS progress_note_mirror_sync (
+                    site TEXT PRIMARY KEY,
+                    window_start TEXT,
+                    last_sync TEXT,
+                    last_full_sync TEXT,
+                    last_duration_ms INTEGER,
+                    last_error TEXT
+                );
+                CREATE TABLE IF NOT EXISTS progress_note_mirror_lease (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+            ''')
+            try:
+                conn.executescript('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS progress_note_mirror_fts USING fts5(
+                        notes_text, client_name, event_type,
+                        content='progress_note_mirror', content_rowid='rowid'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS progress_note_mirror_ai AFTER INSERT ON progress_note_mirror BEGIN
+                        INSERT INTO progress_note_mirror_fts(rowid, notes_text, client_name, event_type)
+                        VALUES (new.rowid, new.notes_text, new.client_name, new.event_type);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS progress_note_mirror_ad AFTER DELETE ON progress_note_mirror BEGIN
+                        INSERT INTO progress_note_mirror_fts(progress_note_mirror_fts, rowid, notes_text, client_name, event_type)
+                        VALUES ('delete', old.rowid, old.notes_text, old.client_name, old.event_type);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS progress_note_mirror_au AFTER UPDATE ON progress_note_mirror BEGIN
+                        INSERT INTO progress_note_mirror_fts(progress_note_mirror_fts, rowid, notes_text, client_name, event_type)
+                        VALUES ('delete', old.rowid, old.notes_text, old.client_name, old.event_type);
+                        INSERT INTO progress_note_mirror_fts(rowid, notes_text, client_name, event_type)
+                        VALUES (new.rowid, new.notes_text, new.client_name, new.event_type);
+                    END;
+                ''')
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5: text search falls back to LIKE
+                logger.warning(f"FTS5 unavailable, progress note mirror search uses LIKE: {e}")
+
+    # ── Sync ─────────────────────────────────────────────────
+
+    def sync_site(self, site: str, full: bool = False) -> Dict[str, Any]:
+        """Re-read the recent span (or the whole window) of one site from MANAD."""
+        from manad_db_connector import MANADDBConnector, decode_progress_note_cursor, encode_progress_note_cursor
+
+        started = time.perf_counter()
+        today = date.today()
+        window_start = datetime.combine(today - timedelta(days=MIRROR_DAYS), datetime.min.time())
+        span_start = window_start if full else datetime.combine(today - timedelta(days=RECENT_DAYS), datetime.min.time())
+        span_end = datetime.combine(today, datetime.max.time())
+
+        connector = MANADDBConnector(site)
+        notes: List[Dict[str, Any]] = []
+        after = None
+        while True:
+            success, page, _ = connector.fetch_progress_notes(span_start, span_end, limit=_SYNC_PAGE_SIZE, after=after)
+            if not success:
+                raise RuntimeError(f"MANAD progress note fetch failed for {site}")
+            notes.extend(page or [])
+            if not page or len(page) < _SYNC_PAGE_SIZE:
+                break
+            after = decode_progress_note_cursor(encode_progress_note_cursor(page[-1]))
+
+        synced_at = time.time()
+        now_iso = datetime.now().isoformat()
+        with _open_db(self.db_path) as conn:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS _synced_ids (note_id INTEGER PRIMARY KEY)')
+            conn.execute('DELETE FROM _synced_ids')
+            conn.executemany('INSERT OR IGNORE INTO _synced_ids VALUES (?)', [(n['Id'],) for n in notes])
+            conn.executemany(f'''
+                INSERT INTO progress_note_mirror ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(site, note_id) DO UPDATE SET
+                    event_date = excluded.event_date, created_date = excluded.created_date,
+                    event_type_id = excluded.event_type_id, event_type = excluded.event_type,
+                    client_id = excluded.client_id, client_service_id = excluded.client_service_id,
+                    client_name = excluded.client_name, notes_text = excluded.notes_text,
+                    data = excluded.data, synced_at = excluded.synced_at
+            ''', [_note_row(site, note, synced_at) for note in notes])
+            # Deleted (or moved out of the span) in MANAD, and notes that left the window
+            removed = conn.execute('''
+                DELETE FROM progress_note_mirror
+                WHERE site = ? AND event_date >= ? AND note_id NOT IN (SELECT note_id FROM _synced_ids)
+            ''', (site, span_start.isoformat())).rowcount
+            removed += conn.execute('DELETE FROM progress_note_mirror WHERE site = ? AND event_date < ?',
+                                    (site, window_start.isoformat())).rowcount
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            conn.execute('''
+                INSERT INTO progress_note_mirror_sync (site, window_start, last_sync, last_full_sync, last_duration_ms, last_error)
+                VALUES (?, ?, ?, ?, ?, NULL)
+                ON CONFLICT(site) DO UPDATE SET
+                    window_start = excluded.window_start, last_sync = excluded.last_sync,
+                    last_full_sync = COALESCE(excluded.last_full_sync, last_full_sync),
+                    last_duration_ms = excluded.last_duration_ms, last_error = NULL
+            ''', (site, window_start.isoformat(), now_iso, now_iso if full else None, duration_ms))
+
+        result = {'site': site, 'full': full, 'fetched': len(notes), 'removed': removed, 'duration_ms': duration_ms}
+        logger.info(f"📥 Progress note mirror synced: {result}")
+        return result
+
+    def _record_error(self, site: str, error: str):
+        with _open_db(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO progress_note_mirror_sync (site, last_error) VALUES (?, ?)
+                ON CONFLICT(site) DO UPDATE SET last_error = excluded.last_error
+            ''', (site, error))
+
+    def _acquire_lease(self) -> bool:
+        """Take or renew the cross-process sync lease. True when this process holds it."""
+        now = time.time()
+        with _open_db(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO progress_note_mirror_lease (name, owner, expires_at) VALUES ('sync', ?, ?)
+                ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE progress_note_mirror_lease.owner = excluded.owner OR progress_note_mirror_lease.expires_at < ?
+            ''', (self._owner, now + LEASE_SECONDS, now))
+            row = conn.execute("SELECT owner FROM progress_note_mirror_lease WHERE name = 'sync'").fetchone()
+        return bool(row and row[0] == self._owner)
+
+    def sync_all(self, sites: List[str], full: bool = False, lease: bool = False) -> List[Dict[str, Any]]:
+        """Sync every site (one at a time); failures are recorded per site.
+        With lease=True, stops as soon as another process holds the sync lease."""
+        results = []
+        with self._sync_lock:
+            for site in sites:
+                if lease and not self._acquire_lease():
+                    logger.info("Progress note mirror sync left to another process (lease held)")
+                    break
+                try:
+                    # A site's first sync always covers the whole window
+                    results.append(self.sync_site(site, full=full or not self.is_ready(site)))
+                except Exception as e:
+                    logger.error(f"❌ Progress note mirror sync failed for {site}: {e}")
+                    self._record_error(site, str(e))
+        return results
+
+    def start_sync(self, sites: List[str]) -> bool:
+        """Start the background sync thread (once). Returns False when DB direct access is off."""
+        if self._sync_thread is not None:
+            return True
+        if not use_db_direct_access():
+            logger.info("Progress note mirror sync not started (DB direct access mode is off)")
+            return False
+        with self._sync_lock:
+            if self._sync_thread is None:
+                self._sync_thread = threading.Thread(target=self._sync_loop, args=(list(sites),), daemon=True,
+                                                     name='progress-note-mirror-sync')
+                self._sync_thread.start()
+        return True
+
+    def _sync_loop(self, sites: List[str]):
+        while True:
+            try:
+                # Only the lease holder syncs; the other processes just retry the lease
+                if use_db_direct_access() and self._acquire_lease():
+                    full = self._sync_cycles % max(1, FULL_SYNC_EVERY) == 0
+                    self.sync_all(sites, full=full, lease=True)
+                    self._sync_cycles += 1
+            except Exception as e:
+                logger.error(f"❌ Progress note mirror sync cycle failed: {e}")
+            time.sleep(SYNC_SECONDS)
+
+    # ── Queries ──────────────────────────────────────────────
+
+    def is_ready(self, site: str) -> bool:
+        """True once the site has completed a full-window sync."""
+        with _open_db(self.db_path) as conn:
+            row = conn.execute('SELECT last_full_sync FROM progress_note_mirror_sync WHERE site = ?', (site,)).fetchone()
+        return bool(row and row[0])
+
+    def covers(self, site: str, start_date: datetime) -> bool:
+        """True when the site is synced and start_date lies inside the mirrored window."""
+        with _open_db(self.db_path) as conn:
+            row = conn.execute('SELECT window_start, last_full_sync FROM progress_note_mirror_sync WHERE site = ?',
+                               (site,)).fetchone()
+        return bool(row and row[0] and row[1] and start_date.isoformat() >= row[0])
+
+    def get_status(self, site: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = '''
+            SELECT s.site, s.window_start, s.last_sync, s.last_full_sync, s.last_duration_ms, s.last_error,
+                   (SELECT COUNT(*) FROM progress_note_mirror m WHERE m.site = s.site)
+            FROM progress_note_mirror_sync s
+        '''
+        params = ()
+        if site:
+            sql += ' WHERE s.site = ?'
+            params = (site,)
+        with _open_db(self.db_path) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        keys = ('site', 'window_start', 'last_sync', 'last_full_sync', 'last_duration_ms', 'last_error', 'note_count')
+        return [dict(zip(keys, row), fts_enabled=self.fts_enabled) for row in rows]
+
+    def query(self, site: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+              event_types: Optional[List[str]] = None, client_service_id: Optional[int] = None,
+              text: Optional[str] = None, limit: int = 50, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Mirrored notes, newest first, with the same filters as fetch_progress_notes_for_site
+
+        Args:
+            event_types: Event type descriptions; "Fall" matches every type containing 'fall'
+            text: Words that must all appear (as prefixes) in the note text, client name or event type
+
+        Returns:
+            (notes in the connector's API format, total matching count)
+        """
+        where = ['m.site = ?']
+        params: List[Any] = [site]
+        if start_date is not None:
+            where.append('m.event_date >= ?')
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            where.append('m.event_date <= ?')
+            params.append(end_date.isoformat())
+        if client_service_id is not None:
+            where.append('m.client_service_id = ?')
+            params.append(client_service_id)
+
+        type_clauses = []
+        for name in event_types or []:
+            name = (name or '').strip()
+            if not name:
+                continue
+            if name.lower() == 'fall':
+                type_clauses.append("m.event_type LIKE '%fall%'")
+            else:
+                type_clauses.append('m.event_type = ?')
+                params.append(name)
+        if type_clauses:
+            where.append('(' + ' OR '.join(type_clauses) + ')')
+
+        if text and text.strip():
+            if self.fts_enabled and _fts_query(text):
+                where.append('m.rowid IN (SELECT rowid FROM progress_note_mirror_fts WHERE progress_note_mirror_fts MATCH ?)')
+                params.append(_fts_query(text))
+            else:
+                for term in text.split():
+                    where.append("(m.notes_text LIKE ? OR m.client_name LIKE ?)")
+                    params.extend([f'%{term}%', f'%{term}%'])
+
+        base = ' FROM progress_note_mirror m WHERE ' + ' AND '.join(where)
+        with _open_db(self.db_path) as conn:
+            total = conn.execute('SELECT COUNT(*)' + base, params).fetchone()[0]
+            rows = conn.execute('SELECT m.data' + base + ' ORDER BY m.event_date DESC, m.note_id DESC LIMIT ? OFFSET ?',
+                                params + [limit, offset]).fetchall()
+        return [json.loads(data) for (data,) in rows], total
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_progress_note_mirror() -> ProgressNoteMirror:
+    """Process-wide mirror for progress_note_mirror.db."""
+    global _mirror
+    if _mirror is None:
+        with _mirror_lock:
+            if _mirror is None:
+                _mirror = ProgressNoteMirror()
+    return _mirror
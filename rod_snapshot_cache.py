@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Resident of the Day Snapshot Cache
+Month snapshots of Resident of the day notes (RN/EN and PCA) keyed by (site, year, month)
+
+One JSON file per key in data/rod_snapshots. A month is closed (immutable, never
+fetched again) once ROD_SNAPSHOT_CLOSE_DAYS have passed after its last day. The
+current month is refreshed incrementally: only notes from the last cached note
+date (minus ROD_SNAPSHOT_OVERLAP_HOURS, for late entries and edits) are fetched
+again, at most every ROD_SNAPSHOT_REFRESH_SECONDS. Every
+ROD_SNAPSHOT_FULL_REFRESH_EVERY refreshes, and on the refresh that closes a month,
+the whole month is fetched again instead (backdated late entries and deletions
+before the incremental window). Snapshots older than
+ROD_SNAPSHOT_KEEP_MONTHS are evicted, together with the timestamped
+progress_notes_rn_en_*/progress_notes_pca_* dumps the ROD builder used to write.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROD_SNAPSHOT_CLOSE_DAYS = int(os.environ.get('ROD_SNAPSHOT_CLOSE_DAYS', '3'))
+ROD_SNAPSHOT_OVERLAP_HOURS = int(os.environ.get('ROD_SNAPSHOT_OVERLAP_HOURS', '48'))
+ROD_SNAPSHOT_REFRESH_SECONDS = int(os.environ.get('ROD_SNAPSHOT_REFRESH_SECONDS', '300'))
+ROD_SNAPSHOT_KEEP_MONTHS = int(os.environ.get('ROD_SNAPSHOT_KEEP_MONTHS', '13'))
+ROD_SNAPSHOT_FULL_REFRESH_EVERY = int(os.environ.get('ROD_SNAPSHOT_FULL_REFRESH_EVERY', '12'))
+
+# (start, end) -> (success, rn_en_notes, pca_notes)
+MonthFetcher = Callable[[datetime, datetime], Tuple[bool, List[Dict[str, Any]], List[Dict[str, Any]]]]
+
+_SNAPSHOT_FILE = re.compile(r'^rod_(?P<site>.+)_(?P<year>\d{4})_(?P<month>\d{2})\.json$')
+# Timestamped dumps written per request before the snapshot cache (no longer read)
+_LEGACY_FILE = re.compile(r'^progress_notes_(rn_en|pca)_.+_\d{4}_\d{2}_\d{8}_\d{6}\.json$')
+
+
+def month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    """First moment of the month and first moment of the next month"""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def _parse_event_date(value: Any) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value)[:19])
+    except (TypeError, ValueError):
+        return None
+
+
+class RODSnapshotCache:
+    """Resident of the day month snapshot cache"""
+
+    def __init__(self, cache_dir: str = os.path.join("data", "rod_snapshots")):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._site_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_snapshot_path(self, site: str, year: int, month: int) -> str:
+        safe_site = site.replace(" ", "_").lower()
+        return os.path.join(self.cache_dir, f"rod_{safe_site}_{year}_{month:02d}.json")
+
+    def _key_lock(self, site: str, year: int, month: int) -> threading.Lock:
+        key = f"{site}|{year}|{month}"
+        with self._lock:
+            return self._site_locks.setdefault(key, threading.Lock())
+
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to read ROD snapshot {path}: {e}")
+            return None
+
+    def _save(self, path: str, snapshot: Dict[str, Any]):
+        # Temp name unique per process/thread: workers refreshing the same month never share it
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.cache_dir,
+                                         prefix='.rod_', suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            try:
+                json.dump(snapshot, f, ensure_ascii=False)
+            except Exception:
+                f.close()
+                os.remove(tmp_path)
+                raise
+        os.replace(tmp_path, path)
+
+    def get_month(self, site: str, year: int, month: int,
+                  fetch: MonthFetcher) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """
+        RN/EN and PCA notes for a month, from the snapshot when possible
+
+        Args:
+            fetch: Called with (start, end) for the span that has to be (re)loaded
+
+        Returns:
+            (rn_en_notes, pca_notes), or None when nothing is cached and the fetch failed
+        """
+        path = self._get_snapshot_path(site, year, month)
+        month_start, month_end = month_range(year, month)
+        now = datetime.now()
+
+        with self._key_lock(site, year, month):
+            snapshot = self._load(path)
+            if snapshot and snapshot.get('closed'):
+                return snapshot['rn_en_notes'], snapshot['pca_notes']
+            if snapshot and time.time() - snapshot.get('refreshed_epoch', 0) < ROD_SNAPSHOT_REFRESH_SECONDS:
+                return snapshot['rn_en_notes'], snapshot['pca_notes']
+
+            # Notes are fetched with one day of margin on both sides (as before)
+            fetch_start = month_start - timedelta(days=1)
+            fetch_end = month_end + timedelta(days=1)
+            closing = now >= month_end + timedelta(days=ROD_SNAPSHOT_CLOSE_DAYS)
+            refresh_count = snapshot.get('refresh_count', 0) + 1 if snapshot else 0
+            # Full month: first load, the refresh that closes the month, and every N refreshes
+            full_refresh = (closing or not snapshot
+                            or refresh_count % max(1, ROD_SNAPSHOT_FULL_REFRESH_EVERY) == 0)
+            last_event = None
+            if not full_refresh:
+                last_event = _parse_event_date(snapshot.get('last_event_date'))
+                if last_event:
+                    fetch_start = max(fetch_start, last_event - timedelta(hours=ROD_SNAPSHOT_OVERLAP_HOURS))
+
+            success, rn_en_new, pca_new = fetch(fetch_start, fetch_end)
+            if not success:
+                if snapshot:
+                    logger.warning(f"ROD refresh failed for {site} {year}/{month}, serving snapshot")
+                    return snapshot['rn_en_notes'], snapshot['pca_notes']
+                return None
+
+            rn_en_notes, pca_notes = rn_en_new, pca_new
+            if last_event:
+                # Replace the re-fetched span, keep everything before it
+                def keep(note):
+                    event_date = _parse_event_date(note.get('EventDate'))
+                    return event_date is not None and event_date < fetch_start
+                rn_en_notes = [n for n in snapshot['rn_en_notes'] if keep(n)] + rn_en_new
+                pca_notes = [n for n in snapshot['pca_notes'] if keep(n)] + pca_new
+
+            event_dates = [d for d in (_parse_event_date(n.get('EventDate')) for n in rn_en_notes + pca_notes) if d]
+            snapshot = {
+                'site': site,
+                'year': year,
+                'month': month,
+                'closed': closing,
+                'refresh_count': refresh_count,
+                'last_event_date': max(event_dates).isoformat() if event_dates else None,
+                'refreshed_at': now.isoformat(),
+                'refreshed_epoch': time.time(),
+                'rn_en_notes': rn_en_notes,
+                'pca_notes': pca_notes
+            }
+            try:
+                self._save(path, snapshot)
+            except Exception as e:
+                logger.error(f"Failed to save ROD snapshot {path}: {e}")
+            logger.info(f"ROD snapshot {'closed' if closing else 'refreshed'} ({'full' if full_refresh else 'incremental'})"
+                        f" - {site} {year}/{month}: {len(rn_en_new) + len(pca_new)} notes fetched from {fetch_start.isoformat()}")
+
+        self.evict_old_snapshots()
+        return rn_en_notes, pca_notes
+
+    def evict_old_snapshots(self, keep_months: int = ROD_SNAPSHOT_KEEP_MONTHS) -> int:
+        """Delete snapshots more than keep_months months before the current month (and legacy dumps)"""
+        now = datetime.now()
+        current = now.year * 12 + now.month - 1
+        removed = 0
+        try:
+            for filename in os.listdir(self.cache_dir):
+                match = _SNAPSHOT_FILE.match(filename)
+                if not match:
+                    continue
+                month_index = int(match.group('year')) * 12 + int(match.group('month')) - 1
+                if current - month_index > keep_months:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                    removed += 1
+            legacy_dir = os.path.dirname(os.path.abspath(self.cache_dir))
+            for filename in os.listdir(legacy_dir):
+                if _LEGACY_FILE.match(filename):
+                    os.remove(os.path.join(legacy_dir, filename))
+                    removed += 1
+        except Exception as e:
+            logger.error(f"Failed to evict ROD snapshots: {e}")
+        if removed:
+            logger.info(f"Evicted {removed} old ROD snapshots")
+        return removed
+
+    def clear(self, site: str = None) -> int:
+        """Delete snapshots (all, or one site's)"""
+        safe_site = site.replace(" ", "_").lower() if site else None
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            match = _SNAPSHOT_FILE.match(filename)
+            if match and (safe_site is None or match.group('site') == safe_site):
+                os.remove(os.path.join(self.cache_dir, filename))
+                removed += 1
+        return removed
+
+
+# Global instance
+rod_snapshot_cache = RODSnapshotCache()
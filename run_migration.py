@@ -271,6 +271,9 @@ class DatabaseMigrator:
                 ('is_major_injury', 'INTEGER', '0'),
                 ('reviewed_date', 'TIMESTAMP', 'NULL'),
                 ('status_enum_id', 'INTEGER', 'NULL'),
+                ('fall_type', 'VARCHAR(50)', 'NULL'),
+                ('fall_type_classifier', 'VARCHAR(50)', 'NULL'),
+                ('manad_content_hash', 'VARCHAR(40)', 'NULL'),
             ]
             
             added_columns = []
@@ -14,6 +14,14 @@ logger = logging.getLogger(__name__)
 class CIMSService:
     """CIMS Business Logic Processing Service"""
     
+    _INSERT_TASK_SQL = """
+        INSERT INTO cims_tasks 
+        (incident_id, policy_id, task_id, task_name, description, 
+         assigned_role, due_date, status, priority, 
+         documentation_required, note_type, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
     @staticmethod
     def ensure_fall_policy_exists(conn: sqlite3.Connection) -> bool:
         """
@@ -128,61 +136,12 @@ class CIMSService:
                 logger.warning(f"No active Fall policy found for task generation")
                 return 0
             
-            policy_id = fall_policy['id']
-            visit_schedule = fall_policy['rules'].get('nurse_visit_schedule', [])
-            common_tasks = fall_policy['rules'].get('common_assessment_tasks', '')
-            
-            if not visit_schedule:
-                logger.warning(f"No visit schedule in Fall policy")
+            task_rows = CIMSService._build_fall_task_rows(incident_db_id, incident_date_iso, fall_policy)
+            if not task_rows:
                 return 0
             
-            # Calculate visit times
-            incident_time = datetime.fromisoformat(incident_date_iso)
-            phase_start_time = incident_time
-            tasks_created = 0
-            
-            for phase_idx, phase in enumerate(visit_schedule, 1):
-                interval = int(phase.get('interval', 30))
-                interval_unit = phase.get('interval_unit', 'minutes')
-                duration = int(phase.get('duration', 2))
-                duration_unit = phase.get('duration_unit', 'hours')
-                
-                interval_minutes = interval * 60 if interval_unit == 'hours' else interval
-                duration_minutes = duration * 60 if duration_unit == 'hours' else duration * 24 * 60 if duration_unit == 'days' else duration
-                
-                num_visits = max(1, duration_minutes // interval_minutes)
-                
-                for visit_num in range(num_visits):
-                    visit_time = phase_start_time + timedelta(minutes=visit_num * interval_minutes)
-                    
-                    task_name = f"Phase {phase_idx} Visit {visit_num + 1}: Nurse Assessment"
-                    task_description = common_tasks if common_tasks else "Complete neurological observations and monitor for changes"
-                    task_id = f"TASK-INC{incident_db_id}-P{phase_idx}-V{visit_num + 1}"
-                    
-                    cursor.execute("""
-                        INSERT INTO cims_tasks 
-                        (incident_id, policy_id, task_id, task_name, description, 
-                         assigned_role, due_date, status, priority, 
-                         documentation_required, note_type, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        incident_db_id,
-                        policy_id,
-                        task_id,
-                        task_name,
-                        task_description,
-                        'Registered Nurse',
-                        visit_time.isoformat(),
-                        'pending',
-                        'high',
-                        1,
-                        'Dynamic Form - Post Fall Assessment',
-                        datetime.now().isoformat()
-                    ))
-                    
-                    tasks_created += 1
-                
-                phase_start_time = phase_start_time + timedelta(minutes=duration_minutes)
+            cursor.executemany(CIMSService._INSERT_TASK_SQL, task_rows)
+            tasks_created = len(task_rows)
             
             return tasks_created
             
@@ -190,6 +149,115 @@ class CIMSService:
             logger.error(f"Error generating fall tasks: {str(e)}")
             return 0
     
+    @staticmethod
+    def _build_fall_task_rows(
+        incident_db_id: int,
+        incident_date_iso: str,
+        fall_policy: Dict
+    ) -> List[Tuple]:
+        """
+        Build cims_tasks rows for a Fall incident from the policy visit schedule
+        
+        Args:
+            incident_db_id: CIMS DB incident ID (integer)
+            incident_date_iso: Incident occurrence time (ISO format string)
+            fall_policy: Policy dict ({'id', 'rules', ...})
+            
+        Returns:
+            List of parameter tuples for _INSERT_TASK_SQL
+        """
+        policy_id = fall_policy['id']
+        visit_schedule = fall_policy['rules'].get('nurse_visit_schedule', [])
+        common_tasks = fall_policy['rules'].get('common_assessment_tasks', '')
+        
+        if not visit_schedule:
+            logger.warning(f"No visit schedule in Fall policy")
+            return []
+        
+        # Calculate visit times
+        incident_time = datetime.fromisoformat(incident_date_iso)
+        phase_start_time = incident_time
+        created_at = datetime.now().isoformat()
+        task_description = common_tasks if common_tasks else "Complete neurological observations and monitor for changes"
+        rows = []
+        
+        for phase_idx, phase in enumerate(visit_schedule, 1):
+            interval = int(phase.get('interval', 30))
+            interval_unit = phase.get('interval_unit', 'minutes')
+            duration = int(phase.get('duration', 2))
+            duration_unit = phase.get('duration_unit', 'hours')
+            
+            interval_minutes = interval * 60 if interval_unit == 'hours' else interval
+            duration_minutes = duration * 60 if duration_unit == 'hours' else duration * 24 * 60 if duration_unit == 'days' else duration
+            
+            num_visits = max(1, duration_minutes // interval_minutes)
+            
+            for visit_num in range(num_visits):
+                visit_time = phase_start_time + timedelta(minutes=visit_num * interval_minutes)
+                
+                rows.append((
+                    incident_db_id,
+                    policy_id,
+                    f"TASK-INC{incident_db_id}-P{phase_idx}-V{visit_num + 1}",
+                    f"Phase {phase_idx} Visit {visit_num + 1}: Nurse Assessment",
+                    task_description,
+                    'Registered Nurse',
+                    visit_time.isoformat(),
+                    'pending',
+                    'high',
+                    1,
+                    'Dynamic Form - Post Fall Assessment',
+                    created_at
+                ))
+            
+            phase_start_time = phase_start_time + timedelta(minutes=duration_minutes)
+        
+        return rows
+    
+    @staticmethod
+    def bulk_generate_fall_tasks(
+        incidents: List[Tuple[int, str, str]],
+        cursor: sqlite3.Cursor
+    ) -> int:
+        """
+        Generate tasks for many Fall incidents with a single executemany
+        
+        Policies are resolved once per fall type instead of once per incident.
+        
+        Args:
+            incidents: List of (incident_db_id, incident_date_iso, fall_type)
+            cursor: DB cursor (caller owns the transaction)
+            
+        Returns:
+            Number of tasks created
+        """
+        if not incidents:
+            return 0
+        
+        from services.fall_policy_detector import fall_detector
+        
+        policies_by_fall_type = {}
+        task_rows = []
+        
+        for incident_db_id, incident_date_iso, fall_type in incidents:
+            try:
+                if fall_type not in policies_by_fall_type:
+                    policies_by_fall_type[fall_type] = fall_detector.get_policy_for_fall_type(fall_type, cursor)
+                fall_policy = policies_by_fall_type[fall_type]
+                
+                if not fall_policy:
+                    logger.warning(f"No active Fall policy found for task generation")
+                    continue
+                
+                task_rows.extend(CIMSService._build_fall_task_rows(incident_db_id, incident_date_iso, fall_policy))
+            except Exception as e:
+                logger.error(f"Error generating fall tasks for incident {incident_db_id}: {str(e)}")
+        
+        if task_rows:
+            cursor.executemany(CIMSService._INSERT_TASK_SQL, task_rows)
+        
+        return len(task_rows)
+    
     @staticmethod
     def get_fall_policy(cursor: sqlite3.Cursor) -> Optional[Dict]:
         """
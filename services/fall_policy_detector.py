@@ -2,8 +2,9 @@
 Fall Type Detection Service
 Detect Fall type from Progress Note (Witnessed vs Unwitnessed)
 """
+import hashlib
 import logging
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Union
 import sqlite3
 from functools import lru_cache
 
@@ -13,6 +14,13 @@ logger = logging.getLogger(__name__)
 class FallPolicyDetector:
     """Fall incident type detection and Policy selection"""
     
+    # Bump when detection logic changes; keyword list edits change CLASSIFIER_ID automatically
+    CLASSIFIER_VERSION = 2
+    CLASSIFIER_ID = None  # Set by _compile_rules, stored as cims_incidents.fall_type_classifier
+    
+    # SQLite bound-parameter limit safe chunk size
+    CLASSIFY_BATCH_SIZE = 900
+    
     # Priority 1: Explicit keywords (most clear indicators)
     EXPLICIT_UNWITNESSED = [
         "unwitnessed fall",
@@ -83,6 +91,90 @@ class FallPolicyDetector:
     FALL_ACTION_WORDS = ["fall", "falling", "fell", "slip", "slipping", "slipped", "trip", "tripping", "tripped"]
     FALL_STATE_WORDS = ["sitting", "lying", "laying", "on floor", "on the floor", "on ground"]
     
+    # Compiled rule tables (built once from the keyword lists above)
+    _HIGH_PRIORITY_RULES = ()
+    _LOW_PRIORITY_RULES = ()
+    
+    @staticmethod
+    def _prune_rules(rules: List[tuple]) -> tuple:
+        """
+        Drop keywords that can never decide the result
+        
+        Within a run of rules with the same result the order does not matter, so
+        shorter keywords go first; a keyword is then unreachable if any earlier
+        keyword is a substring of it (that earlier rule always fires first).
+        """
+        ordered = []
+        run = []
+        for keyword, result in rules + [(None, None)]:
+            if run and result != run[0][1]:
+                ordered.extend(sorted(run, key=lambda rule: len(rule[0])))
+                run = []
+            if keyword is not None:
+                run.append((keyword, result))
+        
+        pruned = []
+        for keyword, result in ordered:
+            if not any(earlier in keyword for earlier, _ in pruned):
+                pruned.append((keyword, result))
+        return tuple(pruned)
+    
+    @classmethod
+    def _compile_rules(cls):
+        """Flatten the keyword lists into priority-ordered (keyword, result) tables"""
+        high = (
+            [(k.lower(), 'unwitnessed') for k in cls.EXPLICIT_UNWITNESSED]
+            + [(k.lower(), 'witnessed') for k in cls.EXPLICIT_WITNESSED]
+            + [(k.lower(), 'unwitnessed') for k in cls.STRONG_UNWITNESSED]
+        )
+        low = (
+            [(k.lower(), 'unwitnessed') for k in cls.UNWITNESSED_CONTEXT]
+            + [(k.lower(), 'witnessed') for k in cls.WITNESSED_INDICATORS]
+        )
+        cls._HIGH_PRIORITY_RULES = cls._prune_rules(high)
+        # Low-priority keywords are unreachable if a high-priority keyword is inside them
+        cls._LOW_PRIORITY_RULES = tuple(
+            (keyword, result) for keyword, result in cls._prune_rules(low)
+            if not any(earlier in keyword for earlier, _ in cls._HIGH_PRIORITY_RULES)
+        )
+        cls._FALL_ACTION_WORDS = tuple(w.lower() for w in cls.FALL_ACTION_WORDS)
+        cls._FALL_STATE_WORDS = tuple(w.lower() for w in cls.FALL_STATE_WORDS)
+        cls._classify_text.cache_clear()
+        
+        keyword_fingerprint = hashlib.sha1(repr((
+            cls.EXPLICIT_UNWITNESSED, cls.EXPLICIT_WITNESSED, cls.STRONG_UNWITNESSED,
+            cls.UNWITNESSED_CONTEXT, cls.WITNESSED_INDICATORS,
+            cls.FALL_ACTION_WORDS, cls.FALL_STATE_WORDS
+        )).encode('utf-8')).hexdigest()[:8]
+        cls.CLASSIFIER_ID = f"keywords-v{cls.CLASSIFIER_VERSION}-{keyword_fingerprint}"
+    
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _classify_text(cls, text_lower: str) -> str:
+        """Classify lowercased text against the compiled rule tables (memoized)"""
+        for keyword, result in cls._HIGH_PRIORITY_RULES:
+            if keyword in text_lower:
+                logger.debug("Fall type keyword matched: '%s' -> %s", keyword, result)
+                return result
+        
+        # Special: "saw" context analysis
+        if " saw " in text_lower or text_lower.startswith("saw "):
+            for action_word in cls._FALL_ACTION_WORDS:
+                if action_word in text_lower:
+                    logger.debug("Fall type matched: 'saw' + '%s' -> witnessed", action_word)
+                    return 'witnessed'
+            for state_word in cls._FALL_STATE_WORDS:
+                if state_word in text_lower:
+                    logger.debug("Fall type matched: 'saw' + '%s' -> unwitnessed", state_word)
+                    return 'unwitnessed'
+        
+        for keyword, result in cls._LOW_PRIORITY_RULES:
+            if keyword in text_lower:
+                logger.debug("Fall type keyword matched: '%s' -> %s", keyword, result)
+                return result
+        
+        return 'unknown'
+    
     @classmethod
     def detect_fall_type_from_notes(cls, progress_notes: List[str]) -> str:
         """
@@ -91,9 +183,12 @@ class FallPolicyDetector:
         Priority:
         1. Explicit keywords (unwitnessed/witnessed explicitly stated)
         2. Strong Unwitnessed Indicators (found, heard, buzzer - 99% probability)
+           Special: "saw" + fall action word (witnessed) / fall state word (unwitnessed)
         3. Unwitnessed Context
         4. Witnessed Indicators
         
+        Keywords are matched against precompiled rule tables (see _compile_rules).
+        
         Args:
             progress_notes: List of Progress Note text
             
@@ -105,54 +200,32 @@ class FallPolicyDetector:
         
         # Combine all notes into a single text
         combined_text = ' '.join([note for note in progress_notes if note])
-        text_lower = combined_text.lower()
-        
-        # Priority 1: Explicit Unwitnessed (most clear)
-        for pattern in cls.EXPLICIT_UNWITNESSED:
-            if pattern in text_lower:
-                logger.info(f"✅ EXPLICIT Unwitnessed detected: '{pattern}'")
-                return 'unwitnessed'
-        
-        # Priority 1: Explicit Witnessed (most clear)
-        for pattern in cls.EXPLICIT_WITNESSED:
-            if pattern in text_lower:
-                logger.info(f"✅ EXPLICIT Witnessed detected: '{pattern}'")
-                return 'witnessed'
-        
-        # Priority 2: Strong Unwitnessed Indicators (99% probability)
-        for pattern in cls.STRONG_UNWITNESSED:
-            if pattern in text_lower:
-                logger.info(f"✅ STRONG Unwitnessed indicator: '{pattern}' (99% confidence)")
-                return 'unwitnessed'
+        return cls._classify_text(combined_text.lower())
+    
+    @classmethod
+    def detect_fall_types(cls, texts: Iterable[Union[str, List[str], None]]) -> List[str]:
+        """
+        Batch Fall type detection (same priority rules as detect_fall_type_from_notes)
         
-        # Special: "saw" context analysis
-        if " saw " in text_lower or text_lower.startswith("saw "):
-            # saw + fall action words = Witnessed
-            for action_word in cls.FALL_ACTION_WORDS:
-                if action_word in text_lower:
-                    logger.info(f"✅ Witnessed detected: 'saw' + '{action_word}' (action context)")
-                    return 'witnessed'
+        Args:
+            texts: One entry per incident - a description string or a list of Progress Note texts
             
-            # saw + fall state words = Unwitnessed
-            for state_word in cls.FALL_STATE_WORDS:
-                if state_word in text_lower:
-                    logger.info(f"✅ Unwitnessed detected: 'saw' + '{state_word}' (state context)")
-                    return 'unwitnessed'
-        
-        # Priority 3: Unwitnessed Context
-        for pattern in cls.UNWITNESSED_CONTEXT:
-            if pattern in text_lower:
-                logger.info(f"✅ Unwitnessed context detected: '{pattern}'")
-                return 'unwitnessed'
-        
-        # Priority 4: Witnessed Indicators
-        for pattern in cls.WITNESSED_INDICATORS:
-            if pattern in text_lower:
-                logger.info(f"✅ Witnessed indicator: '{pattern}'")
-                return 'witnessed'
-        
-        logger.warning("⚠️  Fall type not detected, defaulting to 'unknown'")
-        return 'unknown'
+        Returns:
+            List of 'unwitnessed' | 'witnessed' | 'unknown', in input order
+        """
+        results = []
+        seen: Dict[str, str] = {}
+        for entry in texts:
+            if not entry:
+                results.append('unknown')
+                continue
+            if not isinstance(entry, str):
+                entry = ' '.join([note for note in entry if note])
+            fall_type = seen.get(entry)
+            if fall_type is None:
+                fall_type = seen[entry] = cls._classify_text(entry.lower())
+            results.append(fall_type)
+        return results
     
     @classmethod
     @lru_cache(maxsize=1000)
@@ -260,6 +333,92 @@ class FallPolicyDetector:
             logger.error(f"Error detecting fall type for incident {incident_id}: {e}")
             return 'unknown'
     
+    @classmethod
+    def classify_incidents(
+        cls,
+        cursor: sqlite3.Cursor,
+        incident_ids: Optional[List[int]] = None,
+        force: bool = False
+    ) -> Dict[int, str]:
+        """
+        Classify Fall incidents and store fall_type + fall_type_classifier (ingest/backfill)
+        
+        Same rules as detect_fall_type_from_incident: Description first, then Post Fall
+        notes, then all Progress Notes. Does not commit; the caller owns the transaction.
+        
+        Args:
+            cursor: DB cursor
+            incident_ids: CIMS Incident DB IDs to classify (None = all Fall incidents)
+            force: Reclassify even if already classified by the current CLASSIFIER_ID
+            
+        Returns:
+            {incident DB ID: 'unwitnessed' | 'witnessed' | 'unknown'} for updated incidents
+        """
+        stale_clause = "" if force else """
+            AND (fall_type IS NULL OR fall_type = ''
+                 OR fall_type_classifier IS NULL OR fall_type_classifier != ?)"""
+        stale_params = [] if force else [cls.CLASSIFIER_ID]
+        
+        if incident_ids is None:
+            cursor.execute(f"""
+                SELECT id FROM cims_incidents
+                WHERE incident_type LIKE '%Fall%'{stale_clause}
+                ORDER BY id
+            """, stale_params)
+            incident_ids = [row[0] for row in cursor.fetchall()]
+        
+        classified = {}
+        for i in range(0, len(incident_ids), cls.CLASSIFY_BATCH_SIZE):
+            chunk = incident_ids[i:i + cls.CLASSIFY_BATCH_SIZE]
+            placeholders = ','.join(['?'] * len(chunk))
+            cursor.execute(f"""
+                SELECT id, description FROM cims_incidents
+                WHERE id IN ({placeholders}) AND incident_type LIKE '%Fall%'{stale_clause}
+            """, list(chunk) + stale_params)
+            rows = cursor.fetchall()
+            if not rows:
+                continue
+            
+            fall_types = dict(zip(
+                [row[0] for row in rows],
+                cls.detect_fall_types([row[1] for row in rows])
+            ))
+            
+            # Description inconclusive: fall back to Progress Notes (Post Fall notes first)
+            unknown_ids = [incident_id for incident_id, fall_type in fall_types.items() if fall_type == 'unknown']
+            if unknown_ids:
+                notes_by_incident: Dict[int, List[tuple]] = {}
+                try:
+                    cursor.execute(f"""
+                        SELECT incident_id, content, note_type
+                        FROM cims_progress_notes
+                        WHERE incident_id IN ({','.join(['?'] * len(unknown_ids))})
+                        ORDER BY created_at DESC
+                    """, unknown_ids)
+                    for incident_id, content, note_type in cursor.fetchall():
+                        notes_by_incident.setdefault(incident_id, []).append((content, note_type))
+                except sqlite3.OperationalError as e:
+                    logger.debug(f"Progress notes unavailable for fall classification: {e}")
+                
+                for incident_id, notes in notes_by_incident.items():
+                    post_fall_notes = [
+                        content for content, note_type in notes
+                        if note_type and 'post fall' in note_type.lower()
+                    ]
+                    fall_type = cls.detect_fall_type_from_notes(post_fall_notes) if post_fall_notes else 'unknown'
+                    if fall_type == 'unknown':
+                        fall_type = cls.detect_fall_type_from_notes([content for content, _ in notes if content])
+                    fall_types[incident_id] = fall_type
+            
+            cursor.executemany("""
+                UPDATE cims_incidents
+                SET fall_type = ?, fall_type_classifier = ?
+                WHERE id = ?
+            """, [(fall_type, cls.CLASSIFIER_ID, incident_id) for incident_id, fall_type in fall_types.items()])
+            classified.update(fall_types)
+        
+        return classified
+    
     @classmethod
     def get_policy_for_fall_type(
         cls, 
@@ -357,6 +516,9 @@ class FallPolicyDetector:
         return policy
 
 
+# Compile keyword rule tables once at import
+FallPolicyDetector._compile_rules()
+
 # Global instance
 fall_detector = FallPolicyDetector()
 
@@ -0,0 +1,478 @@
+"""
+Incident Sync Service
+Apply MANAD incidents to the CIMS DB as a staged, batched pipeline
+
+Stages (per site, one transaction):
+1. normalize: MANAD incident dicts -> cims_incidents column values
+2. diff: one bulk lookup of existing IDs/statuses/content hashes,
+   split into insert/update/close; rows whose content hash is unchanged are skipped
+3. apply: executemany INSERT / UPDATE, bulk close of tasks
+4. classify: persist fall_type (+ classifier ID) for new/changed Fall incidents
+5. tasks: one bulk existence check + bulk Fall task creation
+
+Incremental syncs use a per-site watermark: the newest MANAD LastUpdatedDate
+applied so far (MANAD server time, second precision), stored in system_settings
+and committed in the same transaction as the rows it covers.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite default limit for bound parameters per statement is 999
+SQLITE_IN_CLAUSE_BATCH_SIZE = 900
+
+# Re-read this much before the watermark to catch MANAD transactions committed late
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+# Columns written by the sync UPDATE statements; their values form the content hash
+CONTENT_HASH_FIELDS = (
+    'incident_type', 'severity', 'description', 'initial_actions_taken',
+    'reported_by_name', 'resident_name', 'incident_date', 'is_closed',
+)
+
+
+class IncidentSyncService:
+    """Batched MANAD -> CIMS incident upsert pipeline"""
+
+    _INSERT_INCIDENT_SQL = """
+        INSERT OR IGNORE INTO cims_incidents (
+            incident_id, manad_incident_id, resident_id, resident_name,
+            incident_type, severity, status, incident_date,
+            location, description, initial_actions_taken,
+            reported_by, reported_by_name, site, created_at,
+            risk_rating, is_review_closed, is_ambulance_called,
+            is_admitted_to_hospital, is_major_injury, reviewed_date, status_enum_id,
+            manad_content_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    _UPDATE_OPEN_INCIDENT_SQL = """
+        UPDATE cims_incidents
+        SET incident_type = ?,
+            severity = ?,
+            description = ?,
+            initial_actions_taken = ?,
+            reported_by_name = ?,
+            resident_name = ?,
+            incident_date = ?,
+            manad_content_hash = ?
+        WHERE manad_incident_id = ?
+    """
+
+    _CLOSE_INCIDENT_SQL = """
+        UPDATE cims_incidents
+        SET incident_type = ?,
+            severity = ?,
+            description = ?,
+            initial_actions_taken = ?,
+            reported_by_name = ?,
+            resident_name = ?,
+            incident_date = ?,
+            status = 'Closed',
+            updated_at = ?,
+            manad_content_hash = ?
+        WHERE manad_incident_id = ?
+    """
+
+    _CLOSE_TASKS_SQL = """
+        UPDATE cims_tasks
+        SET status = 'completed',
+            completed_at = ?,
+            updated_at = ?
+        WHERE incident_id = ? AND status != 'completed'
+    """
+
+    @staticmethod
+    def watermark_key(site_name: str) -> str:
+        """system_settings key holding a site's incremental sync watermark"""
+        return f'incident_sync_watermark_{site_name.lower().replace(" ", "_")}'
+
+    @classmethod
+    def load_watermark(cls, cursor: sqlite3.Cursor, site_name: str) -> Optional[datetime]:
+        """
+        Return the fetch cut-off for a site's next incremental sync
+
+        Returns:
+            Stored watermark minus WATERMARK_OVERLAP, or None if the site has no watermark yet
+        """
+        cursor.execute("SELECT value FROM system_settings WHERE key = ?", (cls.watermark_key(site_name),))
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            return None
+        try:
+            return datetime.fromisoformat(row[0]) - WATERMARK_OVERLAP
+        except ValueError:
+            logger.warning(f"⚠️ Invalid incident sync watermark for {site_name}: {row[0]}")
+            return None
+
+    @staticmethod
+    def max_modified(incidents: List[Dict[str, Any]]) -> Optional[datetime]:
+        """Newest MANAD LastUpdatedDate among fetched incidents (second precision)"""
+        newest = None
+        for incident in incidents:
+            value = incident.get('LastUpdatedDate')
+            if not value:
+                continue
+            try:
+                modified = datetime.fromisoformat(value).replace(microsecond=0)
+            except ValueError:
+                continue
+            if newest is None or modified > newest:
+                newest = modified
+        return newest
+
+    @staticmethod
+    def normalize_incidents(
+        incidents: List[Dict[str, Any]],
+        clients: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 1: Convert MANAD incidents to cims_incidents column values
+
+        Args:
+            incidents: Incidents from MANADDBConnector.fetch_incidents
+            clients: Clients from MANADDBConnector.fetch_clients (may be empty)
+
+        Returns:
+            Normalized records, de-duplicated by MANAD incident ID (last wins)
+        """
+        # Convert client data to dictionary (for fast lookup)
+        clients_dict = {client.get('id', client.get('Id', '')): client for client in clients}
+        now_iso = datetime.now().isoformat()
+        records = {}
+
+        for incident in incidents:
+            # Extract incident ID (MANAD API uses capital 'Id')
+            manad_incident_id = str(incident.get('Id', ''))
+            if not manad_incident_id:
+                continue
+
+            # Get resident information
+            resident_id = incident.get('ClientId', '')
+            resident_name = 'Unknown'
+
+            # Try to get name from incident data first
+            first_name = incident.get('FirstName', '')
+            last_name = incident.get('LastName', '')
+            if first_name and last_name:
+                resident_name = f"{first_name} {last_name}".strip()
+            elif resident_id and resident_id in clients_dict:
+                # Fallback to client data (use capital FirstName/LastName)
+                client = clients_dict[resident_id]
+                first = client.get('FirstName', '')
+                last = client.get('LastName', '')
+                if first or last:
+                    resident_name = f"{first} {last}".strip()
+
+            # Parse incident date (convert to ISO format)
+            incident_date_str = incident.get('Date', incident.get('ReportedDate', ''))
+            try:
+                if incident_date_str:
+                    incident_date_iso = datetime.fromisoformat(incident_date_str.replace('Z', '+00:00')).isoformat()
+                else:
+                    incident_date_iso = now_iso
+            except (ValueError, AttributeError):
+                incident_date_iso = now_iso
+
+            # Process incident type (may be a list)
+            event_types = incident.get('EventTypeNames', [])
+            incident_type = ', '.join(event_types) if isinstance(event_types, list) else str(event_types)
+
+            # Extract room information
+            location_parts = [
+                p for p in [incident.get('RoomName', ''), incident.get('WingName', ''), incident.get('DepartmentName', '')]
+                if p
+            ]
+
+            manad_status = incident.get('Status', 'Open') or 'Open'
+
+            records[manad_incident_id] = {
+                'manad_incident_id': manad_incident_id,
+                'incident_id': f"INC-{manad_incident_id}",
+                'resident_id': str(resident_id),
+                'resident_name': resident_name,
+                'incident_type': incident_type if incident_type else 'Unknown',
+                # Existing rows keep the severity/risk fallback used by the original sync
+                'severity': incident.get('SeverityRating') or incident.get('RiskRatingName') or 'Unknown',
+                'insert_severity': incident.get('SeverityRating') or 'Unknown',
+                'status': manad_status,
+                'is_closed': manad_status.lower() in ['closed', 'close'] or incident.get('StatusEnumId') == 2,
+                'incident_date': incident_date_iso,
+                'location': ', '.join(location_parts) if location_parts else 'Unknown',
+                'description': incident.get('Description', ''),
+                'initial_actions_taken': incident.get('ActionTaken', ''),
+                'reported_by_name': incident.get('ReportedByName', ''),
+                'risk_rating': incident.get('RiskRatingName', ''),
+                'is_review_closed': 1 if incident.get('IsReviewClosed') else 0,
+                'is_ambulance_called': 1 if incident.get('IsAmbulanceCalled') else 0,
+                'is_admitted_to_hospital': 1 if incident.get('IsAdmittedToHospital') else 0,
+                'is_major_injury': 1 if incident.get('IsMajorInjury') else 0,
+                'reviewed_date': incident.get('ReviewedDate'),
+                'status_enum_id': incident.get('StatusEnumId'),
+            }
+            records[manad_incident_id]['content_hash'] = IncidentSyncService.content_hash(
+                records[manad_incident_id]
+            )
+
+        return list(records.values())
+
+    @staticmethod
+    def content_hash(record: Dict[str, Any]) -> str:
+        """Stable hash of the MANAD-sourced values the sync writes"""
+        payload = json.dumps([record.get(field) for field in CONTENT_HASH_FIELDS], default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def load_existing(cursor: sqlite3.Cursor, manad_incident_ids: List[str]) -> Dict[str, Tuple[int, str, str]]:
+        """
+        Stage 2a: Bulk lookup of existing incidents
+
+        Returns:
+            {manad_incident_id: (cims DB id, status, content hash)}
+        """
+        existing = {}
+        for chunk_start in range(0, len(manad_incident_ids), SQLITE_IN_CLAUSE_BATCH_SIZE):
+            chunk = manad_incident_ids[chunk_start:chunk_start + SQLITE_IN_CLAUSE_BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"""
+                SELECT manad_incident_id, id, status, manad_content_hash FROM cims_incidents
+                WHERE manad_incident_id IN ({placeholders})
+            """, chunk)
+            for manad_incident_id, db_id, status, content_hash in cursor.fetchall():
+                existing[manad_incident_id] = (db_id, status, content_hash)
+        return existing
+
+    @staticmethod
+    def diff(
+        records: List[Dict[str, Any]],
+        existing: Dict[str, Tuple[int, str, str]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Stage 2b: Split normalized records by required action
+
+        Returns:
+            (to_insert, to_update_open, to_close, unchanged_open);
+            update/close/unchanged records carry 'db_id'
+        """
+        to_insert, to_update_open, to_close, unchanged_open = [], [], [], []
+        for record in records:
+            current = existing.get(record['manad_incident_id'])
+            if current is None:
+                to_insert.append(record)
+                continue
+
+            db_id, existing_status, existing_hash = current
+            record['db_id'] = db_id
+            if record['is_closed'] and existing_status != 'Closed':
+                # Incident status changed to Closed in MANAD
+                to_close.append(record)
+            elif existing_status == 'Open' and not record['is_closed']:
+                # Update and create tasks only for Open status; skip the write if nothing changed
+                if existing_hash == record['content_hash']:
+                    unchanged_open.append(record)
+                else:
+                    to_update_open.append(record)
+        return to_insert, to_update_open, to_close, unchanged_open
+
+    @staticmethod
+    def load_fall_types(cursor: sqlite3.Cursor, incident_db_ids: List[int]) -> Dict[int, str]:
+        """Bulk lookup of stored fall_type by CIMS incident DB ID"""
+        fall_types = {}
+        for i in range(0, len(incident_db_ids), SQLITE_IN_CLAUSE_BATCH_SIZE):
+            chunk = incident_db_ids[i:i + SQLITE_IN_CLAUSE_BATCH_SIZE]
+            placeholders = ','.join(['?'] * len(chunk))
+            cursor.execute(
+                f"SELECT id, fall_type FROM cims_incidents WHERE id IN ({placeholders})",
+                chunk
+            )
+            fall_types.update({row[0]: row[1] for row in cursor.fetchall() if row[1]})
+        return fall_types
+
+    @staticmethod
+    def find_incidents_with_tasks(cursor: sqlite3.Cursor, incident_db_ids: List[int]) -> set:
+        """Return the subset of incident DB IDs that already have tasks (bulk)"""
+        with_tasks = set()
+        for chunk_start in range(0, len(incident_db_ids), SQLITE_IN_CLAUSE_BATCH_SIZE):
+            chunk = incident_db_ids[chunk_start:chunk_start + SQLITE_IN_CLAUSE_BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"""
+                SELECT DISTINCT incident_id FROM cims_tasks
+                WHERE incident_id IN ({placeholders})
+            """, chunk)
+            with_tasks.update(row[0] for row in cursor.fetchall())
+        return with_tasks
+
+    @classmethod
+    def apply_site(
+        cls,
+        conn: sqlite3.Connection,
+        site_name: str,
+        incidents: List[Dict[str, Any]],
+        clients: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Run normalize -> diff -> apply -> tasks for one site in a single transaction
+
+        Args:
+            conn: Writable connection to progress_report.db
+            site_name: Site name stored on new incidents
+            incidents: MANAD incidents for the site
+            clients: MANAD clients for the site (optional name fallback)
+
+        Returns:
+            {'synced', 'updated', 'closed', 'new', 'changed', 'unchanged',
+             'tasks_created', 'tasks_closed', 'watermark', 'timings_ms'}
+        """
+        from services.cims_service import CIMSService
+        from services.fall_policy_detector import fall_detector
+
+        timings = {}
+        cursor = conn.cursor()
+
+        try:
+            stage_started = time.perf_counter()
+            records = cls.normalize_incidents(incidents, clients)
+            timings['normalize'] = round((time.perf_counter() - stage_started) * 1000, 1)
+
+            stage_started = time.perf_counter()
+            existing = cls.load_existing(cursor, [r['manad_incident_id'] for r in records])
+            to_insert, to_update_open, to_close, unchanged_open = cls.diff(records, existing)
+            timings['diff'] = round((time.perf_counter() - stage_started) * 1000, 1)
+
+            stage_started = time.perf_counter()
+            now_iso = datetime.now().isoformat()
+
+            inserted = 0
+            if to_insert:
+                # Use 0 as reported_by for MANAD-synced incidents (system user)
+                cursor.executemany(cls._INSERT_INCIDENT_SQL, [
+                    (
+                        r['incident_id'], r['manad_incident_id'], r['resident_id'], r['resident_name'],
+                        r['incident_type'], r['insert_severity'], r['status'], r['incident_date'],
+                        r['location'], r['description'], r['initial_actions_taken'],
+                        0, r['reported_by_name'], site_name, now_iso,
+                        r['risk_rating'], r['is_review_closed'], r['is_ambulance_called'],
+                        r['is_admitted_to_hospital'], r['is_major_injury'], r['reviewed_date'], r['status_enum_id'],
+                        r['content_hash']
+                    )
+                    for r in to_insert
+                ])
+                inserted = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else len(to_insert)
+
+            if to_update_open:
+                cursor.executemany(cls._UPDATE_OPEN_INCIDENT_SQL, [
+                    (
+                        r['incident_type'], r['severity'], r['description'], r['initial_actions_taken'],
+                        r['reported_by_name'], r['resident_name'], r['incident_date'], r['content_hash'],
+                        r['manad_incident_id']
+                    )
+                    for r in to_update_open
+                ])
+
+            tasks_closed = 0
+            if to_close:
+                cursor.executemany(cls._CLOSE_INCIDENT_SQL, [
+                    (
+                        r['incident_type'], r['severity'], r['description'], r['initial_actions_taken'],
+                        r['reported_by_name'], r['resident_name'], r['incident_date'], now_iso,
+                        r['content_hash'], r['manad_incident_id']
+                    )
+                    for r in to_close
+                ])
+                # Change all Tasks of closed incidents to Completed
+                cursor.executemany(cls._CLOSE_TASKS_SQL, [(now_iso, now_iso, r['db_id']) for r in to_close])
+                tasks_closed = max(cursor.rowcount or 0, 0)
+                if tasks_closed > 0:
+                    logger.info(f"✅ {site_name}: {len(to_close)} incidents Closed, {tasks_closed} tasks automatically closed")
+            timings['apply'] = round((time.perf_counter() - stage_started) * 1000, 1)
+
+            # Classify Fall incidents at ingest so read endpoints only read fall_type:
+            # new/changed ones always, the rest only if unclassified or from an older classifier
+            stage_started = time.perf_counter()
+            new_falls = [r for r in to_insert if 'fall' in r['incident_type'].lower()]
+            new_ids = cls.load_existing(cursor, [r['manad_incident_id'] for r in new_falls]) if new_falls else {}
+            changed_fall_ids = [v[0] for v in new_ids.values()] + [
+                r['db_id'] for r in to_update_open + to_close if 'fall' in r['incident_type'].lower()
+            ]
+            open_falls = [r for r in to_update_open + unchanged_open if 'fall' in r['incident_type'].lower()]
+            fall_types = fall_detector.classify_incidents(cursor, changed_fall_ids, force=True)
+            fall_types.update(fall_detector.classify_incidents(
+                cursor, [r['db_id'] for r in unchanged_open if 'fall' in r['incident_type'].lower()]
+            ))
+            timings['classify'] = round((time.perf_counter() - stage_started) * 1000, 1)
+
+            # 🚀 Auto-generate tasks for Fall incidents (new ones, and open ones still without tasks)
+            stage_started = time.perf_counter()
+            fall_task_requests = []
+
+            if new_falls:
+                # Only incidents inserted in this run (INSERT OR IGNORE may skip conflicts)
+                task_owners = cls.find_incidents_with_tasks(cursor, [v[0] for v in new_ids.values()])
+                for r in new_falls:
+                    db_id = new_ids.get(r['manad_incident_id'], (None,))[0]
+                    if db_id is None or db_id in task_owners:
+                        continue
+                    fall_task_requests.append((db_id, r['incident_date'], fall_types.get(db_id, 'unknown')))
+
+            if open_falls:
+                task_owners = cls.find_incidents_with_tasks(cursor, [r['db_id'] for r in open_falls])
+                missing = [r for r in open_falls if r['db_id'] not in task_owners]
+                stored_fall_types = cls.load_fall_types(
+                    cursor, [r['db_id'] for r in missing if r['db_id'] not in fall_types]
+                )
+                for r in missing:
+                    fall_type = fall_types.get(r['db_id']) or stored_fall_types.get(r['db_id']) or 'unknown'
+                    fall_task_requests.append((r['db_id'], r['incident_date'], fall_type))
+
+            tasks_created = CIMSService.bulk_generate_fall_tasks(fall_task_requests, cursor)
+            if tasks_created > 0:
+                logger.info(f"✅ {site_name}: auto-generated {tasks_created} tasks for {len(fall_task_requests)} Fall incidents")
+            timings['tasks'] = round((time.perf_counter() - stage_started) * 1000, 1)
+
+            # Update last sync time per site (same transaction)
+            cursor.execute("""
+                INSERT OR REPLACE INTO system_settings (key, value, updated_at)
+                VALUES (?, ?, ?)
+            """, (
+                f'last_sync_{site_name.lower().replace(" ", "_")}',
+                datetime.now().isoformat(),
+                datetime.now().isoformat()
+            ))
+
+            # Advance the incremental watermark (never moves backwards)
+            watermark = cls.max_modified(incidents)
+            if watermark is not None:
+                cursor.execute("SELECT value FROM system_settings WHERE key = ?", (cls.watermark_key(site_name),))
+                current = cursor.fetchone()
+                if not current or not current[0] or current[0] < watermark.isoformat():
+                    cursor.execute("""
+                        INSERT OR REPLACE INTO system_settings (key, value, updated_at)
+                        VALUES (?, ?, ?)
+                    """, (cls.watermark_key(site_name), watermark.isoformat(), datetime.now().isoformat()))
+
+            stage_started = time.perf_counter()
+            conn.commit()
+            timings['commit'] = round((time.perf_counter() - stage_started) * 1000, 1)
+        except Exception:
+            conn.rollback()
+            raise
+
+        changed = len(to_update_open) + len(to_close)
+        return {
+            'synced': inserted,
+            'updated': changed,
+            'closed': len(to_close),
+            'new': inserted,
+            'changed': changed,
+            'unchanged': len(existing) - changed,
+            'tasks_created': tasks_created,
+            'tasks_closed': tasks_closed,
+            'watermark': watermark.isoformat() if watermark else None,
+            'timings_ms': timings
+        }
@@ -0,0 +1,120 @@
+"""
+Settings Service
+In-memory snapshot of the system_settings table (progress_report.db).
+
+Hot paths read settings from the snapshot instead of opening SQLite on every
+request. Writers call bump_settings_version() after changing system_settings:
+that touches SETTINGS_VERSION_FILE, and every process (gunicorn/IIS workers)
+reloads its snapshot on the next read because the file's mtime changed - one
+os.stat() per read. As a safety net for changes made outside the app (scripts,
+manual SQL), the snapshot is also reloaded after SETTINGS_MAX_AGE seconds.
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_DB = 'progress_report.db'
+SETTINGS_VERSION_FILE = 'progress_report.settings_version'
+SETTINGS_MAX_AGE = float(os.environ.get('SETTINGS_MAX_AGE', '60'))
+
+
+class SettingsService:
+    """Cached system_settings with cross-process invalidation via a version file."""
+
+    def __init__(self, db_path: str = SETTINGS_DB, version_file: str = SETTINGS_VERSION_FILE,
+                 max_age: float = SETTINGS_MAX_AGE):
+        self.db_path = db_path
+        self.version_file = version_file
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, str]] = None
+        self._version = None
+        self._loaded_at = 0.0
+
+    def _current_version(self):
+        try:
+            return os.stat(self.version_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, version):
+        snapshot: Dict[str, str] = {}
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            try:
+                snapshot = {key: value for key, value in conn.execute('SELECT key, value FROM system_settings')}
+            finally:
+                conn.close()
+        except Exception as e:
+            # Missing DB/table: callers fall back to environment variables until the next reload
+            logger.warning(f"Failed to load system_settings: {e}")
+        self._snapshot = snapshot
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    def _settings(self) -> Dict[str, str]:
+        version = self._current_version()
+        snapshot = self._snapshot
+        if (snapshot is None or version != self._version
+                or time.monotonic() - self._loaded_at > self.max_age):
+            with self._lock:
+                if (self._snapshot is None or version != self._version
+                        or time.monotonic() - self._loaded_at > self.max_age):
+                    self._load(version)
+                snapshot = self._snapshot
+        return snapshot
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Setting value from the snapshot, or `default` when unset/empty."""
+        value = self._settings().get(key)
+        return value if value else default
+
+    def invalidate(self):
+        """Expire this process's snapshot (next read reloads; concurrent readers keep the old dict)."""
+        with self._lock:
+            self._version = None
+            self._loaded_at = float('-inf')
+
+    def bump_version(self):
+        """Invalidate the snapshot in every process after system_settings changed."""
+        try:
+            with open(self.version_file, 'w') as f:
+                f.write(str(time.time_ns()))
+            # Coarse filesystem timestamps: make sure the mtime differs from the cached one
+            if self._current_version() == self._version:
+                os.utime(self.version_file, ns=(time.time_ns(), (self._version or 0) + 1))
+        except OSError as e:
+            logger.warning(f"Failed to bump settings version: {e}")
+        self.invalidate()
+
+
+_settings_service = None
+_settings_service_lock = threading.Lock()
+
+
+def get_settings_service() -> SettingsService:
+    """Process-wide settings service"""
+    global _settings_service
+    if _settings_service is None:
+        with _settings_service_lock:
+            if _settings_service is None:
+                _settings_service = SettingsService()
+    return _settings_service
+
+
+def use_db_direct_access() -> bool:
+    """USE_DB_DIRECT_ACCESS from system_settings, falling back to the environment."""
+    value = get_settings_service().get('USE_DB_DIRECT_ACCESS')
+    if value is None:
+        value = os.environ.get('USE_DB_DIRECT_ACCESS', 'false')
+    return value.lower() == 'true'
+
+
+def bump_settings_version():
+    """Call after writing system_settings so all workers reload their snapshot."""
+    get_settings_service().bump_version()
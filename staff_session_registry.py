@@ -0,0 +1,337 @@
+"""
+Staff Session Registry
+In-process index of active mobile app staff sessions and their FCM device tokens.
+
+staff_sessions / device_tokens in edenfield_calls.db stay the durable store; this
+registry is loaded from them on first use and kept current by the app endpoints that
+write them (checkin, finish-shift, update-areas, register-push-token, site reset).
+Each session's areas are parsed once into a lowercase frozenset, so the heartbeat
+and push fan-out paths need no SQLite I/O and no JSON parsing.
+
+With several processes (gunicorn master running the callbell monitors and push
+fan-out, plus its workers) every write-through update also touches
+<db>.sessions_version. Reads compare its mtime (one os.stat()) with the one the
+registry was loaded at and reload from SQLite when another process changed sessions
+or tokens. As a safety net for changes made outside the app, the registry is also
+reloaded after STAFF_SESSION_RELOAD_SECONDS. Unknown session ids still fall back to
+one DB lookup (misses are remembered until the next reload).
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_CALLBELL_DB = os.path.join(_BASE_DIR, 'edenfield_calls.db')
+
+RELOAD_SECONDS = float(os.environ.get('STAFF_SESSION_RELOAD_SECONDS', '300'))
+_MISSING_CACHE_SIZE = 1024  # unknown session ids remembered (stale devices keep heartbeating)
+
+# areas keeps the staff member's spelling for display; area_set is lowercased for matching
+StaffSession = namedtuple('StaffSession', ['session_id', 'username', 'staff_name', 'site', 'areas', 'area_set'])
+
+
+def _open_db(db_path: str) -> sqlite3.Connection:
+    """Open a SQLite connection with WAL mode and busy_timeout."""
+    conn = sqlite3.connect(db_path, timeout=15)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA busy_timeout=10000')
+        conn.execute('PRAGMA synchronous=NORMAL')
+    except Exception:
+        pass
+    return conn
+
+
+def _parse_areas(areas) -> List[str]:
+    """Accept the stored JSON text or an already-parsed list."""
+    if isinstance(areas, str):
+        try:
+            areas = json.loads(areas) if areas else []
+        except (json.JSONDecodeError, TypeError):
+            areas = []
+    if not isinstance(areas, list):
+        return []
+    return [a for a in areas if isinstance(a, str)]
+
+
+def _make_session(session_id, username, staff_name, site, areas) -> StaffSession:
+    area_list = _parse_areas(areas)
+    return StaffSession(session_id, username, staff_name, site or '', tuple(area_list),
+                        frozenset(a.lower() for a in area_list))
+
+
+def _is_missing_table(e: Exception) -> bool:
+    return isinstance(e, sqlite3.OperationalError) and 'no such table' in str(e)
+
+
+class StaffSessionRegistry:
+    """Active sessions by id and by site, plus device tokens by session."""
+
+    def __init__(self, db_path: str = _CALLBELL_DB, reload_seconds: float = RELOAD_SECONDS,
+                 version_file: Optional[str] = None):
+        self.db_path = db_path
+        self.version_file = version_file or db_path + '.sessions_version'
+        self.reload_seconds = reload_seconds
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._sessions: Dict[str, StaffSession] = {}
+        self._site_sessions: Dict[str, Dict[str, StaffSession]] = {}
+        self._session_tokens: Dict[str, set] = {}
+        self._token_session: Dict[str, str] = {}
+        self._missing = OrderedDict()
+        self._mutations = 0
+        self._version = None
+        self._loaded_at = 0.0
+
+    # ── Loading ──────────────────────────────────────────────
+
+    def _read_all(self):
+        """Read active sessions and their tokens from SQLite (no lock held)."""
+        sessions, tokens = [], []
+        with _open_db(self.db_path) as conn:
+            try:
+                sessions = conn.execute(
+                    'SELECT session_id, username, staff_name, site, areas FROM staff_sessions WHERE is_active = 1'
+                ).fetchall()
+                tokens = conn.execute('''
+                    SELECT dt.token, dt.session_id FROM device_tokens dt
+                    INNER JOIN staff_sessions ss ON dt.session_id = ss.session_id
+                    WHERE ss.is_active = 1
+                ''').fetchall()
+            except sqlite3.OperationalError as e:
+                # Tables are created on first checkin / token registration
+                if not _is_missing_table(e):
+                    raise
+        return sessions, tokens
+
+    def _replace_all(self, sessions, tokens):
+        self._sessions.clear()
+        self._site_sessions.clear()
+        self._session_tokens.clear()
+        self._token_session.clear()
+        for row in sessions:
+            self._add_session(_make_session(*row))
+        for token, session_id in tokens:
+            self._add_token(token, session_id)
+
+    def _current_version(self):
+        try:
+            return os.stat(self.version_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def ensure_loaded(self):
+        """Load the registry from SQLite on first use, and again when any process changed
+        sessions or tokens. Raises on DB errors (not cached)."""
+        version = self._current_version()
+        if (self._loaded and version == self._version
+                and time.monotonic() - self._loaded_at <= self.reload_seconds):
+            return
+        first = not self._loaded
+        if not self.reload(version) and first:
+            # A local write raced the first read: the next read retries
+            return
+        if first:
+            logger.info(f"Staff session registry loaded: {len(self._sessions)} sessions, "
+                        f"{len(self._token_session)} device tokens")
+
+    def reload(self, version=None) -> bool:
+        """Re-read SQLite and swap the registry in. Skipped if a local write raced the read."""
+        with self._lock:
+            mutations = self._mutations
+        sessions, tokens = self._read_all()
+        with self._lock:
+            if mutations != self._mutations:
+                return False
+            self._replace_all(sessions, tokens)
+            self._missing.clear()
+            self._loaded = True
+            self._version = version
+            self._loaded_at = time.monotonic()
+        return True
+
+    def _bump_version(self):
+        """Tell every process (this one included) to reload on its next read."""
+        try:
+            with open(self.version_file, 'w') as f:
+                f.write(str(time.time_ns()))
+            # Coarse filesystem timestamps: make sure the mtime differs from the loaded one
+            if self._current_version() == self._version:
+                os.utime(self.version_file, ns=(time.time_ns(), (self._version or 0) + 1))
+        except OSError as e:
+            logger.warning(f"Failed to bump staff session version: {e}")
+
+    # ── Internal mutation helpers (lock held) ────────────────
+
+    def _add_session(self, session: StaffSession):
+        self._sessions[session.session_id] = session
+        self._site_sessions.setdefault(session.site, {})[session.session_id] = session
+        self._missing.pop(session.session_id, None)
+
+    def _remove_session(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            site_sessions = self._site_sessions.get(session.site)
+            if site_sessions is not None:
+                site_sessions.pop(session_id, None)
+                if not site_sessions:
+                    del self._site_sessions[session.site]
+        self._remember_missing(session_id)
+        self._remove_tokens(session_id)
+
+    def _remember_missing(self, session_id: str):
+        self._missing[session_id] = True
+        while len(self._missing) > _MISSING_CACHE_SIZE:
+            self._missing.popitem(last=False)
+
+    def _add_token(self, token: str, session_id: str):
+        previous = self._token_session.get(token)
+        if previous is not None and previous != session_id:
+            self._session_tokens.get(previous, set()).discard(token)
+        self._token_session[token] = session_id
+        self._session_tokens.setdefault(session_id, set()).add(token)
+
+    def _remove_tokens(self, session_id: str):
+        for token in self._session_tokens.pop(session_id, ()):
+            if self._token_session.get(token) == session_id:
+                del self._token_session[token]
+
+    # ── Write-through updates (call after the SQLite write commits) ──
+    # Each one also bumps the version file so the other processes reload
+
+    def start_session(self, session_id: str, username: str, staff_name: str, site: str,
+                      areas) -> List[str]:
+        """Register a new session, ending other sessions of the same staff name at the site.
+        Returns the ended session ids."""
+        session = _make_session(session_id, username, staff_name, site, areas)
+        with self._lock:
+            self._mutations += 1
+            ended = [sid for sid, s in self._site_sessions.get(session.site, {}).items()
+                     if s.staff_name == staff_name]
+            for sid in ended:
+                self._remove_session(sid)
+            self._add_session(session)
+        self._bump_version()
+        return ended
+
+    def end_session(self, session_id: str):
+        with self._lock:
+            self._mutations += 1
+            self._remove_session(session_id)
+        self._bump_version()
+
+    def set_areas(self, session_id: str, areas):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            self._mutations += 1
+            self._add_session(_make_session(session.session_id, session.username,
+                                            session.staff_name, session.site, areas))
+        self._bump_version()
+
+    def add_token(self, token: str, session_id: str):
+        with self._lock:
+            self._mutations += 1
+            self._add_token(token, session_id)
+        self._bump_version()
+
+    def remove_tokens(self, session_id: str):
+        with self._lock:
+            self._mutations += 1
+            self._remove_tokens(session_id)
+        self._bump_version()
+
+    def remove_token(self, token: str):
+        self.remove_token_many([token])
+
+    def remove_token_many(self, tokens):
+        """Drop several tokens (e.g. rejected by FCM) with a single version bump."""
+        with self._lock:
+            for token in tokens:
+                session_id = self._token_session.pop(token, None)
+                if session_id is not None:
+                    self._mutations += 1
+                    self._session_tokens.get(session_id, set()).discard(token)
+        self._bump_version()
+
+    def clear_site(self, site: str):
+        """End every session (and drop its tokens) at a site."""
+        with self._lock:
+            self._mutations += 1
+            for session_id in list(self._site_sessions.get(site, {})):
+                self._remove_session(session_id)
+        self._bump_version()
+
+    # ── Reads ────────────────────────────────────────────────
+
+    def get_session(self, session_id: str) -> Optional[StaffSession]:
+        """Active session by id, or None. Raises on DB errors during the first load or
+        during the fallback lookup of an id this process has not seen."""
+        if not session_id:
+            return None
+        self.ensure_loaded()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None or session_id in self._missing:
+                return session
+        return self._load_session(session_id)
+
+    def _load_session(self, session_id: str) -> Optional[StaffSession]:
+        """Fallback for sessions written by another process."""
+        with _open_db(self.db_path) as conn:
+            try:
+                row = conn.execute(
+                    'SELECT session_id, username, staff_name, site, areas FROM staff_sessions '
+                    'WHERE session_id = ? AND is_active = 1',
+                    (session_id,)
+                ).fetchone()
+                tokens = conn.execute('SELECT token FROM device_tokens WHERE session_id = ?',
+                                      (session_id,)).fetchall() if row else []
+            except sqlite3.OperationalError as e:
+                if not _is_missing_table(e):
+                    raise
+                row, tokens = None, []
+        with self._lock:
+            if row is None:
+                self._remember_missing(session_id)
+                return None
+            session = _make_session(*row)
+            self._add_session(session)
+            for (token,) in tokens:
+                self._add_token(token, session_id)
+            return session
+
+    def tokens_for_site(self, site: str, area: str = '') -> List[str]:
+        """Device tokens of active sessions at a site. With an area, only sessions that
+        chose that area or chose no areas at all (they get every call)."""
+        self.ensure_loaded()
+        area_lower = (area or '').lower()
+        tokens = []
+        with self._lock:
+            for session_id, session in self._site_sessions.get(site, {}).items():
+                if area_lower and session.area_set and area_lower not in session.area_set:
+                    continue
+                tokens.extend(self._session_tokens.get(session_id, ()))
+        return tokens
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> StaffSessionRegistry:
+    """Process-wide registry for edenfield_calls.db."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = StaffSessionRegistry()
+    return _registry
@@ -29,6 +29,9 @@ let selectedClientId = null;
 // Selected event type filter (server filter; value '' or '__fall__' or exact Description)
 let selectedEventType = '';
 
+// Note text search (served from the local progress note mirror; '' = off)
+let searchText = '';
+
 /**
  * Single source of truth for Reporting Period options (nursing system: no hardcoded values in HTML).
  * First entry = default period (cached API used only for first visit / All Clients + this period).
@@ -57,7 +60,7 @@ function getPeriodDays() {
 
 /** True when client, period, or event type differs from default — use server pagination, not cached API. */
 function isFilterMode() {
-    return selectedClientId != null || getPeriodDays() !== DEFAULT_PERIOD_DAYS || selectedEventType !== '';
+    return selectedClientId != null || getPeriodDays() !== DEFAULT_PERIOD_DAYS || selectedEventType !== '' || searchText !== '';
 }
 
 /** Value for grouped Fall event types (any description containing 'fall'). */
@@ -544,7 +547,7 @@ function formatNoteDetail(note) {
         <hr>
         <b>Notes:</b><br>
         <div style="background:#f7f7f7; padding:10px; border-radius:4px; font-size:0.97em; max-height:400px; overflow-y:auto;">
-            ${safeHtmlNotes || (note.NotesPlainText || note.Notes || '')}
+            ${safeHtmlNotes || (note.NotesLoaded === false ? 'Loading...' : (note.NotesPlainText || note.Notes || ''))}
         </div>
     `;
 }
@@ -758,6 +761,31 @@ function selectNote(idx, notes) {
     // Show detail content
     const note = notes[idx];
     document.getElementById('noteDetailContent').innerHTML = formatNoteDetail(note);
+    if (note.NotesLoaded === false) {
+        loadNoteBody(note).then(() => {
+            const selected = document.querySelector('#notesTable tbody tr.selected');
+            if (selected && Number(selected.dataset.idx) === idx) {
+                document.getElementById('noteDetailContent').innerHTML = formatNoteDetail(note);
+            }
+        });
+    }
+}
+
+// Fetch the body of a note listed headers-only (filter mode)
+async function loadNoteBody(note) {
+    try {
+        const response = await fetch('/api/progress-note-bodies', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ site: currentSite, ids: [note.Id] })
+        });
+        const result = await response.json();
+        if (!result.success) throw new Error(result.message || 'Fetch failed');
+        note.NotesPlainText = result.notes[String(note.Id)] || '';
+        note.NotesLoaded = true;
+    } catch (e) {
+        console.error('[loadNoteBody]', e);
+    }
 }
 
 // Update progress notes table with new data
@@ -792,15 +820,24 @@ function updateProgressNotesTable(notes) {
 /**
  * Load one page of progress notes in filter mode (server pagination).
  * Uses /api/fetch-progress-notes with page, per_page; does not bulk-fetch into IndexedDB.
+ * Pages reached via next/previous reuse the keyset cursor the server returned for them
+ * (pagination.next_cursor); jumps to unvisited pages fall back to page/offset.
  * Sets window.filterModeNotes and window.serverPagination, then renders.
  */
+let filterModePageCursors = {};
+
 async function loadFilterModePage(page) {
+    if (page === 1) filterModePageCursors = {};  // page 1 = new filter set
     const req = {
         site: currentSite,
         days: getPeriodDays(),
         page: page,
-        per_page: perPage
+        per_page: perPage,
+        headers_only: true  // bodies are loaded when a row is selected
     };
+    if (filterModePageCursors[page]) {
+        req.cursor = filterModePageCursors[page];
+    }
     const selectedClient = selectedClientId != null ? clientList.find(c => (c.PersonId === selectedClientId || String(c.PersonId) === String(selectedClientId))) : null;
     if (selectedClient && selectedClient.MainClientServiceId != null) {
         req.client_service_id = selectedClient.MainClientServiceId;
@@ -808,18 +845,30 @@ async function loadFilterModePage(page) {
     if (selectedEventType) {
         req.event_types = selectedEventType === EVENT_TYPE_FALL ? ['Fall'] : [selectedEventType];
     }
+    if (searchText) {
+        req.q = searchText;
+    }
     try {
-        const response = await fetch('/api/fetch-progress-notes', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(req)
-        });
-        if (!response.ok) throw new Error('HTTP ' + response.status + ': ' + (await response.text()));
-        const result = await response.json();
-        if (!result.success) throw new Error(result.message || 'Fetch failed');
+        // Text search runs on the local mirror (up to one sync interval behind MANAD);
+        // filter-only pages stay live on /api/fetch-progress-notes
+        let result = searchText ? await fetchFromMirror(req) : null;
+        if (!result) {
+            // Not mirrored: text search is unavailable (setSearchAvailable cleared it), MANAD filters only
+            delete req.q;
+            const response = await fetch('/api/fetch-progress-notes', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(req)
+            });
+            if (!response.ok) throw new Error('HTTP ' + response.status + ': ' + (await response.text()));
+            result = await response.json();
+            if (!result.success) throw new Error(result.message || 'Fetch failed');
+        }
+        if (result.cache_info) updateCacheStatus(result.cache_info);
         const data = (result.data && Array.isArray(result.data)) ? result.data : [];
         const pag = result.pagination || { page: 1, per_page: perPage, total_count: data.length, total_pages: 1 };
         window.filterModeNotes = data;
+        if (pag.next_cursor) filterModePageCursors[page + 1] = pag.next_cursor;
         window.serverPagination = { page: pag.page, per_page: pag.per_page, total_count: pag.total_count, total_pages: pag.total_pages };
         currentPage = pag.page;
         updatePaginationUI(window.serverPagination);
@@ -834,6 +883,68 @@ async function loadFilterModePage(page) {
     }
 }
 
+// Query the local progress note mirror; null when it cannot answer (not synced yet / API mode / error)
+async function fetchFromMirror(req) {
+    try {
+        const response = await fetch('/api/progress-notes-mirror', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(req)
+        });
+        if (!response.ok) {
+            setSearchAvailable(false);
+            return null;
+        }
+        const result = await response.json();
+        const ready = !!(result.success && result.mirror_ready);
+        setSearchAvailable(ready);
+        return ready ? result : null;
+    } catch (e) {
+        console.warn('[fetchFromMirror]', e);
+        setSearchAvailable(false);
+        return null;
+    }
+}
+
+// Text search only runs on the mirror (whole period); disable it when the site/period is not mirrored
+// and probe again until the first sync has finished
+const SEARCH_PROBE_INTERVAL_MS = 60000;
+let searchProbeTimer = null;
+function setSearchAvailable(available) {
+    const el = document.getElementById('noteSearchInput');
+    if (!el) return;
+    clearTimeout(searchProbeTimer);
+    if (!available) searchProbeTimer = setTimeout(checkSearchAvailability, SEARCH_PROBE_INTERVAL_MS);
+    el.disabled = !available;
+    el.title = available ? '' : 'Search is available once notes for this site and period are synced (DB direct access mode)';
+    if (!available && searchText) {
+        searchText = '';
+        el.value = '';
+    }
+}
+
+// Probe the mirror for the current site/period (enables or disables the search box)
+async function checkSearchAvailability() {
+    await fetchFromMirror({ site: currentSite, days: getPeriodDays(), page: 1, per_page: 1, headers_only: true });
+}
+
+// Note search input handler (debounced; refetch)
+let searchTextTimer = null;
+function handleSearchTextInput() {
+    clearTimeout(searchTextTimer);
+    searchTextTimer = setTimeout(() => {
+        const el = document.getElementById('noteSearchInput');
+        const value = el ? el.value.trim() : '';
+        if (value === searchText) return;
+        searchText = value;
+        if (isFilterMode()) {
+            loadFilterModePage(1);
+        } else {
+            loadProgressNotes();
+        }
+    }, 300);
+}
+
 // Event type filter change handler (server filter; refetch)
 function handleEventTypeFilterChange() {
     const el = document.getElementById('eventTypeFilter');
@@ -1083,12 +1194,18 @@ window.addEventListener('DOMContentLoaded', async () => {
         const periodFilterEl = document.getElementById('reportingPeriodFilter');
         if (periodFilterEl) {
             periodFilterEl.addEventListener('change', handleClientFilterChange);
+            periodFilterEl.addEventListener('change', checkSearchAvailability);
         }
         // Event Type filter: server filter; refetch on change
         const eventTypeFilterEl = document.getElementById('eventTypeFilter');
         if (eventTypeFilterEl) {
             eventTypeFilterEl.addEventListener('change', handleEventTypeFilterChange);
         }
+        // Note text search: local mirror (debounced)
+        const noteSearchEl = document.getElementById('noteSearchInput');
+        if (noteSearchEl) {
+            noteSearchEl.addEventListener('input', handleSearchTextInput);
+        }
         
         // Detect URL change (browser back/forward)
         window.addEventListener('popstate', handleSiteChange);
@@ -1165,6 +1282,9 @@ async function initializeForSite(site) {
         
         // 1.7. Populate Event Type filter from /api/event-types (server filter)
         await populateEventTypeFilter();
+        
+        // 1.8. Note search needs the local mirror for this site/period
+        await checkSearchAvailability();
         console.log('[initializeForSite] Step 1.7 completed: Event type filter populated');
         
         // 2. Initialize IndexedDB
@@ -1722,6 +1842,11 @@ function updateCacheStatus(cacheInfo) {
     if (cacheInfo.status === 'api-fresh') {
         statusClass = 'api-fresh';
         statusMessage = 'Freshly loaded from API';
+    } else if (cacheInfo.status === 'mirror') {
+        const lastSync = cacheInfo.last_sync ? new Date(cacheInfo.last_sync) : null;
+        statusMessage = lastSync && !isNaN(lastSync)
+            ? `Search results from the local note copy (synced ${lastSync.toLocaleTimeString()})`
+            : 'Search results from the local note copy';
     } else if (cacheInfo.status === 'error') {
         statusClass = 'error';
         statusMessage = 'Error occurred during loading';
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+PushDispatcher tests (FakeFCMTransport, no Firebase or callbell DB needed)
+
+Run with: python -m pytest test_firebase_push.py
+"""
+
+import sqlite3
+
+import pytest
+
+import firebase_push
+from callbell import base_monitor
+
+
+class FakeRegistry:
+    """Tokens per site; records bulk removals"""
+
+    def __init__(self, tokens_by_site):
+        self.tokens_by_site = tokens_by_site
+        self.removed_batches = []
+
+    def tokens_for_site(self, site, area=''):
+        return list(self.tokens_by_site.get(site, []))
+
+    def remove_token_many(self, tokens):
+        self.removed_batches.append(list(tokens))
+        for site, tokens_at_site in self.tokens_by_site.items():
+            self.tokens_by_site[site] = [t for t in tokens_at_site if t not in tokens]
+
+
+@pytest.fixture
+def push_env(tmp_path, monkeypatch):
+    """Point firebase_push at a temp device_tokens DB and a fake session registry"""
+    db_path = str(tmp_path / 'calls.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+            CREATE TABLE device_tokens (
+                token TEXT PRIMARY KEY, session_id TEXT NOT NULL, site TEXT NOT NULL,
+                staff_name TEXT, registered_at REAL NOT NULL
+            )
+        ''')
+    registry = FakeRegistry({})
+    monkeypatch.setattr(firebase_push, '_CALLBELL_DB', db_path)
+    monkeypatch.setattr(firebase_push, '_get_session_registry', lambda: registry)
+    monkeypatch.setattr(firebase_push, '_detect_area_for_push', lambda site, text: '')
+    monkeypatch.setattr(base_monitor, 'get_notification_tone', lambda db_path: 'default')
+    return db_path, registry
+
+
+def _dispatcher(transport, coalesce_seconds=0.2):
+    return firebase_push.PushDispatcher(transport, coalesce_seconds=coalesce_seconds)
+
+
+def test_repeats_of_same_room_coalesce(push_env):
+    _, registry = push_env
+    registry.tokens_by_site = {'Site A': ['tok-a'], 'Site B': ['tok-b']}
+    transport = firebase_push.FakeFCMTransport()
+    dispatcher = _dispatcher(transport)
+
+    dispatcher.submit('Site A', 'RM 1', 'call', 1, message_text='RM 1 CALL', card_level='green')
+    dispatcher.submit('Site A', 'RM 1', 'call', 1, message_text='RM 1 EMERGENCY', card_level='red')
+    dispatcher.submit('Site A', 'RM 1', 'call', 1, message_text='RM 1 CALL', card_level='yellow')
+    dispatcher.submit('Site B', 'RM 1', 'call', 1, message_text='RM 1 CALL')
+    dispatcher.submit('Site A', 'RM 2', 'call', 1, message_text='RM 2 CALL')
+    assert dispatcher.wait_idle()
+
+    sent = sorted((m['token'], m['tag'], m['title']) for m in transport.sent)
+    assert sent == [
+        ('tok-a', 'callbell-RM 1', 'RM 1 EMERGENCY'),  # most urgent level kept
+        ('tok-a', 'callbell-RM 2', 'RM 2 CALL'),
+        ('tok-b', 'callbell-RM 1', 'RM 1 CALL'),        # same room, other site: not coalesced
+    ]
+    metrics = dispatcher.get_metrics()
+    assert metrics['enqueued'] == 3
+    assert metrics['coalesced'] == 2
+    assert metrics['messages_sent'] == 3
+
+
+def test_messages_are_sent_in_chunks_of_fcm_max_batch(push_env):
+    _, registry = push_env
+    token_count = firebase_push.FCM_MAX_BATCH * 2 + 7
+    registry.tokens_by_site = {'Site A': [f'tok-{i}' for i in range(token_count)]}
+    transport = firebase_push.FakeFCMTransport()
+    dispatcher = _dispatcher(transport)
+
+    dispatcher.submit('Site A', 'RM 1', 'call', 1, send_to_all=True)
+    assert dispatcher.wait_idle()
+
+    assert transport.batches == [firebase_push.FCM_MAX_BATCH, firebase_push.FCM_MAX_BATCH, 7]
+    assert len({m['token'] for m in transport.sent}) == token_count
+    metrics = dispatcher.get_metrics()
+    assert metrics['send_calls'] == 3
+    assert metrics['batches'] == 1
+    assert metrics['messages_sent'] == token_count
+
+
+def test_invalid_tokens_are_removed_in_bulk(push_env):
+    db_path, registry = push_env
+    tokens = [f'tok-{i}' for i in range(firebase_push.FCM_MAX_BATCH + 3)]
+    invalid = {'tok-1', 'tok-2', tokens[-1]}  # spread over both chunks
+    registry.tokens_by_site = {'Site A': list(tokens)}
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('INSERT INTO device_tokens VALUES (?, ?, ?, ?, ?)',
+                         [(t, 'session', 'Site A', 'Staff', 0.0) for t in tokens])
+    transport = firebase_push.FakeFCMTransport(invalid_tokens=invalid)
+    dispatcher = _dispatcher(transport)
+
+    dispatcher.submit('Site A', 'RM 1', 'call', 1, send_to_all=True)
+    assert dispatcher.wait_idle()
+
+    # One registry call for the whole batch, not one per token
+    assert len(registry.removed_batches) == 1
+    assert set(registry.removed_batches[0]) == invalid
+    with sqlite3.connect(db_path) as conn:
+        remaining = {row[0] for row in conn.execute('SELECT token FROM device_tokens')}
+    assert remaining == set(tokens) - invalid
+    metrics = dispatcher.get_metrics()
+    assert metrics['invalid_tokens_removed'] == len(invalid)
+    assert metrics['messages_failed'] == len(invalid)
+
+    # The next push no longer targets the removed tokens
+    transport.sent.clear()
+    dispatcher.submit('Site A', 'RM 2', 'call', 1, send_to_all=True)
+    assert dispatcher.wait_idle()
+    assert not invalid & {m['token'] for m in transport.sent}
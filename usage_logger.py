@@ -1,10 +1,34 @@
+"""
+Usage Logger
+Records access / progress note / API call logs under UsageLog/YYYY-MM/.
+
+Daily logs are append-only JSON Lines files ({log_type}_{YYYY-MM-DD}.jsonl). Entries are
+built in the request and handed to a background writer thread that appends them in
+batches, so logging never rewrites a file inside a request. Legacy JSON array files
+({log_type}_{YYYY-MM-DD}.json) are still read; convert_legacy_logs() (or
+convert_usage_logs.py) rewrites them as JSONL.
+
+The summary methods answer from the SQLite rollups in usage_rollup.py (updated by
+the writer after each batch) instead of re-reading the daily files.
+"""
 import os
 import json
+import time
+import queue
+import atexit
+import threading
 from datetime import datetime, date, timedelta, timezone
 from flask import request, session
 import logging
 from pathlib import Path
 
+from usage_rollup import UsageRollupStore
+
+_WRITE_QUEUE_MAX = 10000     # entries buffered before new ones are dropped
+_WRITE_BATCH_SIZE = 500      # max entries appended per writer pass
+_WRITE_FLUSH_SECONDS = 0.5   # max time an entry waits for its batch to fill
+
+
 class UsageLogger:
     def __init__(self, base_dir="UsageLog"):
         self.base_dir = Path(base_dir)
@@ -12,6 +36,17 @@ class UsageLogger:
         
         # Logging configuration
         self.setup_logging()
+        
+        # Background writer (started on first log entry)
+        self._write_queue = queue.Queue(maxsize=_WRITE_QUEUE_MAX)
+        self._writer_thread = None
+        self._writer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self.dropped_entries = 0
+        atexit.register(self.flush)
+        
+        # Pre-aggregated counters for the summary endpoints
+        self.rollup = UsageRollupStore(self.base_dir)
     
     def setup_logging(self):
         """Logging configuration"""
@@ -69,16 +104,175 @@ class UsageLogger:
         return monthly_dir
     
     def get_daily_log_file(self, log_type, target_date=None):
-        """Return daily log file path"""
+        """Return daily log file path (JSONL)"""
         if target_date is None:
             target_date = datetime.now()
         
         monthly_dir = self.get_monthly_dir(target_date)
         date_str = target_date.strftime("%Y-%m-%d")
-        log_file = monthly_dir / f"{log_type}_{date_str}.json"
+        log_file = monthly_dir / f"{log_type}_{date_str}.jsonl"
         
         return log_file
     
+    def get_legacy_log_file(self, log_type, target_date=None):
+        """Return the pre-JSONL daily log file path (JSON array)"""
+        return self.get_daily_log_file(log_type, target_date).with_suffix('.json')
+    
+    # ── Background writer ──
+    
+    def _enqueue(self, log_file, entry):
+        """Hand an entry to the writer thread (non-blocking)."""
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            with self._writer_lock:
+                if self._writer_thread is None or not self._writer_thread.is_alive():
+                    self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True,
+                                                           name='usage-log-writer')
+                    self._writer_thread.start()
+        try:
+            self._write_queue.put_nowait((str(log_file), entry))
+        except queue.Full:
+            self.dropped_entries += 1
+            self.logger.warning(f"Usage log queue full, dropped entry for {log_file}")
+    
+    def _writer_loop(self):
+        while True:
+            batch = [self._write_queue.get()]
+            deadline = time.monotonic() + _WRITE_FLUSH_SECONDS
+            while len(batch) < _WRITE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._write_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._append_batch(batch)
+            except Exception as e:
+                self.logger.error(f"Error writing usage log batch: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def _append_batch(self, batch):
+        """Append entries grouped by file, one write per file."""
+        lines_by_file = {}
+        for log_file, entry in batch:
+            lines_by_file.setdefault(log_file, []).append(json.dumps(entry, ensure_ascii=False) + '\n')
+        with self._file_lock:
+            for log_file, lines in lines_by_file.items():
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    f.write(''.join(lines))
+            for log_file in lines_by_file:
+                try:
+                    self.rollup.ingest_file(log_file)
+                except Exception as e:
+                    # Not lost: the next refresh() picks the lines up from the stored offset
+                    self.logger.error(f"Error updating usage rollup for {log_file}: {str(e)}")
+    
+    def flush(self, timeout=5.0):
+        """Wait until queued entries are written. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._write_queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    # ── Reading ──
+    
+    def read_log_file(self, log_file):
+        """Read entries from a JSONL or legacy JSON array log file."""
+        log_file = Path(log_file)
+        if log_file.suffix == '.json':
+            with open(log_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        entries = []
+        with open(log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Partially written last line
+                    continue
+        return entries
+    
+    def read_daily_logs(self, log_type, target_date):
+        """Entries for one day from the legacy JSON file and/or the JSONL file (oldest first)."""
+        entries = []
+        for log_file in (self.get_legacy_log_file(log_type, target_date),
+                         self.get_daily_log_file(log_type, target_date)):
+            if log_file.exists():
+                try:
+                    entries.extend(self.read_log_file(log_file))
+                except (json.JSONDecodeError, FileNotFoundError) as e:
+                    self.logger.error(f"Error reading log file {log_file}: {str(e)}")
+        return entries
+    
+    def daily_log_exists(self, log_type, target_date):
+        return (self.get_daily_log_file(log_type, target_date).exists()
+                or self.get_legacy_log_file(log_type, target_date).exists())
+    
+    def iter_log_files(self):
+        """Yield every usage log file path (JSONL and legacy JSON) under base_dir."""
+        if not self.base_dir.exists():
+            return
+        for root, dirs, files in os.walk(self.base_dir):
+            for filename in files:
+                if filename.endswith(('.jsonl', '.json')):
+                    yield os.path.join(root, filename)
+    
+    def convert_legacy_logs(self, keep_backup=True):
+        """
+        One-time conversion of legacy JSON array files to JSONL.
+        Legacy entries are placed before any JSONL entries already written for that day.
+        
+        Returns:
+            {'files': n, 'entries': n}
+        """
+        self.flush()
+        converted = {'files': 0, 'entries': 0}
+        for legacy_path in sorted(p for p in self.iter_log_files() if p.endswith('.json')):
+            legacy_file = Path(legacy_path)
+            try:
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                self.logger.error(f"Skipping unreadable legacy log {legacy_file}: {str(e)}")
+                continue
+            
+            jsonl_file = legacy_file.with_suffix('.jsonl')
+            tmp_file = legacy_file.with_suffix('.jsonl.tmp')
+            # The rollup transaction keeps other processes from ingesting the file mid-swap
+            with self._file_lock, self.rollup.transaction() as conn:
+                # Count both files as they are now, then skip the prepended legacy bytes
+                self.rollup.ingest_file(legacy_file, conn)
+                if jsonl_file.exists():
+                    self.rollup.ingest_file(jsonl_file, conn)
+                with open(tmp_file, 'w', encoding='utf-8') as out:
+                    for entry in entries:
+                        out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                    out.flush()
+                    prefix_bytes = os.path.getsize(tmp_file)
+                    if jsonl_file.exists():
+                        with open(jsonl_file, 'r', encoding='utf-8') as existing:
+                            for line in existing:
+                                out.write(line if line.endswith('\n') else line + '\n')
+                os.replace(tmp_file, jsonl_file)
+                self.rollup.advance_offset(conn, jsonl_file, prefix_bytes)
+                if keep_backup:
+                    os.replace(legacy_file, legacy_file.with_suffix('.json.bak'))
+                else:
+                    legacy_file.unlink()
+            
+            converted['files'] += 1
+            converted['entries'] += len(entries)
+            self.logger.info(f"Converted {legacy_file} -> {jsonl_file.name} ({len(entries)} entries)")
+        return converted
+    
     def log_access(self, user_info=None, page_info=None):
         """Record access log"""
         try:
@@ -114,21 +308,8 @@ class UsageLogger:
                 }
             }
             
-            # Read existing logs
-            existing_logs = []
-            if log_file.exists():
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        existing_logs = json.load(f)
-                except (json.JSONDecodeError, FileNotFoundError):
-                    existing_logs = []
-            
-            # Add new log
-            existing_logs.append(access_info)
-            
-            # Save log file
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_logs, f, ensure_ascii=False, indent=2)
+            # Append via the background writer
+            self._enqueue(log_file, access_info)
             
             self.logger.info(f"Access log recorded: {user_info.get('username', 'Unknown')} - {request.path if request else 'Unknown'}")
             
@@ -178,21 +359,8 @@ class UsageLogger:
                 }
             }
             
-            # Read existing logs
-            existing_logs = []
-            if log_file.exists():
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        existing_logs = json.load(f)
-                except (json.JSONDecodeError, FileNotFoundError):
-                    existing_logs = []
-            
-            # Add new log
-            existing_logs.append(note_log)
-            
-            # Save log file
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_logs, f, ensure_ascii=False, indent=2)
+            # Append via the background writer
+            self._enqueue(log_file, note_log)
             
             status = "success" if success else "failed"
             self.logger.info(f"Progress note log recorded: {user_info.get('username', 'Unknown')} - {status}")
@@ -234,21 +402,8 @@ class UsageLogger:
                 }
             }
             
-            # Read existing logs
-            existing_logs = []
-            if log_file.exists():
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        existing_logs = json.load(f)
-                except (json.JSONDecodeError, FileNotFoundError):
-                    existing_logs = []
-            
-            # Add new log
-            existing_logs.append(api_log)
-            
-            # Save log file
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_logs, f, ensure_ascii=False, indent=2)
+            # Append via the background writer
+            self._enqueue(log_file, api_log)
             
             status = "success" if success else "failed"
             self.logger.info(f"API call log recorded: {api_endpoint} - {user_info.get('username', 'Unknown')} - {status}")
@@ -256,6 +411,26 @@ class UsageLogger:
         except Exception as e:
             self.logger.error(f"Error logging API call: {str(e)}")
     
+    # ── Summaries (answered from the rollup store) ──
+    
+    def _refresh_rollup(self):
+        """Pick up entries written by other processes (cheap: only today's / unfrozen files)."""
+        try:
+            self.rollup.refresh()
+        except Exception as e:
+            self.logger.error(f"Error refreshing usage rollup: {str(e)}")
+    
+    def _rollup_days(self, start_date, end_date):
+        """Refresh the rollups and return the inclusive list of YYYY-MM-DD days in range."""
+        self._refresh_rollup()
+        days = []
+        current_date = start_date.date() if isinstance(start_date, datetime) else start_date
+        last_date = end_date.date() if isinstance(end_date, datetime) else end_date
+        while current_date <= last_date:
+            days.append(current_date.strftime("%Y-%m-%d"))
+            current_date = current_date + timedelta(days=1)
+        return days
+    
     def get_log_summary(self, start_date=None, end_date=None, log_type="access"):
         """Return log summary information"""
         try:
@@ -264,48 +439,32 @@ class UsageLogger:
             if end_date is None:
                 end_date = datetime.now()
             
+            days = self._rollup_days(start_date, end_date)
             summary = {
                 "period": {
                     "start": start_date.isoformat(),
                     "end": end_date.isoformat()
                 },
                 "total_entries": 0,
-                "unique_users": set(),
+                "unique_users": [],
                 "daily_counts": {},
                 "error_count": 0
             }
-            
-            current_date = start_date
-            while current_date <= end_date:
-                log_file = self.get_daily_log_file(log_type, current_date)
-                date_str = current_date.strftime("%Y-%m-%d")
-                
-                if log_file.exists():
-                    try:
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            daily_logs = json.load(f)
-                        
-                        summary["total_entries"] += len(daily_logs)
-                        summary["daily_counts"][date_str] = len(daily_logs)
-                        
-                        for log_entry in daily_logs:
-                            user_info = log_entry.get("user", {})
-                            username = user_info.get("username") or user_info.get("display_name")
-                            if username:
-                                summary["unique_users"].add(username)
-                            
-                            # Error count (for progress_notes and api_calls)
-                            if log_type in ["progress_notes", "api_calls"]:
-                                if not log_entry.get("result", {}).get("success", True):
-                                    summary["error_count"] += 1
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error reading log file {log_file}: {str(e)}")
-                
-                current_date = current_date + timedelta(days=1) # Increment date correctly
-            
-            # Convert set to list
-            summary["unique_users"] = list(summary["unique_users"])
+            if not days:
+                return summary
+            
+            totals = self.rollup.daily_totals(log_type, days[0], days[-1])
+            for date_str in days:
+                if date_str in totals:
+                    entries, errors = totals[date_str]
+                    summary["daily_counts"][date_str] = entries
+                    summary["total_entries"] += entries
+                    summary["error_count"] += errors
+            
+            unique_users = set()
+            for users in self.rollup.daily_users(log_type, days[0], days[-1]).values():
+                unique_users.update(users)
+            summary["unique_users"] = list(unique_users)
             
             return summary
             
@@ -321,6 +480,7 @@ class UsageLogger:
             if end_date is None:
                 end_date = datetime.now()
             
+            days = self._rollup_days(start_date, end_date)
             hourly_summary = {
                 "period": {
                     "start": start_date.isoformat(),
@@ -333,117 +493,65 @@ class UsageLogger:
                 "page_activity": {}     # Page activity
             }
             
-            current_date = start_date
-            while current_date <= end_date:
-                log_file = self.get_daily_log_file("access", current_date)
-                date_str = current_date.strftime("%Y-%m-%d")
+            if days:
+                totals = self.rollup.daily_totals("access", days[0], days[-1])
+                hourly_summary["total_entries"] = sum(entries for entries, _ in totals.values())
+                rows = sorted(self.rollup.hourly_rows(days[0], days[-1]))
+            else:
+                rows = []
+            
+            for hour_key, username, page_path, visits, _, _, last_epoch, last_at in rows:
+                page_path = page_path or "unknown"
                 
-                if log_file.exists():
-                    try:
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            daily_logs = json.load(f)
-                        
-                        hourly_summary["total_entries"] += len(daily_logs)
-                        
-                        for log_entry in daily_logs:
-                            user_info = log_entry.get("user", {})
-                            username = user_info.get("username") or user_info.get("display_name")
-                            display_name = user_info.get("display_name")
-                            role = user_info.get("role")
-                            
-                            if username:
-                                hourly_summary["unique_users"].add(username)
-                            
-                            # Extract hour from timestamp
-                            timestamp = log_entry.get("timestamp", "")
-                            if timestamp:
-                                try:
-                                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                    hour_key = dt.strftime("%Y-%m-%d %H:00")
-                                    date_hour_key = dt.strftime("%Y-%m-%d")
-                                    
-                                    # Count hourly activity
-                                    if hour_key not in hourly_summary["hourly_activity"]:
-                                        hourly_summary["hourly_activity"][hour_key] = {
-                                            "total_visits": 0,
-                                            "unique_users": set(),
-                                            "pages": {}
-                                        }
-                                    
-                                    hourly_summary["hourly_activity"][hour_key]["total_visits"] += 1
-                                    if username:
-                                        hourly_summary["hourly_activity"][hour_key]["unique_users"].add(username)
-                                    
-                                    # Page information
-                                    page_info = log_entry.get("page", {})
-                                    page_path = page_info.get("path", "unknown")
-                                    if page_path not in hourly_summary["hourly_activity"][hour_key]["pages"]:
-                                        hourly_summary["hourly_activity"][hour_key]["pages"][page_path] = 0
-                                    hourly_summary["hourly_activity"][hour_key]["pages"][page_path] += 1
-                                    
-                                    # User activity
-                                    if username:
-                                        if username not in hourly_summary["user_activity"]:
-                                            hourly_summary["user_activity"][username] = {
-                                                "display_name": display_name,
-                                                "role": role,
-                                                "total_visits": 0,
-                                                "last_visit": "",
-                                                "pages_visited": {},
-                                                "hourly_visits": {}
-                                            }
-                                        
-                                        hourly_summary["user_activity"][username]["total_visits"] += 1
-                                        hourly_summary["user_activity"][username]["last_visit"] = timestamp
-                                        
-                                        # User page visits
-                                        if page_path not in hourly_summary["user_activity"][username]["pages_visited"]:
-                                            hourly_summary["user_activity"][username]["pages_visited"][page_path] = 0
-                                        hourly_summary["user_activity"][username]["pages_visited"][page_path] += 1
-                                        
-                                        # User hourly visits
-                                        if hour_key not in hourly_summary["user_activity"][username]["hourly_visits"]:
-                                            hourly_summary["user_activity"][username]["hourly_visits"][hour_key] = 0
-                                        hourly_summary["user_activity"][username]["hourly_visits"][hour_key] += 1
-                                    
-                                    # Page activity
-                                    if page_path not in hourly_summary["page_activity"]:
-                                        hourly_summary["page_activity"][page_path] = {
-                                            "total_visits": 0,
-                                            "unique_users": set(),
-                                            "hourly_visits": {}
-                                        }
-                                    
-                                    hourly_summary["page_activity"][page_path]["total_visits"] += 1
-                                    if username:
-                                        hourly_summary["page_activity"][page_path]["unique_users"].add(username)
-                                    
-                                    if hour_key not in hourly_summary["page_activity"][page_path]["hourly_visits"]:
-                                        hourly_summary["page_activity"][page_path]["hourly_visits"][hour_key] = 0
-                                    hourly_summary["page_activity"][page_path]["hourly_visits"][hour_key] += 1
-                                    
-                                except Exception as e:
-                                    self.logger.warning(f"Error parsing timestamp {timestamp}: {str(e)}")
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error reading log file {log_file}: {str(e)}")
+                hour = hourly_summary["hourly_activity"].setdefault(hour_key, {
+                    "total_visits": 0,
+                    "unique_users": set(),
+                    "pages": {}
+                })
+                hour["total_visits"] += visits
+                hour["pages"][page_path] = hour["pages"].get(page_path, 0) + visits
                 
-                current_date = current_date + timedelta(days=1)
-            
-            # Convert set to list
+                page = hourly_summary["page_activity"].setdefault(page_path, {
+                    "total_visits": 0,
+                    "unique_users": set(),
+                    "hourly_visits": {}
+                })
+                page["total_visits"] += visits
+                page["hourly_visits"][hour_key] = page["hourly_visits"].get(hour_key, 0) + visits
+                
+                if not username:
+                    continue
+                hourly_summary["unique_users"].add(username)
+                hour["unique_users"].add(username)
+                page["unique_users"].add(username)
+                
+                user = hourly_summary["user_activity"].setdefault(username, {
+                    "display_name": None,
+                    "role": None,
+                    "total_visits": 0,
+                    "last_visit": "",
+                    "last_epoch": 0,
+                    "pages_visited": {},
+                    "hourly_visits": {}
+                })
+                user["total_visits"] += visits
+                if last_epoch >= user["last_epoch"]:
+                    user["last_epoch"] = last_epoch
+                    user["last_visit"] = last_at
+                user["pages_visited"][page_path] = user["pages_visited"].get(page_path, 0) + visits
+                user["hourly_visits"][hour_key] = user["hourly_visits"].get(hour_key, 0) + visits
+            
+            user_info = self.rollup.user_info(hourly_summary["user_activity"].keys())
+            for username, user in hourly_summary["user_activity"].items():
+                user["display_name"], user["role"] = user_info.get(username, (None, None))
+                del user["last_epoch"]
+            
+            # Convert sets to lists
             hourly_summary["unique_users"] = list(hourly_summary["unique_users"])
-            
-            # Convert unique_users in hourly_activity to list
-            for hour_key in hourly_summary["hourly_activity"]:
-                hourly_summary["hourly_activity"][hour_key]["unique_users"] = list(
-                    hourly_summary["hourly_activity"][hour_key]["unique_users"]
-                )
-            
-            # Convert unique_users in page_activity to list
-            for page_path in hourly_summary["page_activity"]:
-                hourly_summary["page_activity"][page_path]["unique_users"] = list(
-                    hourly_summary["page_activity"][page_path]["unique_users"]
-                )
+            for hour in hourly_summary["hourly_activity"].values():
+                hour["unique_users"] = list(hour["unique_users"])
+            for page in hourly_summary["page_activity"].values():
+                page["unique_users"] = list(page["unique_users"])
             
             return hourly_summary
             
@@ -459,6 +567,7 @@ class UsageLogger:
             if end_date is None:
                 end_date = datetime.now()
             
+            days = self._rollup_days(start_date, end_date)
             daily_summary = {
                 "period": {
                     "start": start_date.isoformat(),
@@ -466,44 +575,18 @@ class UsageLogger:
                 },
                 "daily_stats": {}  # Daily statistics
             }
-            
-            current_date = start_date
-            while current_date <= end_date:
-                log_file = self.get_daily_log_file("access", current_date)
-                date_str = current_date.strftime("%Y-%m-%d")
-                
-                if log_file.exists():
-                    try:
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            daily_logs = json.load(f)
-                        
-                        # Calculate daily statistics
-                        daily_users = set()
-                        daily_visits = len(daily_logs)
-                        
-                        for log_entry in daily_logs:
-                            user_info = log_entry.get("user", {})
-                            username = user_info.get("username") or user_info.get("display_name")
-                            if username:
-                                daily_users.add(username)
-                        
-                        daily_summary["daily_stats"][date_str] = {
-                            "total_visits": daily_visits,
-                            "unique_users": len(daily_users),
-                            "users": list(daily_users)
-                        }
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error reading log file {log_file}: {str(e)}")
-                else:
-                    # Record days without logs
-                    daily_summary["daily_stats"][date_str] = {
-                        "total_visits": 0,
-                        "unique_users": 0,
-                        "users": []
-                    }
-                
-                current_date = current_date + timedelta(days=1)
+            if not days:
+                return daily_summary
+            
+            totals = self.rollup.daily_totals("access", days[0], days[-1])
+            users = self.rollup.daily_users("access", days[0], days[-1])
+            for date_str in days:
+                daily_users = users.get(date_str, [])
+                daily_summary["daily_stats"][date_str] = {
+                    "total_visits": totals.get(date_str, (0, 0))[0],
+                    "unique_users": len(daily_users),
+                    "users": daily_users
+                }
             
             return daily_summary
             
@@ -511,6 +594,21 @@ class UsageLogger:
             self.logger.error(f"Error getting daily access summary: {str(e)}")
             return None
 
+    @staticmethod
+    def _visit_span(rows):
+        """(total_visits, first_visit, last_visit, usage_minutes) over access_hourly rows."""
+        total_visits = 0
+        first = last = None
+        for _, _, _, visits, first_epoch, first_at, last_epoch, last_at in rows:
+            total_visits += visits
+            if first is None or first_epoch < first[0]:
+                first = (first_epoch, first_at)
+            if last is None or last_epoch > last[0]:
+                last = (last_epoch, last_at)
+        if first is None:
+            return total_visits, None, None, 0
+        return total_visits, first[1], last[1], int((last[0] - first[0]) / 60)
+
     def get_user_daily_activity(self, username, start_date=None, end_date=None):
         """Daily access status for specific user"""
         try:
@@ -519,6 +617,7 @@ class UsageLogger:
             if end_date is None:
                 end_date = datetime.now()
             
+            days = self._rollup_days(start_date, end_date)
             user_activity = {
                 "username": username,
                 "period": {
@@ -528,74 +627,19 @@ class UsageLogger:
                 "daily_activity": {}  # Daily activity
             }
             
-            current_date = start_date
-            while current_date <= end_date:
-                log_file = self.get_daily_log_file("access", current_date)
-                date_str = current_date.strftime("%Y-%m-%d")
-                
-                if log_file.exists():
-                    try:
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            daily_logs = json.load(f)
-                        
-                        # Filter only logs for this user
-                        user_logs = []
-                        for log_entry in daily_logs:
-                            user_info = log_entry.get("user", {})
-                            log_username = user_info.get("username") or user_info.get("display_name")
-                            if log_username == username:
-                                user_logs.append(log_entry)
-                        
-                        if user_logs:
-                            # Calculate user's daily activity
-                            first_visit = None
-                            last_visit = None
-                            total_visits = len(user_logs)
-                            
-                            for log_entry in user_logs:
-                                timestamp = log_entry.get("timestamp", "")
-                                if timestamp:
-                                    try:
-                                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                        if first_visit is None or dt < first_visit:
-                                            first_visit = dt
-                                        if last_visit is None or dt > last_visit:
-                                            last_visit = dt
-                                    except:
-                                        pass
-                            
-                            # Calculate usage time (in minutes)
-                            usage_minutes = 0
-                            if first_visit and last_visit:
-                                usage_minutes = int((last_visit - first_visit).total_seconds() / 60)
-                            
-                            user_activity["daily_activity"][date_str] = {
-                                "total_visits": total_visits,
-                                "first_visit": first_visit.isoformat() if first_visit else None,
-                                "last_visit": last_visit.isoformat() if last_visit else None,
-                                "usage_minutes": usage_minutes
-                            }
-                        else:
-                            # No activity on this date
-                            user_activity["daily_activity"][date_str] = {
-                                "total_visits": 0,
-                                "first_visit": None,
-                                "last_visit": None,
-                                "usage_minutes": 0
-                            }
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error reading log file {log_file}: {str(e)}")
-                else:
-                    # Day without log file
-                    user_activity["daily_activity"][date_str] = {
-                        "total_visits": 0,
-                        "first_visit": None,
-                        "last_visit": None,
-                        "usage_minutes": 0
-                    }
-                
-                current_date = current_date + timedelta(days=1)
+            rows_by_day = {}
+            if days:
+                for row in self.rollup.hourly_rows(days[0], days[-1], username=username):
+                    rows_by_day.setdefault(row[0][:10], []).append(row)
+            
+            for date_str in days:
+                total_visits, first_visit, last_visit, usage_minutes = self._visit_span(rows_by_day.get(date_str, []))
+                user_activity["daily_activity"][date_str] = {
+                    "total_visits": total_visits,
+                    "first_visit": first_visit,
+                    "last_visit": last_visit,
+                    "usage_minutes": usage_minutes
+                }
             
             return user_activity
             
@@ -606,62 +650,29 @@ class UsageLogger:
     def get_date_user_activity(self, target_date):
         """User access time and usage time by user for specific date"""
         try:
-            log_file = self.get_daily_log_file("access", target_date)
+            date_str = self._rollup_days(target_date, target_date)[0]
             
-            if not log_file.exists():
-                return {
-                    "date": target_date.strftime("%Y-%m-%d"),
-                    "users": {}
-                }
-            
-            with open(log_file, 'r', encoding='utf-8') as f:
-                daily_logs = json.load(f)
+            rows_by_user = {}
+            for row in self.rollup.hourly_rows(date_str, date_str):
+                if row[1]:
+                    rows_by_user.setdefault(row[1], []).append(row)
             
+            user_info = self.rollup.user_info(rows_by_user.keys())
             user_activities = {}
-            
-            for log_entry in daily_logs:
-                user_info = log_entry.get("user", {})
-                username = user_info.get("username") or user_info.get("display_name")
-                display_name = user_info.get("display_name")
-                role = user_info.get("role")
-                
-                if username:
-                    if username not in user_activities:
-                        user_activities[username] = {
-                            "display_name": display_name,
-                            "role": role,
-                            "visits": [],
-                            "first_visit": None,
-                            "last_visit": None,
-                            "usage_minutes": 0
-                        }
-                    
-                    timestamp = log_entry.get("timestamp", "")
-                    if timestamp:
-                        try:
-                            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                            user_activities[username]["visits"].append(dt)
-                            
-                            if user_activities[username]["first_visit"] is None or dt < user_activities[username]["first_visit"]:
-                                user_activities[username]["first_visit"] = dt
-                            if user_activities[username]["last_visit"] is None or dt > user_activities[username]["last_visit"]:
-                                user_activities[username]["last_visit"] = dt
-                        except:
-                            pass
-            
-            # Calculate usage time for each user
-            for username, activity in user_activities.items():
-                if activity["first_visit"] and activity["last_visit"]:
-                    activity["usage_minutes"] = int((activity["last_visit"] - activity["first_visit"]).total_seconds() / 60)
-                    activity["first_visit"] = activity["first_visit"].isoformat()
-                    activity["last_visit"] = activity["last_visit"].isoformat()
-                else:
-                    activity["usage_minutes"] = 0
-                    activity["first_visit"] = None
-                    activity["last_visit"] = None
+            for username, rows in rows_by_user.items():
+                display_name, role = user_info.get(username, (None, None))
+                total_visits, first_visit, last_visit, usage_minutes = self._visit_span(rows)
+                user_activities[username] = {
+                    "display_name": display_name,
+                    "role": role,
+                    "total_visits": total_visits,
+                    "first_visit": first_visit,
+                    "last_visit": last_visit,
+                    "usage_minutes": usage_minutes
+                }
             
             return {
-                "date": target_date.strftime("%Y-%m-%d"),
+                "date": date_str,
                 "users": user_activities
             }
             
@@ -669,5 +680,13 @@ class UsageLogger:
             self.logger.error(f"Error getting date user activity: {str(e)}")
             return None
 
+    def get_monthly_stats(self):
+        """[{'month': 'YYYY-MM', 'totalAccess': n}] across all log types, newest first"""
+        self._refresh_rollup()
+        monthly_list = [{'month': month, 'totalAccess': count}
+                        for month, count in self.rollup.monthly_totals().items()]
+        monthly_list.sort(key=lambda x: x['month'], reverse=True)
+        return monthly_list
+
 # Global logger instance
 usage_logger = UsageLogger() 
\ No newline at end of file
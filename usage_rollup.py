@@ -0,0 +1,379 @@
+"""
+Usage Log Rollups
+Pre-aggregated counters over the UsageLog daily files, kept in UsageLog/usage_rollup.db.
+
+access_hourly holds hour x user x path visit counts (with first/last visit times),
+log_daily / log_daily_users hold per-day entry, error and user counts for every log
+type. Files are ingested incrementally: rollup_files remembers the byte offset
+consumed from each file, and the counters and offset are updated in one
+transaction, so entries are never counted twice even with several processes.
+The usage log writer ingests a file right after appending to it; reads call
+refresh() to pick up anything written elsewhere. Files of past days are frozen
+once fully consumed and never stat'ed again.
+"""
+import os
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_ERROR_LOG_TYPES = ('progress_notes', 'api_calls')
+_LIVE_LOG_TYPES = ('access', 'progress_notes', 'api_calls')
+
+
+def _parse_timestamp(timestamp):
+    """datetime for an entry timestamp, or None."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _entry_username(entry):
+    user_info = entry.get('user') or {}
+    return user_info.get('username') or user_info.get('display_name')
+
+
+class UsageRollupStore:
+    """Incremental SQLite rollups of the usage log files under one base directory."""
+
+    def __init__(self, base_dir, db_path=None):
+        self.base_dir = Path(base_dir)
+        self.db_path = str(db_path or self.base_dir / 'usage_rollup.db')
+        self._scanned = False
+        self._scan_lock = threading.Lock()
+        self._ensure_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA busy_timeout=10000')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        except Exception as e:
+            logger.warning(f"Failed to set PRAGMA settings: {e}")
+        return conn
+
+    def _ensure_tables(self):
+        self.base_dir.mkdir(exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS access_hourly (
+                    hour TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    visits INTEGER NOT NULL,
+                    first_epoch REAL NOT NULL,
+                    first_at TEXT NOT NULL,
+                    last_epoch REAL NOT NULL,
+                    last_at TEXT NOT NULL,
+                    PRIMARY KEY (hour, username, path)
+                );
+                CREATE INDEX IF NOT EXISTS idx_access_hourly_user ON access_hourly(username, hour);
+                CREATE TABLE IF NOT EXISTS access_users (
+                    username TEXT PRIMARY KEY,
+                    display_name TEXT,
+                    role TEXT
+                );
+                CREATE TABLE IF NOT EXISTS log_daily (
+                    log_type TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    entries INTEGER NOT NULL,
+                    errors INTEGER NOT NULL,
+                    PRIMARY KEY (log_type, day)
+                );
+                CREATE TABLE IF NOT EXISTS log_daily_users (
+                    log_type TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    PRIMARY KEY (log_type, day, username)
+                );
+                CREATE TABLE IF NOT EXISTS rollup_files (
+                    path TEXT PRIMARY KEY,
+                    log_type TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    frozen INTEGER NOT NULL DEFAULT 0
+                );
+            ''')
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction (BEGIN IMMEDIATE): serializes ingestion across threads and processes."""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+
+    # ── Ingestion ─────────────────────────────────────────────
+
+    def _key(self, log_file) -> str:
+        """Path relative to base_dir, so the key does not depend on the working directory."""
+        try:
+            return Path(log_file).resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return Path(log_file).as_posix()
+
+    @staticmethod
+    def _split_name(log_file):
+        """('access', '2025-01-31') from access_2025-01-31.jsonl; None for other files."""
+        name = Path(log_file).name.split('.', 1)[0]
+        log_type, sep, day = name.rpartition('_')
+        if not sep or len(day) != 10:
+            return None
+        return log_type, day
+
+    def ingest_file(self, log_file, conn=None) -> int:
+        """Add entries appended to a log file since the last ingest. Returns entries added."""
+        if conn is None:
+            with self.transaction() as conn:
+                return self.ingest_file(log_file, conn)
+
+        parsed = self._split_name(log_file)
+        if parsed is None:
+            return 0
+        log_type, day = parsed
+        key = self._key(log_file)
+        row = conn.execute('SELECT offset, frozen FROM rollup_files WHERE path = ?', (key,)).fetchone()
+        offset, frozen = row if row else (0, 0)
+        if frozen:
+            return 0
+
+        try:
+            size = os.path.getsize(log_file)
+        except OSError:
+            return 0
+        if size <= offset:
+            return 0
+
+        if str(log_file).endswith('.json'):
+            # Legacy JSON array files are no longer appended to: ingest them once
+            try:
+                with open(log_file, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error(f"Skipping unreadable usage log {log_file}: {e}")
+                return 0
+            consumed, frozen = size, 1
+        else:
+            with open(log_file, 'rb') as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+            # Only whole lines; a partially written last line is picked up next time
+            end = data.rfind(b'\n') + 1
+            entries = []
+            for line in data[:end].decode('utf-8', errors='replace').splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+            consumed = offset + end
+
+        self._apply(conn, log_type, day, entries)
+        conn.execute('''
+            INSERT INTO rollup_files (path, log_type, day, offset, frozen) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET offset = excluded.offset, frozen = excluded.frozen
+        ''', (key, log_type, day, consumed, frozen))
+        return len(entries)
+
+    def _apply(self, conn, log_type, day, entries):
+        """Fold a batch of entries from one daily file into the counters."""
+        if not entries:
+            return
+        errors = 0
+        users = set()
+        hourly = {}
+        user_info = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            username = _entry_username(entry)
+            if username:
+                users.add(username)
+            if log_type in _ERROR_LOG_TYPES and not (entry.get('result') or {}).get('success', True):
+                errors += 1
+            if log_type != 'access':
+                continue
+
+            dt = _parse_timestamp(entry.get('timestamp', ''))
+            if dt is None:
+                continue
+            page_path = (entry.get('page') or {}).get('path', 'unknown') or ''
+            key = (dt.strftime('%Y-%m-%d %H:00'), username or '', page_path)
+            epoch = dt.timestamp()
+            bucket = hourly.get(key)
+            if bucket is None:
+                hourly[key] = [1, epoch, dt.isoformat(), epoch, dt.isoformat()]
+            else:
+                bucket[0] += 1
+                if epoch < bucket[1]:
+                    bucket[1], bucket[2] = epoch, dt.isoformat()
+                if epoch > bucket[3]:
+                    bucket[3], bucket[4] = epoch, dt.isoformat()
+            if username:
+                user_obj = entry.get('user') or {}
+                user_info[username] = (user_obj.get('display_name'), user_obj.get('role'))
+
+        conn.execute('''
+            INSERT INTO log_daily (log_type, day, entries, errors) VALUES (?, ?, ?, ?)
+            ON CONFLICT(log_type, day) DO UPDATE SET
+                entries = entries + excluded.entries, errors = errors + excluded.errors
+        ''', (log_type, day, len(entries), errors))
+        conn.executemany('INSERT OR IGNORE INTO log_daily_users (log_type, day, username) VALUES (?, ?, ?)',
+                         [(log_type, day, username) for username in users])
+        if hourly:
+            conn.executemany('''
+                INSERT INTO access_hourly (hour, username, path, visits, first_epoch, first_at, last_epoch, last_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(hour, username, path) DO UPDATE SET
+                    visits = visits + excluded.visits,
+                    first_at = CASE WHEN excluded.first_epoch < first_epoch THEN excluded.first_at ELSE first_at END,
+                    first_epoch = MIN(first_epoch, excluded.first_epoch),
+                    last_at = CASE WHEN excluded.last_epoch > last_epoch THEN excluded.last_at ELSE last_at END,
+                    last_epoch = MAX(last_epoch, excluded.last_epoch)
+            ''', [key + tuple(bucket) for key, bucket in hourly.items()])
+        if user_info:
+            conn.executemany('''
+                INSERT INTO access_users (username, display_name, role) VALUES (?, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET display_name = excluded.display_name, role = excluded.role
+            ''', [(username, display_name, role) for username, (display_name, role) in user_info.items()])
+
+    def advance_offset(self, conn, log_file, nbytes):
+        """Mark the first nbytes of a rewritten file as already counted (legacy conversion)."""
+        parsed = self._split_name(log_file)
+        if parsed is None:
+            return
+        conn.execute('''
+            INSERT INTO rollup_files (path, log_type, day, offset, frozen) VALUES (?, ?, ?, ?, 0)
+            ON CONFLICT(path) DO UPDATE SET offset = offset + excluded.offset, frozen = 0
+        ''', (self._key(log_file), parsed[0], parsed[1], nbytes))
+
+    def freeze_file(self, conn, log_file):
+        conn.execute('UPDATE rollup_files SET frozen = 1 WHERE path = ?', (self._key(log_file),))
+
+    def refresh(self, today=None):
+        """Ingest unseen data. The first call per process scans every file (backfill);
+        later calls only look at today's files and files not yet frozen."""
+        today = today or datetime.now().strftime('%Y-%m-%d')
+        with self._scan_lock:
+            full_scan = not self._scanned
+            self._scanned = True
+        try:
+            with self.transaction() as conn:
+                if full_scan:
+                    candidates = [str(p) for p in self._iter_files()]
+                else:
+                    candidates = [str(self.base_dir / key) for (key,) in
+                                  conn.execute('SELECT path FROM rollup_files WHERE frozen = 0')]
+                    month_dir = self.base_dir / today[:7]
+                    candidates.extend(str(month_dir / f"{log_type}_{today}.jsonl") for log_type in _LIVE_LOG_TYPES)
+                for log_file in set(candidates):
+                    self.ingest_file(log_file, conn)
+
+                # Past days no longer receive entries once fully consumed
+                for key, day, offset in conn.execute(
+                        'SELECT path, day, offset FROM rollup_files WHERE frozen = 0 AND day < ?', (today,)).fetchall():
+                    try:
+                        size = os.path.getsize(self.base_dir / key)
+                    except OSError:
+                        size = offset
+                    if size <= offset:
+                        conn.execute('UPDATE rollup_files SET frozen = 1 WHERE path = ?', (key,))
+        except Exception:
+            if full_scan:
+                self._scanned = False
+            raise
+
+    def _iter_files(self):
+        if not self.base_dir.exists():
+            return
+        for root, dirs, files in os.walk(self.base_dir):
+            for filename in files:
+                if filename.endswith(('.jsonl', '.json')):
+                    yield Path(root) / filename
+
+    # ── Queries ───────────────────────────────────────────────
+
+    def daily_totals(self, log_type, start_day, end_day):
+        """{day: (entries, errors)} for days that have a log file."""
+        conn = self._connect()
+        try:
+            return {day: (entries, errors) for day, entries, errors in conn.execute(
+                'SELECT day, entries, errors FROM log_daily WHERE log_type = ? AND day BETWEEN ? AND ?',
+                (log_type, start_day, end_day))}
+        finally:
+            conn.close()
+
+    def daily_users(self, log_type, start_day, end_day):
+        """{day: [username, ...]}"""
+        conn = self._connect()
+        try:
+            users = {}
+            for day, username in conn.execute(
+                    'SELECT day, username FROM log_daily_users WHERE log_type = ? AND day BETWEEN ? AND ?',
+                    (log_type, start_day, end_day)):
+                users.setdefault(day, []).append(username)
+            return users
+        finally:
+            conn.close()
+
+    def hourly_rows(self, start_day, end_day, username=None):
+        """access_hourly rows (hour, username, path, visits, first_epoch, first_at, last_epoch, last_at)."""
+        sql = ('SELECT hour, username, path, visits, first_epoch, first_at, last_epoch, last_at '
+               'FROM access_hourly WHERE hour BETWEEN ? AND ?')
+        params = [f"{start_day} 00:00", f"{end_day} 23:00"]
+        if username is not None:
+            sql += ' AND username = ?'
+            params.append(username)
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def user_info(self, usernames):
+        """{username: (display_name, role)}"""
+        usernames = list(usernames)
+        if not usernames:
+            return {}
+        conn = self._connect()
+        try:
+            info = {}
+            for i in range(0, len(usernames), 500):
+                chunk = usernames[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for username, display_name, role in conn.execute(
+                        f'SELECT username, display_name, role FROM access_users WHERE username IN ({placeholders})',
+                        chunk):
+                    info[username] = (display_name, role)
+            return info
+        finally:
+            conn.close()
+
+    def monthly_totals(self):
+        """{'YYYY-MM': entries} across all log types."""
+        conn = self._connect()
+        try:
+            return dict(conn.execute('SELECT substr(day, 1, 7), SUM(entries) FROM log_daily GROUP BY 1').fetchall())
+        finally:
+            conn.close()